@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /upload/batch wall time vs UPLOAD_WORKERS
+Parses --files synthetic statements through the same process pool the endpoint uses,
+then times one end-to-end /upload/batch request at the largest worker count.
+Usage: python benchmarks/bench_batch_upload.py [--files 12] [--rows 50000] [--workers 1 2 4 8]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+async def parse_all(pool, paths, chunksize):
+    import utils
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*(loop.run_in_executor(pool, utils.parse_csv, p, chunksize) for p in paths))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=12)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    os.environ.update({
+        "ENABLE_RAG": "false",
+        "RAG_WARMUP": "off",
+        "DATABASE_URL": "sqlite:///./bench_batch.db",
+        "UPLOAD_WORKERS": str(max(args.workers)),
+    })
+    from synthetic import remove_database, write_statement
+    import utils
+
+    tmpdir = tempfile.mkdtemp()
+    paths = [write_statement(os.path.join(tmpdir, f"s{i}.csv"), args.rows, seed=i) for i in range(args.files)]
+    print(f"{args.files} files x {args.rows} rows")
+    print(f"{'workers':>7} {'parse s':>8} {'speedup':>8}")
+    try:
+        start = time.perf_counter()
+        for p in paths:
+            utils.parse_csv(p, chunksize=50_000)
+        serial = time.perf_counter() - start
+        print(f"{'serial':>7} {serial:>8.2f} {1.0:>8.2f}")
+
+        ctx = multiprocessing.get_context("spawn")
+        for w in sorted(set(args.workers)):
+            with ProcessPoolExecutor(max_workers=w, mp_context=ctx) as pool:
+                asyncio.run(parse_all(pool, paths[:w], 50_000))  # start the workers outside the timing
+                start = time.perf_counter()
+                asyncio.run(parse_all(pool, paths, 50_000))
+                elapsed = time.perf_counter() - start
+            print(f"{w:>7} {elapsed:>8.2f} {serial / elapsed:>8.2f}")
+
+        from fastapi.testclient import TestClient
+        import main as backend
+        with TestClient(backend.app) as client:
+            handles = [open(p, "rb") for p in paths]
+            start = time.perf_counter()
+            try:
+                r = client.post("/upload/batch", files=[("files", (os.path.basename(h.name), h, "text/csv")) for h in handles])
+            finally:
+                for h in handles:
+                    h.close()
+            r.raise_for_status()
+            print(f"/upload/batch end to end ({max(args.workers)} workers): {time.perf_counter() - start:.2f} s, "
+                  f"{r.json()['transaction_count']} transactions")
+    finally:
+        for p in paths:
+            os.remove(p)
+        os.rmdir(tmpdir)
+        remove_database("bench_batch.db")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vectorized utils.parse_csv vs the old per-row iterrows loop
+Usage: python benchmarks/bench_classify.py [--rows 1000 10000 100000]
+"""
+import argparse
+import io
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pandas as pd
+import utils
+from synthetic import make_statement
+
+
+def legacy_classify_description(desc: str, amount: float) -> str:
+    """The original keyword loop, kept here as the baseline"""
+    txt = desc.lower() if isinstance(desc, str) else ""
+    for k in utils.INCOME_KEYWORDS:
+        if k in txt:
+            return "income"
+    for k in utils.DEDUCTIBLE_KEYWORDS:
+        if k in txt:
+            return "deductible"
+    for k in utils.EXPENSE_KEYWORDS:
+        if k in txt:
+            return "expense"
+    return "income" if amount > 0 else "expense"
+
+
+def legacy_parse_csv(buf) -> dict:
+    """The original iterrows-based parse_csv (fixed column names)"""
+    df = pd.read_csv(buf)
+    transactions = []
+    total_income = total_expenses = potential_deductions = 0.0
+    for _, row in df.iterrows():
+        amount = float(row["amount"])
+        desc = row["description"]
+        category = legacy_classify_description(str(desc), amount)
+        if category == "income":
+            total_income += amount
+        elif category == "expense":
+            total_expenses += abs(amount)
+        elif category == "deductible":
+            potential_deductions += abs(amount)
+            total_expenses += abs(amount)
+        transactions.append({
+            "date": str(row["date"]),
+            "description": str(desc),
+            "amount": amount,
+            "category": category,
+        })
+    return {
+        "total_income": total_income,
+        "total_expenses": total_expenses,
+        "potential_deductions": potential_deductions,
+        "transactions": transactions,
+    }
+
+
+def timed(fn, text: str):
+    start = time.perf_counter()
+    result = fn(io.StringIO(text))
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>9}  match")
+    for n in args.rows:
+        text = make_statement(n)
+        old, t_old = timed(legacy_parse_csv, text)
+        new, t_new = timed(utils.parse_csv, text)
+
+        same_categories = [t["category"] for t in old["transactions"]] == [t["category"] for t in new["transactions"]]
+        same_totals = all(
+            math.isclose(old[k], new[k], rel_tol=1e-9)
+            for k in ("total_income", "total_expenses", "potential_deductions")
+        )
+        match = "✅" if same_categories and same_totals else "❌"
+        print(f"{n:>10} {t_old:>12.3f} {t_new:>15.3f} {t_old / t_new:>8.1f}x  {match}")
+
+
+if __name__ == "__main__":
+    main()
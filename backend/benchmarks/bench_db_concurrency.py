@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sustained req/s for mixed /chat + /upload traffic against SQLite
+Each configuration runs in a fresh process (db.py reads its settings at import):
+"rollback journal" is SQLite's default, "wal" is SQLITE_WAL=true (WAL + synchronous=NORMAL).
+Mock LLM, no RAG; one request in --upload-every is a 1,000-row /upload, the rest are /chat.
+"max loop lag" is the longest the event loop was blocked during the run.
+Usage: python benchmarks/bench_db_concurrency.py [--concurrency 8 32] [--requests 400]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+CONFIGS = {
+    "rollback journal": {"SQLITE_WAL": "false"},
+    "wal": {"SQLITE_WAL": "true"},
+}
+
+
+async def run_load(app, statement: str, n: int, concurrency: int, upload_every: int):
+    import httpx
+    import db as app_db
+    import models
+
+    # ASGITransport never runs the startup hooks, so create the tables main.create_tables would
+    models.Base.metadata.create_all(bind=app_db.engine)
+
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+        session_id = (await client.post("/upload", files={"file": ("s.csv", statement, "text/csv")})).json()["session_id"]
+
+        async def one(i: int):
+            async with sem:
+                start = time.perf_counter()
+                if i % upload_every == 0:
+                    r = await client.post("/upload", files={"file": ("s.csv", statement, "text/csv")},
+                                          data={"session_id": str(session_id)})
+                else:
+                    r = await client.post("/chat", json={"session_id": session_id, "message": f"How much can I save under 80C? #{i}"})
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        done = asyncio.Event()
+        lags = []
+
+        async def probe():
+            # how late a 5 ms sleep wakes up = how long something blocked the event loop
+            while not done.is_set():
+                t = time.perf_counter()
+                await asyncio.sleep(0.005)
+                lags.append(time.perf_counter() - t - 0.005)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(n)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+    # the async DB pool is bound to this event loop; the next run starts a new one
+    await app_db.async_engine.dispose()
+    latencies.sort()
+    return {
+        "rps": n / elapsed,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "max_lag_ms": max(lags, default=0.0) * 1000,
+    }
+
+
+def child(args):
+    """Run one configuration in this process and print the result as JSON"""
+    import main as backend
+    from synthetic import make_statement
+
+    statement = make_statement(1_000)
+    results = {}
+    for c in args.concurrency:
+        results[c] = asyncio.run(run_load(backend.app, statement, args.requests, c, args.upload_every))
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--upload-every", type=int, default=10)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args)
+    from synthetic import remove_database
+
+    print(f"{args.requests} requests per run, 1 in {args.upload_every} is an /upload")
+    print(f"{'config':>17} {'concurrency':>11} {'req/s':>8} {'p95 ms':>8} {'max loop lag ms':>16}")
+    for name, overrides in CONFIGS.items():
+        db_path = os.path.join(BACKEND_DIR, "bench_db_concurrency.db")
+        env = dict(os.environ, ENABLE_RAG="false", RAG_WARMUP="off", ANSWER_CACHE_SIZE="0",
+                   DATABASE_URL=f"sqlite:///{db_path}", **overrides)
+        try:
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", "--requests", str(args.requests),
+                 "--upload-every", str(args.upload_every), "--concurrency", *map(str, args.concurrency)],
+                env=env, cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+            ).stdout
+        finally:
+            remove_database(db_path)
+        for c, r in json.loads(out.strip().splitlines()[-1]).items():
+            print(f"{name:>17} {c:>11} {r['rps']:>8.1f} {r['p95_ms']:>8.1f} {r['max_lag_ms']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
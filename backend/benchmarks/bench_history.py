@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chat history cost on long sessions
+"full" loads every message of the session into the prompt; "windowed" is memory.load_history
+(last HISTORY_TURNS turns + rolling summary), timed with and without the
+(session_id, timestamp) index. Other sessions' messages are interleaved so the index matters.
+Usage: python benchmarks/bench_history.py [--messages 100 1000 5000] [--sessions 20]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+DB_FILE = "bench_history.db"
+QUESTION = "How much can I save under Section 80C if I invest in ELSS and PPF?"
+ANSWER = ("Section 80C allows deductions up to ₹1.5 lakh for ELSS, PPF, EPF, LIC premiums and home loan "
+          "principal. At the 30% slab that saves up to ₹46,800 in tax.")
+
+
+def populate(db, models, n_messages: int, n_sessions: int):
+    """n_sessions sessions with n_messages alternating user/assistant messages each, interleaved"""
+    models.Base.metadata.drop_all(bind=db.engine)
+    models.Base.metadata.create_all(bind=db.engine)
+    with db.engine.begin() as conn:
+        conn.execute(models.Session.__table__.insert(), [{"id": i + 1} for i in range(n_sessions)])
+        rows = [
+            {"session_id": s + 1, "role": "user" if i % 2 == 0 else "assistant",
+             "content": f"{QUESTION if i % 2 == 0 else ANSWER} #{i}"}
+            for i in range(n_messages) for s in range(n_sessions)
+        ]
+        for start in range(0, len(rows), 50_000):
+            conn.execute(models.Message.__table__.insert(), rows[start:start + 50_000])
+
+
+async def time_async(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+async def measure(db, models, memory, prompt_context, session_id: int, repeat: int):
+    from sqlalchemy import select
+
+    M = models.Message
+    async with db.AsyncSessionLocal() as s:
+        async def full():
+            rows = await s.execute(select(M.role, M.content).where(M.session_id == session_id).order_by(M.timestamp, M.id))
+            return "\n".join(f"{role}: {content}" for role, content in rows)
+
+        async def windowed():
+            return memory.format_history(await memory.load_history(s, session_id))
+
+        full_tokens = prompt_context.count_tokens(await full())
+        window_tokens = prompt_context.count_tokens(await windowed())
+        full_ms = await time_async(full, repeat)
+        window_ms = await time_async(windowed, repeat)
+    await db.async_engine.dispose()
+    return full_tokens, window_tokens, full_ms, window_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, nargs="+", default=[100, 1_000, 5_000])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.update({"DATABASE_URL": f"sqlite:///./{DB_FILE}"})
+    from sqlalchemy import text
+    import db
+    import memory
+    import models
+    import prompt_context
+    from synthetic import remove_database
+
+    print(f"{args.sessions} sessions; history for one of them")
+    print(f"{'messages':>8} {'full tokens':>12} {'window tokens':>14} {'full ms':>8} "
+          f"{'window ms':>10} {'window ms (no index)':>21}")
+    try:
+        for n in args.messages:
+            populate(db, models, n, args.sessions)
+            session_id = args.sessions // 2
+            full_tokens, window_tokens, full_ms, window_ms = asyncio.run(
+                measure(db, models, memory, prompt_context, session_id, args.repeat))
+            with db.engine.begin() as conn:
+                conn.execute(text("DROP INDEX ix_messages_session_timestamp"))
+            _, _, _, no_index_ms = asyncio.run(measure(db, models, memory, prompt_context, session_id, args.repeat))
+            print(f"{n:>8} {full_tokens:>12} {window_tokens:>14} {full_ms:>8.1f} {window_ms:>10.2f} {no_index_ms:>21.2f}")
+    finally:
+        db.engine.dispose()
+        remove_database(DB_FILE)
+
+
+if __name__ == "__main__":
+    main()
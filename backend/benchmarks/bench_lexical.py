@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: BM25 lexical fast path vs embedding search in IndianTaxRAG.search
+For each query (rag.TEST_QUERIES plus section/form lookups): the route taken (lexical or fused),
+latency with and without the lexical index (query embedding cache off), and how many of the
+top 3 chunks match the vector-only top 3. Without the RAG dependencies only the BM25 index is
+built from knowledge/ and timed.
+Usage: python benchmarks/bench_lexical.py [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
+
+import lexical
+import rag
+
+SECTION_QUERIES = [
+    "80C limit",
+    "What is 80CCD(1B)?",
+    "Who should file ITR-2?",
+    "GST rate on restaurant food",
+    "Is 44ADA presumptive taxation for professionals?",
+    "TDS on fixed deposit interest",
+]
+
+
+def per_call_us(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1e6 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    queries = rag.TEST_QUERIES + SECTION_QUERIES
+
+    try:
+        instance = rag.get_rag()
+    except Exception as e:
+        print(f"⚠️ RAG unavailable ({e}); timing the BM25 index alone\n")
+        chunks = [
+            (f"{name}:{i}", chunk, {"source": name, "chunk_id": i})
+            for name, text in rag.read_knowledge_files("./knowledge").items()
+            for i, chunk in enumerate(rag.IndianTaxRAG._chunk_text(text))
+        ]
+        start = time.perf_counter()
+        index = lexical.BM25Index(*map(list, zip(*chunks)))
+        print(f"BM25 index: {len(index)} chunks, {len(index.postings)} terms, built in {(time.perf_counter() - start) * 1000:.2f} ms\n")
+        print(f"{'route':<8} {'µs':>8}  query")
+        for query in queries:
+            route = "lexical" if index.exact_match(query, 3) is not None else "fused"
+            us = per_call_us(lambda: index.exact_match(query, 3) or index.fuse(query, [], 3), args.repeat)
+            print(f"{route:<8} {us:>8.1f}  {query}")
+        return
+
+    instance.query_cache.capacity = 0  # time the encoder, not cache hits
+    print(f"{'route':<8} {'hybrid µs':>10} {'vector µs':>10} {'top-3 overlap':>14}  query")
+    for query in queries:
+        rag.RAG_LEXICAL = True
+        route = "lexical" if instance.lexical_index.exact_match(query, 3) is not None else "fused"
+        hybrid = [hit["id"] for hit in instance.search(query)]
+        hybrid_us = per_call_us(lambda: instance.search(query), args.repeat)
+        rag.RAG_LEXICAL = False
+        vector = [hit["id"] for hit in instance.search(query)]
+        vector_us = per_call_us(lambda: instance.search(query), args.repeat)
+        print(f"{route:<8} {hybrid_us:>10.1f} {vector_us:>10.1f} {len(set(hybrid) & set(vector)):>12}/3  {query}")
+
+
+if __name__ == "__main__":
+    main()
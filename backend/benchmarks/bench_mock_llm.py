@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: mock LLM replies per second, parsing the prompt vs structured context
+"prompt" is what the mock did when it only had the /chat prompt text: regex-parse the summary JSON
+and the question back out of it (parse_prompt) before replying; "context" is mock_llm_response
+given the {"question", "summary"} dict the chat endpoints pass to the providers. Both run over a mix of chat questions per statement size, then the route each
+question takes through llm.MOCK_INTENTS is listed.
+Usage: python benchmarks/bench_mock_llm.py [--rows 100 10000 100000] [--repeat 2000]
+"""
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import llm
+import prompt_context
+import utils
+from synthetic import make_statement
+
+QUESTIONS = [
+    "What is my total income?",
+    "How much did I spend on medical expenses and what can I claim under 80D?",
+    "Which deductions can I claim?",
+    "Show me the tax slabs",
+    "How am I doing financially?",
+    "Who should file ITR-2?",
+    "Can you update my profile?",
+    "Should I keep separate accounts for my business?",
+    "Give me a summary",
+]
+
+
+def chat_prompt(summary_text: str, question: str) -> str:
+    """Same layout as main.start_chat_turn"""
+    return (f"Session summary: {summary_text}\n\nUser question: {question}\n\n"
+            "Provide a helpful answer based on the user's financial data and Indian tax regulations. "
+            "Include specific section numbers (80C, 80D, etc.) when relevant.")
+
+
+def parse_prompt(prompt: str) -> dict:
+    """The {"question", "summary"} context recovered from a flat prompt, as the mock used to"""
+    summary_match = re.search(r'Session summary: ({.*?})\n', prompt, re.DOTALL)
+    summary_data = {}
+    if summary_match:
+        try:
+            summary_data = json.loads(summary_match.group(1))
+        except ValueError:
+            pass
+    question_match = re.search(r'User question: (.*?)(?:\n\n|$)', prompt, re.DOTALL)
+    return {"question": question_match.group(1) if question_match else prompt, "summary": summary_data}
+
+
+def replies_per_second(calls, repeat: int) -> float:
+    for call in calls:
+        call()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for call in calls:
+            call()
+    return repeat * len(calls) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'prompt tokens':>14} {'prompt replies/s':>17} {'context replies/s':>18} {'speedup':>8}")
+    for n in args.rows:
+        summary = utils.parse_csv(io.StringIO(make_statement(n)))
+        aggregates = {key: value for key, value in summary.items() if key != "transactions"}
+        summary_text = prompt_context.build_summary_context(aggregates, summary["transactions"][:prompt_context.PROMPT_TOP_K])
+        prompts = [chat_prompt(summary_text, q) for q in QUESTIONS]
+        contexts = [{"question": q, "summary": aggregates} for q in QUESTIONS]
+
+        for prompt, context in zip(prompts, contexts):
+            if llm.mock_llm_response(prompt, context=parse_prompt(prompt)) != llm.mock_llm_response(prompt, context=context):
+                print(f"⚠️ Replies differ for {context['question']!r} (the prompt summary is trimmed to the token budget)")
+
+        from_prompt = replies_per_second(
+            [lambda p=p: llm.mock_llm_response(p, context=parse_prompt(p)) for p in prompts], args.repeat)
+        from_context = replies_per_second(
+            [lambda p=p, c=c: llm.mock_llm_response(p, context=c) for p, c in zip(prompts, contexts)], args.repeat)
+        print(f"{n:>8} {prompt_context.count_tokens(prompts[0]):>14} {from_prompt:>17,.0f} {from_context:>18,.0f} "
+              f"{from_context / from_prompt:>7.1f}x")
+
+    print(f"\n{'intent':<11} question")
+    for question in QUESTIONS:
+        print(f"{llm.route_intent(question) or 'generic':<11} {question}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /chat prompt size and latency vs statement length
+"full" is the old prompt (the whole summary JSON, every transaction, fed to the mock LLM);
+"compact" is prompt_context (aggregates + top-k relevant rows), measured end to end through /chat.
+Usage: python benchmarks/bench_prompt.py [--rows 100 1000 10000 100000]
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+QUESTION = "How much did I spend on medical expenses and what can I claim under 80D?"
+PROMPT_TEMPLATE = "Session summary: {}\n\nUser question: {}\n\nProvide a helpful answer based on the user's financial data and Indian tax regulations."
+
+
+async def build_prompt(backend, session_id: int) -> str:
+    async with backend.db.AsyncSessionLocal() as db_session:
+        _, prompt, _, _, _, _ = await backend.start_chat_turn(db_session, backend.ChatRequest(session_id=session_id, message=QUESTION))
+    return prompt
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    # Mock LLM, no RAG and no answer cache so every /chat call does the full prompt path
+    os.environ.update({
+        "ENABLE_RAG": "false",
+        "RAG_WARMUP": "off",
+        "ANSWER_CACHE_SIZE": "0",
+        "DATABASE_URL": "sqlite:///./bench_prompt.db",
+    })
+    from fastapi.testclient import TestClient
+    import llm
+    import main as backend
+    import prompt_context
+    import utils
+    from bench_mock_llm import parse_prompt
+    from synthetic import make_statement, remove_database
+
+    print(f"{'rows':>8} {'full tokens':>12} {'compact tokens':>15} {'full ms':>9} {'compact /chat ms':>17}")
+    try:
+        with TestClient(backend.app) as client:
+            for n in args.rows:
+                text = make_statement(n)
+                summary = utils.parse_csv(io.StringIO(text))
+
+                start = time.perf_counter()
+                full_prompt = PROMPT_TEMPLATE.format(json.dumps(summary), QUESTION)
+                llm.mock_llm_response(full_prompt, context=parse_prompt(full_prompt))
+                full_ms = (time.perf_counter() - start) * 1000
+
+                session_id = client.post("/upload", files={"file": ("s.csv", text, "text/csv")}).json()["session_id"]
+                compact_prompt = client.portal.call(build_prompt, backend, session_id)
+
+                start = time.perf_counter()
+                client.post("/chat", json={"session_id": session_id, "message": QUESTION}).raise_for_status()
+                compact_ms = (time.perf_counter() - start) * 1000
+
+                print(f"{n:>8} {prompt_context.count_tokens(full_prompt):>12} {prompt_context.count_tokens(compact_prompt):>15} "
+                      f"{full_ms:>9.1f} {compact_ms:>17.1f}")
+    finally:
+        remove_database("bench_prompt.db")
+
+
+if __name__ == "__main__":
+    main()
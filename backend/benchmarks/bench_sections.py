@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark: deduction totals by section, rescanning transactions per request vs the
+section_totals aggregate computed once at parse time
+Usage: python benchmarks/bench_sections.py [--rows 1000 10000 100000] [--repeat 20]
+"""
+import argparse
+import io
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import tax
+import utils
+from synthetic import make_statement
+
+
+def rescan_sections(transactions) -> dict:
+    """What a per-request answer would do without aggregates: re-tag every deductible row"""
+    totals = {}
+    for t in transactions:
+        if t["category"] != "deductible":
+            continue
+        section = utils.deduction_section(t["description"])
+        totals[section] = totals.get(section, 0.0) + abs(t["amount"])
+    return totals
+
+
+def per_request_ms(fn, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) * 1000 / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'parse s':>9} {'rescan ms/req':>14} {'aggregate ms/req':>17}  match")
+    for n in args.rows:
+        text = make_statement(n)
+        start = time.perf_counter()
+        summary = utils.parse_csv(io.StringIO(text))
+        parse_s = time.perf_counter() - start
+        aggregates = utils.aggregate_summary(summary)
+
+        rescan_ms, rescanned = per_request_ms(lambda: rescan_sections(summary["transactions"]), max(1, args.repeat // 10))
+        aggregate_ms, from_aggregates = per_request_ms(lambda: tax.deductions_from_summary(aggregates), args.repeat)
+
+        match = rescanned.keys() == from_aggregates.keys() and all(
+            math.isclose(rescanned[s], from_aggregates[s], rel_tol=1e-9) for s in rescanned
+        )
+        print(f"{n:>8} {parse_s:>9.3f} {rescan_ms:>14.2f} {aggregate_ms:>17.4f}  {'✅' if match else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark: backend cold start, with an import-time budget
+Runs `python -X importtime -c "import main"` in fresh processes and attributes the self time of
+every imported module to its top-level package. Also times app startup (startup hooks) and the
+first /ready and /upload requests in a fresh process. Fails (exit 1) when `import main` or a
+package goes over benchmarks/startup_budget.json, or imports a package listed there as lazy.
+Usage: python benchmarks/bench_startup.py [--runs 5] [--budget benchmarks/startup_budget.json] [--top 15]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+DB_FILE = "bench_startup.db"
+ENV = {
+    "ENABLE_MOCK_LLM": "true",
+    "RAG_WARMUP": "off",
+    "ANSWER_CACHE_SIZE": "0",
+    "DATABASE_URL": f"sqlite:///./{DB_FILE}",
+}
+
+
+def run_env() -> dict:
+    env = dict(os.environ, **ENV)
+    for var in ("OPENAI_API_KEY", "OLLAMA_HOST"):
+        env.pop(var, None)
+    return env
+
+
+def import_profile() -> dict:
+    """package -> self µs summed over its modules, plus the cumulative µs of main itself"""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                         cwd=BACKEND_DIR, env=run_env(), capture_output=True, text=True, check=True)
+    packages, total = {}, None
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+        if name == "main":
+            total = int(cumulative_us)
+    packages["main"] = total
+    return packages
+
+
+def child():
+    """Fresh interpreter: import, startup hooks, first /ready, first /upload"""
+    sys.path.insert(0, BACKEND_DIR)
+    start = time.perf_counter()
+    import main as backend
+    imported = time.perf_counter()
+    from fastapi.testclient import TestClient
+    from synthetic import make_statement, remove_database
+
+    statement = make_statement(1_000)
+    try:
+        timings = {"import_main_ms": (imported - start) * 1000}
+        start = time.perf_counter()
+        with TestClient(backend.app) as client:
+            timings["startup_ms"] = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            client.get("/ready").raise_for_status()
+            timings["first_ready_ms"] = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            client.post("/upload", files={"file": ("statement.csv", statement, "text/csv")}).raise_for_status()
+            timings["first_upload_ms"] = (time.perf_counter() - start) * 1000
+    finally:
+        remove_database(DB_FILE)
+    print(json.dumps(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", default=BUDGET_PATH)
+    parser.add_argument("--top", type=int, default=15, help="packages to list, most expensive first")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    # medians over fresh processes: the first import after a cold page cache is much slower
+    profiles = [import_profile() for _ in range(args.runs)]
+    packages = {name: float(np.median([p.get(name, 0) for p in profiles])) / 1000 for name in set().union(*profiles)}
+    import_ms = packages.pop("main")
+
+    print(f"import main: {import_ms:.0f} ms (median of {args.runs})\n")
+    print(f"{'package':<24} {'self ms':>9}")
+    for name, ms in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"{name:<24} {ms:>9.1f}")
+
+    runs = []
+    for _ in range(args.runs):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"],
+                             cwd=BACKEND_DIR, env=run_env(), capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print()
+    for key in runs[0]:
+        print(f"{key:<24} {np.median([r[key] for r in runs]):>9.1f}")
+
+    if not os.path.exists(args.budget):
+        return
+    with open(args.budget, encoding="utf-8") as f:
+        budget = json.load(f)
+    failures = []
+    if import_ms > budget["import_main_ms"]:
+        failures.append(f"import main took {import_ms:.0f} ms (budget {budget['import_main_ms']} ms)")
+    for name, limit in budget.get("packages_ms", {}).items():
+        if packages.get(name, 0) > limit:
+            failures.append(f"{name} took {packages[name]:.0f} ms (budget {limit} ms)")
+    for name in budget.get("lazy", []):
+        if name in packages:
+            failures.append(f"{name} is imported by `import main` but should load lazily")
+    if failures:
+        print("\n❌ Over the startup budget:\n" + "\n".join(f"  - {f}" for f in failures))
+        sys.exit(1)
+    print(f"\n✅ Within the startup budget in {os.path.relpath(args.budget, BACKEND_DIR)}")
+
+
+if __name__ == "__main__":
+    main()
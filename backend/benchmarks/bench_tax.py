@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tax engine latency
+compute_tax (both regimes) and answer_tax_question (intent match + compute + formatting),
+with the per-FY rule table cached vs reloaded from JSON on every call.
+Usage: python benchmarks/bench_tax.py [--iterations 20000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+AGGREGATES = {
+    "total_income": 1_850_000.0,
+    "total_expenses": 920_000.0,
+    "potential_deductions": 210_000.0,
+    "monthly": {"2025-03": {}, "2025-06": {}},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+    import tax
+
+    deductions = {"80C": 150_000, "80D": 30_000, "24(b)": 250_000}
+    cases = {
+        "compute_tax (cached rules)": lambda: tax.compute_tax(1_850_000, deductions, "2025-26"),
+        "compute_tax (rules reloaded)": lambda: (tax.load_rules.cache_clear(), tax.compute_tax(1_850_000, deductions, "2025-26")),
+        "answer_tax_question": lambda: tax.answer_tax_question("Which regime is better for me?", AGGREGATES),
+        "answer_tax_question (no match)": lambda: tax.answer_tax_question("What is GST on restaurants?", AGGREGATES),
+    }
+    print(f"{'case':<32} {'µs/call':>9}")
+    for name, fn in cases.items():
+        seconds = timeit.timeit(fn, number=args.iterations)
+        print(f"{name:<32} {seconds / args.iterations * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak RSS of CSV ingestion, whole-file vs chunked vs streamed (the /upload path)
+Each measurement runs in a fresh subprocess so ru_maxrss is not polluted by earlier runs.
+Usage: python benchmarks/bench_upload_memory.py [--rows 100000 500000] [--chunksize 50000]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+MODES = {
+    "whole": "read()+decode+StringIO, parse_csv (old /upload path)",
+    "chunked": "parse_csv(path, chunksize) - keeps classified rows",
+    "stream": "stream_csv(path, chunksize) - rows handed off per chunk, 1000-row preview kept (/upload)",
+    "totals": "iter_csv_chunks(path) - totals only, rows dropped per chunk",
+}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_child(mode: str, path: str, chunksize: int):
+    import utils
+
+    baseline = peak_rss_mb()
+    if mode == "whole":
+        with open(path, "rb") as f:
+            contents = f.read()
+        summary = utils.parse_csv(StringIO(contents.decode("utf-8")))
+    elif mode == "chunked":
+        summary = utils.parse_csv(path, chunksize=chunksize)
+    elif mode == "stream":
+        summary = utils.stream_csv(path, chunksize, lambda rows: None, preview=1000)
+    else:
+        total = 0.0
+        for part in utils.iter_csv_chunks(path, chunksize):
+            total += part["total_income"]
+    print(f"{baseline:.1f} {peak_rss_mb():.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 500_000])
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1], args.chunksize)
+        return
+
+    from synthetic import write_statement
+
+    print(f"{'rows':>9} {'file MB':>8} {'mode':>8} {'peak RSS MB':>12} {'delta MB':>9}")
+    for n in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_statement(os.path.join(tmp, "statement.csv"), n)
+            file_mb = os.path.getsize(path) / (1024 * 1024)
+            for mode in MODES:
+                out = subprocess.run(
+                    [sys.executable, __file__, "--chunksize", str(args.chunksize), "--child", mode, path],
+                    capture_output=True, text=True, check=True, cwd=BACKEND_DIR,
+                ).stdout.split()
+                baseline, peak = float(out[-2]), float(out[-1])
+                print(f"{n:>9} {file_mb:>8.1f} {mode:>8} {peak:>12.1f} {peak - baseline:>9.1f}")
+    print()
+    for mode, desc in MODES.items():
+        print(f"  {mode:>8}: {desc}")
+
+
+if __name__ == "__main__":
+    main()
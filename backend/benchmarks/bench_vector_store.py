@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: NumPy vs Chroma vector store, on synthetic embeddings
+Per backend and index size: build time, cold start (a fresh process opening the persisted
+index and answering one query) and per-query latency. When both backends run, recall@k of
+Chroma's approximate HNSW results against the exact NumPy top-k is reported too.
+Usage: python benchmarks/bench_vector_store.py [--chunks 300 3000 30000] [--dim 768] [--queries 200]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+import vector_store
+
+BACKENDS = ["numpy", "chroma"]
+TOP_K = 3
+
+
+def synthetic_index(n: int, dim: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.normal(size=(n, dim)).astype(np.float32)
+    # unit length, so Chroma's L2 ranking and the NumPy cosine ranking agree on exact results
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    ids = [f"chunk-{i}" for i in range(n)]
+    documents = [f"synthetic chunk {i}" for i in range(n)]
+    metadatas = [{"source": f"file-{i % 10}.md", "chunk_id": i} for i in range(n)]
+    return ids, embeddings, documents, metadatas
+
+
+def cold_start(backend: str, path: str, dim: int) -> dict:
+    """Open the persisted index and answer one query in a new interpreter"""
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", backend, path, str(dim)],
+        capture_output=True, text=True, check=True, cwd=BACKEND_DIR,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def child(backend: str, path: str, dim: int):
+    start = time.perf_counter()
+    store = vector_store.open_store(backend, path, "bench")
+    opened = time.perf_counter()
+    store.query(np.ones((1, dim), dtype=np.float32), TOP_K)
+    done = time.perf_counter()
+    print(json.dumps({"open_ms": (opened - start) * 1000, "first_query_ms": (done - opened) * 1000}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[300, 3_000, 30_000])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child[0], args.child[1], int(args.child[2]))
+        return
+
+    backends = []
+    for backend in args.backends:
+        if backend == "chroma":
+            try:
+                import chromadb  # noqa: F401
+            except ImportError:
+                print("⚠️ Skipping chroma: chromadb is not installed")
+                continue
+        backends.append(backend)
+
+    queries = np.random.default_rng(1).normal(size=(args.queries, args.dim)).astype(np.float32)
+    print(f"{'backend':<8} {'chunks':>7} {'build s':>8} {'open ms':>9} {'1st query ms':>13} "
+          f"{'query p50 ms':>13} {'query p95 ms':>13} {'recall@' + str(TOP_K):>9}")
+    for n in args.chunks:
+        ids, embeddings, documents, metadatas = synthetic_index(n, args.dim)
+        exact = None
+        for backend in backends:
+            path = tempfile.mkdtemp(prefix=f"bench_{backend}_")
+            try:
+                store = vector_store.open_store(backend, path, "bench")
+                start = time.perf_counter()
+                for i in range(0, n, 5_000):  # Chroma caps the batch size of one add
+                    store.add(ids[i:i + 5_000], embeddings[i:i + 5_000], documents[i:i + 5_000], metadatas[i:i + 5_000])
+                build_s = time.perf_counter() - start
+                del store
+
+                cold = cold_start(backend, path, args.dim)
+
+                store = vector_store.open_store(backend, path, "bench")
+                times, results = [], []
+                for q in queries:
+                    start = time.perf_counter()
+                    results.append([r["content"] for r in store.query(q[None, :], TOP_K)[0]])
+                    times.append(time.perf_counter() - start)
+                times_ms = np.array(times) * 1000
+
+                if backend == "numpy":
+                    exact = results
+                recall = ""
+                if exact is not None:
+                    hits = sum(len(set(got) & set(want)) for got, want in zip(results, exact))
+                    recall = f"{hits / (TOP_K * len(exact)):.3f}"
+                print(f"{backend:<8} {n:>7} {build_s:>8.2f} {cold['open_ms']:>9.1f} {cold['first_query_ms']:>13.2f} "
+                      f"{np.percentile(times_ms, 50):>13.3f} {np.percentile(times_ms, 95):>13.3f} {recall:>9}")
+            finally:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
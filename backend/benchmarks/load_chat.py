@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Load test: N concurrent /chat requests against a local stub Ollama server
+The stub sleeps --latency seconds per generation, like a real model would.
+"blocking" replays the old handler (sync requests.post inside the event loop);
+"async" goes through /chat on the pooled async provider layer.
+Usage: python benchmarks/load_chat.py [--concurrency 1 8 32 64] [--latency 0.2]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_stub_ollama(port: int, latency: float):
+    """Minimal /api/generate in a background uvicorn thread"""
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    async def generate(request):
+        await request.json()
+        await asyncio.sleep(latency)
+        return JSONResponse({"response": "Section 80C allows deductions up to ₹1.5 lakh.", "done": True})
+
+    app = Starlette(routes=[Route("/api/generate", generate, methods=["POST"])])
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_blocking(llm, n: int, concurrency: int):
+    async def one():
+        # What the old async handler did: a blocking call on the event loop thread
+        question = "How much can I save under 80C?"
+        llm.ask_llm_with_rag(question, use_rag=False, context={"question": question, "summary": {}})
+
+    await gather_limited(one, n, concurrency)
+
+
+async def run_async(app, n: int, concurrency: int):
+    import httpx
+    import db as app_db
+    import models
+
+    # ASGITransport never runs the startup hooks, so create the tables main.create_tables would
+    models.Base.metadata.create_all(bind=app_db.engine)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def one():
+            r = await client.post("/chat", json={"session_id": None, "message": "How much can I save under 80C?"})
+            r.raise_for_status()
+
+        await gather_limited(one, n, concurrency)
+    # the async DB pool is bound to this event loop; the next run starts a new one
+    await app_db.async_engine.dispose()
+
+
+async def gather_limited(fn, n: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def guarded():
+        async with sem:
+            await fn()
+
+    await asyncio.gather(*(guarded() for _ in range(n)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--requests", type=int, default=128)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    port = free_port()
+    start_stub_ollama(port, args.latency)
+
+    # Configure before llm/main read their settings at import time
+    os.environ.update({
+        "OLLAMA_HOST": f"http://127.0.0.1:{port}",
+        "ENABLE_RAG": "false",
+        "RAG_WARMUP": "off",
+        "DATABASE_URL": "sqlite:///./load_chat_bench.db",
+    })
+    import llm
+    import main as backend
+    from synthetic import remove_database
+
+    print(f"stub latency {args.latency * 1000:.0f} ms, {args.requests} requests per run")
+    print(f"{'concurrency':>11} {'blocking req/s':>15} {'async req/s':>12}")
+    try:
+        for c in args.concurrency:
+            n_blocking = min(args.requests, 16)  # serialised, so keep the run short
+            start = time.perf_counter()
+            asyncio.run(run_blocking(llm, n_blocking, c))
+            blocking_rps = n_blocking / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            asyncio.run(run_async(backend.app, args.requests, c))
+            async_rps = args.requests / (time.perf_counter() - start)
+            print(f"{c:>11} {blocking_rps:>15.1f} {async_rps:>12.1f}")
+    finally:
+        remove_database("load_chat_bench.db")
+
+
+if __name__ == "__main__":
+    main()
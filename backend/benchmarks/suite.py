@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: ingestion, retrieval and chat hot paths, offline with the mock LLM
+Cases: utils.parse_csv and /upload per statement size, classify_description, IndianTaxRAG.search
+(skipped when the RAG dependencies are missing), /summary and /chat through the ASGI test client.
+Each case records p50/p95 latency, throughput and peak traced memory; --save writes them to a
+JSON baseline and --compare fails (exit 1) when a case regresses past --tolerance.
+Usage: python benchmarks/suite.py [--rows 1000 10000 100000] [--save benchmarks/baseline.json]
+       python benchmarks/suite.py --compare benchmarks/baseline.json [--tolerance 0.25]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+DB_FILE = "bench_suite.db"
+CHAT_QUESTIONS = [
+    "How much tax do I owe?",
+    "What deductions do I have?",
+    "What can I claim under 80D?",
+    "How much did I spend this year?",
+    "Give me a summary of my finances",
+    "What are the new regime tax slabs?",
+]
+RAG_QUERIES = [
+    "What is the limit for Section 80C?",
+    "How is HRA exemption calculated?",
+    "Which ITR form should a salaried person file?",
+    "GST rate on restaurant food",
+    "Deduction for health insurance of senior citizen parents",
+    "Is interest on education loan deductible?",
+]
+
+
+def measure(fn, repeat: int, items: int = 1, unit: str = "calls/s", warmup: int = 1) -> dict:
+    """Latency percentiles over repeat calls, items/s at the median, and peak traced memory of one extra call"""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    # tracemalloc slows allocation-heavy code down, so memory gets its own untimed run
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    times_ms = np.array(times) * 1000
+    return {
+        "runs": repeat,
+        "p50_ms": round(float(np.percentile(times_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(times_ms, 95)), 3),
+        "throughput": round(items / (float(np.median(times_ms)) / 1000), 1),
+        "unit": unit,
+        "peak_mb": round(peak / 2**20, 2),
+    }
+
+
+def repeats_for(rows: int, base: int) -> int:
+    """Fewer repeats for big statements so a 1M-row run stays in minutes"""
+    return max(3, min(base, base * 10_000 // max(rows, 1)))
+
+
+def bench_parsing(results: dict, rows: list, repeat: int):
+    import utils
+    from synthetic import load_sample_rows, make_statement
+
+    for n in rows:
+        text = make_statement(n)
+        results[f"parse_csv[{n}]"] = measure(lambda: utils.parse_csv(io.StringIO(text)), repeats_for(n, repeat), n, "rows/s")
+        results[f"parse_csv_chunked[{n}]"] = measure(
+            lambda: utils.parse_csv(io.StringIO(text), chunksize=50_000), repeats_for(n, repeat), n, "rows/s"
+        )
+
+    sample = load_sample_rows()
+    batch = [sample[i % len(sample)] for i in range(1_000)]
+
+    def classify_batch():
+        for desc, amount in batch:
+            utils.classify_description(desc, amount)
+
+    results["classify_description[x1000]"] = measure(classify_batch, repeat * 4, len(batch), "calls/s")
+
+
+def bench_rag(results: dict, repeat: int):
+    try:
+        import rag
+        instance = rag.get_rag()
+    except Exception as e:
+        print(f"⚠️ Skipping IndianTaxRAG.search: {e}")
+        return
+    instance.query_cache.capacity = 0  # measure encoding + vector query, not cache hits
+    queries = iter(RAG_QUERIES * (repeat * 4 + 10))
+    results["rag_search"] = measure(lambda: instance.search(next(queries)), repeat * 4, 1, "queries/s")
+
+
+def bench_api(results: dict, rows: list, repeat: int):
+    from fastapi.testclient import TestClient
+    import main as backend
+    from synthetic import make_statement
+
+    with TestClient(backend.app) as client:
+        session_id = None
+        for n in rows:
+            text = make_statement(n)
+
+            def upload():
+                nonlocal session_id
+                r = client.post("/upload", files={"file": ("statement.csv", text, "text/csv")})
+                r.raise_for_status()
+                session_id = r.json()["session_id"]
+
+            results[f"upload[{n}]"] = measure(upload, repeats_for(n, repeat), n, "rows/s")
+
+        # /summary and /chat run against the largest statement uploaded above
+        def summary():
+            client.get("/summary", params={"session_id": session_id}).raise_for_status()
+
+        results["summary"] = measure(summary, repeat * 20, 1, "req/s")
+
+        questions = iter(CHAT_QUESTIONS * (repeat * 40 + 10))
+
+        def chat():
+            client.post("/chat", json={"session_id": session_id, "message": next(questions)}).raise_for_status()
+
+        results["chat"] = measure(chat, repeat * 20, 1, "req/s")
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Print per-case deltas against the baseline; False if any case regressed"""
+    ok = True
+    print(f"\n{'case':<32} {'p95 ms':>18} {'throughput':>24} {'peak MB':>16}")
+    for name, base in baseline["results"].items():
+        cur = results.get(name)
+        if cur is None:
+            print(f"{name:<32} {'(not run)':>18}")
+            continue
+        regressions = []
+        if cur["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append("p95")
+        if cur["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append("throughput")
+        if cur["peak_mb"] > base["peak_mb"] * (1 + tolerance) + 1:
+            regressions.append("memory")
+        ok = ok and not regressions
+        print(f"{name:<32} {base['p95_ms']:>8.2f} → {cur['p95_ms']:<8.2f} "
+              f"{base['throughput']:>11.0f} → {cur['throughput']:<11.0f} "
+              f"{base['peak_mb']:>6.1f} → {cur['peak_mb']:<6.1f} {'❌ ' + ', '.join(regressions) if regressions else '✅'}")
+    return ok
+
+
+def git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True)
+        return out.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="statement sizes for parse_csv and /upload (up to 1000000)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", choices=["parsing", "rag", "api"], default=["parsing", "rag", "api"])
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression (default 0.25)")
+    args = parser.parse_args()
+
+    # Offline and deterministic: mock LLM, no answer cache, no RAG inside /chat, sync uploads only
+    for var in ("OPENAI_API_KEY", "OLLAMA_HOST"):
+        os.environ.pop(var, None)
+    os.environ.update({
+        "ENABLE_MOCK_LLM": "true",
+        "ENABLE_RAG": "false",
+        "RAG_WARMUP": "off",
+        "ANSWER_CACHE_SIZE": "0",
+        "UPLOAD_BACKGROUND_MB": "1024",
+        "MAX_UPLOAD_MB": "1024",
+        "DATABASE_URL": f"sqlite:///./{DB_FILE}",
+    })
+    from synthetic import remove_database
+
+    results = {}
+    try:
+        if "parsing" in args.only:
+            bench_parsing(results, args.rows, args.repeat)
+        if "rag" in args.only:
+            bench_rag(results, args.repeat)
+        if "api" in args.only:
+            bench_api(results, args.rows, args.repeat)
+    finally:
+        remove_database(DB_FILE)
+
+    print(f"{'case':<32} {'p50 ms':>10} {'p95 ms':>10} {'throughput':>20} {'peak MB':>9}")
+    for name, r in results.items():
+        print(f"{name:<32} {r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f} {r['throughput']:>11.0f} {r['unit']:<8} {r['peak_mb']:>9.1f}")
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "rows": args.rows,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\n✅ Baseline written to {args.save}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.tolerance):
+            print(f"\n❌ Regressions beyond {args.tolerance:.0%} of {args.compare}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} of {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Synthetic bank statement generator for benchmarks
+Scales sample_indian_statement.csv up to any number of rows
+"""
+import csv
+import io
+import os
+import random
+from datetime import date, timedelta
+from typing import List, Tuple
+
+SAMPLE_CSV = os.path.join(os.path.dirname(__file__), "..", "..", "sample_indian_statement.csv")
+
+
+def load_sample_rows(path: str = SAMPLE_CSV) -> List[Tuple[str, float]]:
+    """(description, amount) pairs from the sample statement"""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [(row["description"], float(row["amount"])) for row in csv.DictReader(f)]
+
+
+def iter_rows(n_rows: int, seed: int = 42):
+    """Yield n_rows (date, description, amount) tuples with jittered amounts"""
+    rng = random.Random(seed)
+    sample = load_sample_rows()
+    start = date(2024, 4, 1)
+    for i in range(n_rows):
+        desc, amount = sample[i % len(sample)]
+        day = start + timedelta(days=(i * 365) // max(n_rows, 1))
+        jitter = round(amount * rng.uniform(0.8, 1.2), 2)
+        yield day.isoformat(), f"{desc} #{i}", jitter
+
+
+def write_statement(path: str, n_rows: int, seed: int = 42) -> str:
+    """Write a synthetic statement CSV to path and return the path"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["date", "description", "amount"])
+        writer.writerows(iter_rows(n_rows, seed))
+    return path
+
+
+def make_statement(n_rows: int, seed: int = 42) -> str:
+    """Synthetic statement as CSV text"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["date", "description", "amount"])
+    writer.writerows(iter_rows(n_rows, seed))
+    return buf.getvalue()
+
+
+def remove_database(path: str):
+    """Delete a benchmark SQLite file and its WAL/shared-memory sidecars"""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
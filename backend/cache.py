@@ -0,0 +1,136 @@
+"""
+Answer cache for repeated tax questions
+Exact tier keyed on the normalized question + a hash of the session aggregates and the
+conversation history in the prompt, optional semantic tier matching paraphrases by embedding cosine similarity.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(re.sub(r"[^\w\s]", " ", question.lower()).split())
+
+
+def context_key(summary_text: Optional[str], history_text: Optional[str] = None) -> str:
+    """Stable hash of what an answer depends on besides the question: the session's summary
+    aggregates and the conversation history in the prompt, so a follow-up ("what about the
+    second one?") only hits answers given after the same conversation"""
+    digest = hashlib.sha1((summary_text or "").encode("utf-8"))
+    digest.update(b"\0" + (history_text or "").encode("utf-8"))
+    return digest.hexdigest()
+
+
+class AnswerCache:
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        embed: Optional[Callable[[str], np.ndarray]] = None,
+        similarity_threshold: float = 0.92,
+    ):
+        """embed enables the semantic tier; it must return one vector per question. It gets the
+        question as asked, the text retrieval embeds, so both can share one query-embedding cache"""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold
+        # (context, normalized question) -> (answer, expires_at, unit embedding or None)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _embed(self, question: str) -> Optional[np.ndarray]:
+        if self.embed is None:
+            return None
+        try:
+            vec = np.asarray(self.embed(question), dtype=np.float32)
+        except Exception as e:
+            print(f"⚠️ Answer cache embedding failed: {e}")
+            return None
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else None
+
+    def get(self, question: str, context: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        key = (context, normalize_question(question))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+            if self.embed is None:
+                self.misses += 1
+                return None
+
+        # Semantic tier: encode outside the lock, then compare against same-context entries
+        vec = self._embed(question)
+        with self._lock:
+            candidates = [
+                (k, e) for k, e in self._entries.items()
+                if k[0] == context and e[2] is not None and e[1] > now
+            ]
+            if vec is not None and candidates:
+                scores = np.stack([e[2] for _, e in candidates]) @ vec
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity_threshold:
+                    best_key = candidates[best][0]
+                    self._entries.move_to_end(best_key)
+                    self.hits += 1
+                    self.semantic_hits += 1
+                    return candidates[best][1][0]
+            self.misses += 1
+            return None
+
+    def put(self, question: str, context: str, answer: str):
+        if not self.enabled:
+            return
+        normalized = normalize_question(question)
+        vec = self._embed(question)
+        with self._lock:
+            key = (context, normalized)
+            self._entries[key] = (answer, time.monotonic() + self.ttl_seconds, vec)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry, e.g. after the knowledge base is rebuilt"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "semantic": self.embed is not None,
+            }
@@ -1,11 +1,80 @@
-from sqlalchemy import create_engine
+import asyncio
+import contextlib
+import threading
+import weakref
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./taxease.db")
+# Async driver for the request handlers; derived from DATABASE_URL unless set explicitly
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg"}
+
+
+def async_url(url: str) -> str:
+    """DATABASE_URL with its sync driver (if any, e.g. postgresql+psycopg2) swapped for the async one"""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(
+            f"No async driver known for {scheme!r} URLs (supported: {', '.join(ASYNC_DRIVERS)}); "
+            "set ASYNC_DATABASE_URL explicitly"
+        )
+    return ASYNC_DRIVERS[dialect] + sep + rest
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_url(DATABASE_URL)
+
+# Connection pool (QueuePool for Postgres and file-backed SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# SQLite only: WAL lets readers proceed while a writer commits; NORMAL skips the fsync per commit
+SQLITE_WAL = os.getenv("SQLITE_WAL", "true").lower() == "true"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+is_sqlite = DATABASE_URL.startswith("sqlite")
+is_memory = is_sqlite and (":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") == "sqlite:")
+
+engine_kwargs = {}
+if is_sqlite:
+    engine_kwargs["connect_args"] = {"check_same_thread": False}
+else:
+    # server connections can drop while idle; a local SQLite file can't
+    engine_kwargs["pool_pre_ping"] = True
+if not is_memory:
+    engine_kwargs.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+
+# Sync engine: init_db.py, background job threads
+engine = create_engine(DATABASE_URL, **engine_kwargs)
+# Async engine: request handlers, so queries never block the event loop
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **{k: v for k, v in engine_kwargs.items() if k != "connect_args"}
+)
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    if SQLITE_WAL and not is_memory:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+if is_sqlite:
+    event.listen(engine, "connect", _sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 def get_db():
@@ -14,3 +83,48 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+_write_locks = weakref.WeakKeyDictionary()  # event loop -> asyncio.Lock
+# Held for the duration of every SQLite write transaction, by handlers and job worker threads alike
+_thread_write_lock = threading.Lock()
+WRITE_LOCK_POLL_SECONDS = 0.002
+
+
+@contextlib.asynccontextmanager
+async def _write_transaction(lock: asyncio.Lock):
+    async with lock:
+        # only the head of the loop's queue polls for the job workers' turn; polling (not a thread
+        # blocked in acquire) leaves nothing holding the lock if the request is cancelled
+        while not _thread_write_lock.acquire(blocking=False):
+            await asyncio.sleep(WRITE_LOCK_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            _thread_write_lock.release()
+
+
+def write_lock():
+    """Async context manager around a write transaction.
+
+    SQLite allows one writer at a time; queueing writers here is much cheaper than
+    letting them sleep in SQLite's busy handler. Shared with sync_write_lock, so handler
+    and job worker writes are serialized together. A no-op on other databases.
+    """
+    if not is_sqlite:
+        return contextlib.nullcontext()
+    loop = asyncio.get_running_loop()
+    lock = _write_locks.get(loop)
+    if lock is None:
+        lock = _write_locks[loop] = asyncio.Lock()
+    return _write_transaction(lock)
+
+
+def sync_write_lock():
+    """write_lock for worker threads on the sync engine: hold it from a transaction's first write to its commit"""
+    if not is_sqlite:
+        return contextlib.nullcontext()
+    return _thread_write_lock
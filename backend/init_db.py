@@ -4,8 +4,11 @@ Database initialization script for TaxEase AI
 Run this to create/reset the database tables
 """
 import os
-from db import engine, Base
-from models import Session, Message, Summary
+import json
+from sqlalchemy import inspect, text, update
+from db import engine, Base, SessionLocal
+from models import Session, Message, Summary, Transaction, Job, ChatMemory
+import utils
 
 def init_database():
     """Create all database tables"""
@@ -34,10 +37,113 @@ def reset_database():
     else:
         print("❌ Reset cancelled")
 
+def migrate_summaries():
+    """Move transactions embedded in legacy Summary.data JSON into the transactions table"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    migrated = 0
+    try:
+        for summ in db.query(Summary).all():
+            data = json.loads(summ.data or "{}")
+            if "transactions" not in data:
+                continue
+            rows = data.pop("transactions")
+            db.query(Transaction).filter(Transaction.session_id == summ.session_id).delete(synchronize_session=False)
+            if rows:
+                db.execute(Transaction.__table__.insert(), [dict(r, session_id=summ.session_id) for r in rows])
+            data["transaction_count"] = len(rows)
+            summ.data = json.dumps(data)
+            migrated += 1
+        db.commit()
+    finally:
+        db.close()
+    print(f"✅ Migrated {migrated} summaries to the transactions table")
+
+def migrate_indexes():
+    """Create indexes added after a table already existed (create_all skips existing tables)"""
+    Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    print("✅ Indexes up to date (messages: session_id + timestamp)")
+
+def migrate_columns():
+    """Add columns introduced after a table already existed (create_all skips existing tables)"""
+    Base.metadata.create_all(bind=engine)
+    existing = {c["name"] for c in inspect(engine).get_columns("transactions")}
+    if "section" not in existing:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE transactions ADD COLUMN section VARCHAR"))
+    existing = {c["name"] for c in inspect(engine).get_columns("jobs")}
+    with engine.begin() as conn:
+        if "owner" not in existing:
+            conn.execute(text("ALTER TABLE jobs ADD COLUMN owner VARCHAR"))
+        if "heartbeat_at" not in existing:
+            conn.execute(text("ALTER TABLE jobs ADD COLUMN heartbeat_at TIMESTAMP"))
+    print("✅ Columns up to date (transactions: section; jobs: owner, heartbeat_at)")
+
+def migrate_sections():
+    """Tag existing deductible transactions with their section and store section_totals per summary"""
+    db = SessionLocal()
+    tagged = 0
+    try:
+        for summ in db.query(Summary).all():
+            rows = (
+                db.query(Transaction.id, Transaction.description, Transaction.amount)
+                .filter(Transaction.session_id == summ.session_id, Transaction.category == "deductible")
+                .all()
+            )
+            totals = {}
+            updates = []
+            for row_id, description, amount in rows:
+                section = utils.deduction_section(description)
+                updates.append({"id": row_id, "section": section})
+                into = totals.setdefault(section, {"count": 0, "amount": 0.0})
+                into["count"] += 1
+                into["amount"] += abs(amount)
+            if updates:
+                db.execute(update(Transaction), updates)
+            data = json.loads(summ.data or "{}")
+            data["section_totals"] = totals
+            summ.data = json.dumps(data)
+            tagged += len(updates)
+        db.commit()
+    finally:
+        db.close()
+    print(f"✅ Tagged {tagged} deductible transactions with their section")
+
+def migrate_dates():
+    """Rewrite transaction dates stored as they appeared in the statement (DD/MM/YYYY, DD-MMM-YY) as YYYY-MM-DD"""
+    import pandas as pd
+
+    db = SessionLocal()
+    rewritten = 0
+    try:
+        rows = db.query(Transaction.id, Transaction.date).all()
+        if rows:
+            ids, dates = zip(*rows)
+            dates = pd.Series(dates, dtype=object)
+            iso = utils.iso_dates(dates)
+            changed = (iso != dates) & iso.notna()
+            updates = [{"id": ids[i], "date": iso[i]} for i in changed[changed].index]
+            if updates:
+                db.execute(update(Transaction), updates)
+            rewritten = len(updates)
+        db.commit()
+    finally:
+        db.close()
+    print(f"✅ Normalized {rewritten} transaction dates to YYYY-MM-DD")
+
 if __name__ == "__main__":
     import sys
     
     if len(sys.argv) > 1 and sys.argv[1] == '--reset':
         reset_database()
+    elif len(sys.argv) > 1 and sys.argv[1] == '--migrate':
+        migrate_columns()
+        migrate_indexes()
+        migrate_summaries()
+        migrate_sections()
+        migrate_dates()
     else:
         init_database()
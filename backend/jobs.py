@@ -0,0 +1,233 @@
+"""
+Background ingestion jobs
+Jobs are rows in the jobs table, so queued and interrupted work survives a restart;
+a fixed pool of worker threads runs at most JOB_WORKERS of them at a time. A running job
+records its owner and a heartbeat, and only jobs whose heartbeat has gone stale are taken
+over, so several processes can share the table.
+"""
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import db
+import models
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "100"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_SPOOL_DIR = os.getenv("JOB_SPOOL_DIR", "./uploads")
+# Minimum seconds between progress writes, so small chunks don't hammer the DB
+JOB_PROGRESS_INTERVAL = float(os.getenv("JOB_PROGRESS_INTERVAL", "0.5"))
+# A running job whose heartbeat is older than this is presumed dead and re-queued
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "300"))
+# How often each process looks for stale jobs, whether or not its workers are busy
+JOB_RECLAIM_INTERVAL = float(os.getenv("JOB_RECLAIM_INTERVAL", "60"))
+
+
+class QueueFull(Exception):
+    pass
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class JobQueue:
+    def __init__(self, handlers: Dict[str, Callable], workers: int = JOB_WORKERS):
+        """handlers maps a job kind to fn(job, report) -> result dict,
+        where report(rows_processed, bytes_processed) records progress"""
+        self.handlers = handlers
+        self.workers = max(workers, 1)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._threads = []
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Start the workers and enqueue queued jobs, plus running ones whose owner stopped heartbeating"""
+        if self._threads:
+            return
+        self._reclaim_stale()
+        db_session = db.SessionLocal()
+        try:
+            J = models.Job
+            pending = [job_id for (job_id,) in db_session.query(J.id).filter(J.status == "queued").order_by(J.created_at)]
+        finally:
+            db_session.close()
+        for job_id in pending:
+            self._queue.put(job_id)
+        self._stopping.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._reclaimer, name="job-reclaimer", daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def stop(self, timeout: float = 5.0):
+        """Ask workers to exit after their current job; unfinished jobs resume on next start"""
+        self._stopping.set()
+        for _ in range(self.workers):
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def submit(self, kind: str, file_path: str, filename: str, session_id: Optional[int] = None) -> str:
+        """Persist a queued job for a spooled file and hand it to the workers; the caller holds the DB write lock"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        db_session = db.SessionLocal()
+        try:
+            J = models.Job
+            backlog = db_session.query(J).filter(J.status.in_(["queued", "running"])).count()
+            if backlog >= JOB_MAX_QUEUED:
+                raise QueueFull(f"{backlog} jobs already pending")
+            job = J(
+                id=uuid.uuid4().hex,
+                kind=kind,
+                status="queued",
+                filename=filename,
+                file_path=file_path,
+                session_id=session_id,
+                total_bytes=os.path.getsize(file_path),
+            )
+            db_session.add(job)
+            db_session.commit()
+            job_id = job.id
+        finally:
+            db_session.close()
+        self._queue.put(job_id)
+        return job_id
+
+    def _reclaim_stale(self) -> List[str]:
+        """Re-queue running jobs with no heartbeat for JOB_STALE_SECONDS (their process died); returns their ids.
+
+        Jobs another live process is running keep heartbeating and are left alone.
+        """
+        J = models.Job
+        cutoff = datetime.fromtimestamp(time.time() - JOB_STALE_SECONDS, timezone.utc)
+        db_session = db.SessionLocal()
+        try:
+            stale = (J.status == "running") & (J.heartbeat_at.is_(None) | (J.heartbeat_at < cutoff))
+            ids = [job_id for (job_id,) in db_session.query(J.id).filter(stale)]
+            if ids:
+                # the status/heartbeat condition again, in case the owner heartbeated since the select
+                with db.sync_write_lock():
+                    db_session.query(J).filter(J.id.in_(ids), stale).update(
+                        {J.status: "queued", J.owner: None}, synchronize_session=False
+                    )
+                    db_session.commit()
+        finally:
+            db_session.close()
+        if ids:
+            print(f"🔁 Resuming {len(ids)} interrupted job(s)")
+        return ids
+
+    def _claim(self, db_session, job_id: str) -> Optional[models.Job]:
+        """Atomically move a queued job to running, so a job is never run twice"""
+        J = models.Job
+        now = _now()
+        with db.sync_write_lock():
+            claimed = (
+                db_session.query(J)
+                .filter(J.id == job_id, J.status == "queued")
+                .update({J.status: "running", J.started_at: now, J.heartbeat_at: now, J.owner: self.owner,
+                         J.attempts: J.attempts + 1}, synchronize_session=False)
+            )
+            db_session.commit()
+        return db_session.get(J, job_id) if claimed else None
+
+    def _reclaimer(self):
+        """Every JOB_RECLAIM_INTERVAL, re-queue jobs orphaned by a process that died while this one kept running"""
+        while not self._stopping.wait(JOB_RECLAIM_INTERVAL):
+            try:
+                for job_id in self._reclaim_stale():
+                    self._queue.put(job_id)
+            except Exception as e:
+                print(f"❌ Job reclaim error: {e}")
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            try:
+                self._run(job_id)
+            except Exception as e:
+                print(f"❌ Job worker error on {job_id}: {e}")
+
+    def _run(self, job_id: str):
+        db_session = db.SessionLocal()
+        try:
+            job = self._claim(db_session, job_id)
+            if job is None:
+                return
+            if job.attempts > JOB_MAX_ATTEMPTS:
+                self._finish(db_session, job, error=f"Gave up after {JOB_MAX_ATTEMPTS} attempts")
+                return
+
+            last_write = 0.0
+
+            def report(rows: int, bytes_done: int):
+                nonlocal last_write
+                job.rows_processed = rows
+                job.bytes_processed = bytes_done
+                if time.monotonic() - last_write >= JOB_PROGRESS_INTERVAL:
+                    job.heartbeat_at = _now()
+                    with db.sync_write_lock():
+                        db_session.commit()
+                    last_write = time.monotonic()
+
+            try:
+                result = self.handlers[job.kind](job, report)
+            except Exception as e:
+                db_session.rollback()
+                self._finish(db_session, job, error=str(e))
+                return
+            self._finish(db_session, job, result=result)
+        finally:
+            db_session.close()
+
+    def _finish(self, db_session, job: models.Job, result: Optional[Dict] = None, error: Optional[str] = None):
+        job.status = "failed" if error else "done"
+        job.error = error
+        job.result = json.dumps(result) if result is not None else None
+        if result is not None:
+            job.bytes_processed = job.total_bytes
+            job.session_id = result.get("session_id", job.session_id)
+        job.finished_at = _now()
+        with db.sync_write_lock():
+            db_session.commit()
+        if job.file_path and os.path.exists(job.file_path):
+            os.unlink(job.file_path)
+
+
+def job_status(job: models.Job) -> Dict:
+    """Public view of a job: progress, ETA from bytes read so far, and the result when done"""
+    progress = job.bytes_processed / job.total_bytes if job.total_bytes else 0.0
+    eta = None
+    if job.status == "running" and job.started_at and 0 < progress < 1:
+        started = job.started_at if job.started_at.tzinfo else job.started_at.replace(tzinfo=timezone.utc)
+        elapsed = (_now() - started).total_seconds()
+        eta = round(elapsed * (1 - progress) / progress, 1)
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "filename": job.filename,
+        "session_id": job.session_id,
+        "rows_processed": job.rows_processed or 0,
+        "progress": round(min(progress, 1.0), 4),
+        "eta_seconds": eta,
+        "attempts": job.attempts or 0,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+    }
@@ -0,0 +1,106 @@
+"""
+BM25 inverted index over the knowledge base chunks
+Queries naming a section or form outright ("80C", "24(b)", "ITR-2", "GST rate") are answered
+from the index alone, with no embedding or vector query. Other queries get the vector results
+fused with the BM25 ranking (reciprocal rank fusion).
+"""
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# "80ccd(1b)", "24(b)" and "itr-2" stay single tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\([a-z0-9]+\))?(?:-[a-z0-9]+)?")
+# Tokens that name one section or form: 80c, 80ttb, 87a, 44ada, 80ccd(1b), 24(b), 10(13a), itr-2, gstr-3b
+SECTION_TERM = re.compile(r"^(?:\d{1,3}[a-z]{1,4}(?:\([a-z0-9]+\))?|\d{1,3}\([a-z0-9]+\)|(?:itr|gstr|form)-\d+[a-z]?)$")
+ORDINAL = re.compile(r"^\d+(?:st|nd|rd|th)$")
+# Acronyms specific enough to route a query on their own
+EXACT_TERMS = {"gst", "tds", "hra"}
+STOPWORDS = {
+    "a", "an", "and", "are", "can", "do", "does", "for", "how", "i", "in", "is", "it", "me", "my",
+    "of", "on", "or", "the", "to", "under", "what", "when", "which", "who", "with",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def is_exact_term(token: str) -> bool:
+    return token in EXACT_TERMS or (SECTION_TERM.match(token) is not None and not ORDINAL.match(token))
+
+
+class BM25Index:
+    """Okapi BM25; each posting stores its precomputed term weight, so a query only sums weights"""
+
+    def __init__(self, ids: List[str], documents: List[str], metadatas: List[Dict], k1: float = 1.5, b: float = 0.75):
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        tokenized = [tokenize(doc) for doc in documents]
+        lengths = np.array([len(tokens) for tokens in tokenized], dtype=np.float32)
+        avg_length = float(lengths.mean()) if lengths.sum() else 1.0
+
+        counts: Dict[str, Dict[int, int]] = {}
+        for doc, tokens in enumerate(tokenized):
+            for token in tokens:
+                postings = counts.setdefault(token, {})
+                postings[doc] = postings.get(doc, 0) + 1
+
+        n = len(documents)
+        # term -> (doc indices, weights)
+        self.postings: Dict[str, tuple] = {}
+        for term, postings in counts.items():
+            docs = np.fromiter(postings.keys(), dtype=np.intp, count=len(postings))
+            tf = np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+            idf = np.log(1.0 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = k1 * (1.0 - b + b * lengths[docs] / avg_length)
+            self.postings[term] = (docs, (idf * tf * (k1 + 1.0) / (tf + norm)).astype(np.float32))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _scores(self, terms: List[str]) -> np.ndarray:
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is not None:
+                scores[posting[0]] += posting[1]
+        return scores
+
+    def _hits(self, order, scores: np.ndarray) -> List[Dict]:
+        return [
+            {"id": self.ids[i], "content": self.documents[i], "metadata": self.metadatas[i], "distance": None,
+             "score": float(scores[i])}
+            for i in order
+        ]
+
+    def exact_match(self, query: str, n_results: int) -> Optional[List[Dict]]:
+        """BM25 top chunks among those containing a section/form the query names; None if it names none"""
+        terms = tokenize(query)
+        exact = [t for t in terms if is_exact_term(t) and t in self.postings]
+        if not exact:
+            return None
+        candidates = np.unique(np.concatenate([self.postings[t][0] for t in exact]))
+        scores = self._scores(terms)
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")][:n_results]
+        return self._hits(ranked.tolist(), scores)
+
+    def fuse(self, query: str, vector_hits: List[Dict], n_results: int, rrf_k: int = 60) -> List[Dict]:
+        """Reciprocal rank fusion of the vector hits (closest first) and the BM25 ranking"""
+        scores = self._scores(tokenize(query))
+        matched = np.flatnonzero(scores > 0)
+        lexical_rank = matched[np.argsort(-scores[matched], kind="stable")][:max(n_results, len(vector_hits))]
+        if not len(lexical_rank):
+            return vector_hits[:n_results]
+
+        fused: Dict[str, float] = {}
+        hits: Dict[str, Dict] = {}
+        for rank, hit in enumerate(vector_hits):
+            fused[hit["id"]] = 1.0 / (rrf_k + rank + 1)
+            hits[hit["id"]] = hit
+        for rank, hit in enumerate(self._hits(lexical_rank.tolist(), scores)):
+            fused[hit["id"]] = fused.get(hit["id"], 0.0) + 1.0 / (rrf_k + rank + 1)
+            hits.setdefault(hit["id"], hit)
+        best = sorted(fused, key=fused.get, reverse=True)[:n_results]
+        return [hits[chunk_id] for chunk_id in best]
@@ -1,128 +1,207 @@
+import asyncio
 import os
-import openai
-import requests
-from typing import Optional
-import json
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import re
+from providers import LLMProvider, OllamaProvider, OpenAIProvider, MockProvider, chunk_words
+import metrics
+import tax
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
 OLLAMA_HOST = os.getenv("OLLAMA_HOST")  # e.g., http://localhost:11434
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1")
 ENABLE_MOCK_LLM = os.getenv("ENABLE_MOCK_LLM", "true").lower() == "true"
+ENABLE_RAG = os.getenv("ENABLE_RAG", "true").lower() == "true"
 
-if OPENAI_API_KEY:
-    openai.api_key = OPENAI_API_KEY
+NO_LLM_MESSAGE = "No LLM configured. Set OPENAI_API_KEY or OLLAMA_HOST environment variable, or enable ENABLE_MOCK_LLM=true for demo mode."
 
 
-def mock_llm_response(prompt: str, system: Optional[str] = None) -> str:
-    """Enhanced mock LLM for Indian tax context"""
-    
-    # Extract summary data from prompt
-    summary_match = re.search(r'Session summary: ({.*?})\n', prompt, re.DOTALL)
-    summary_data = {}
-    if summary_match:
-        try:
-            summary_data = json.loads(summary_match.group(1))
-        except:
-            pass
-    
-    user_q = prompt.lower()
-    
-    # Indian tax-specific responses
-    if "income" in user_q and ("total" in user_q or "how much" in user_q):
-        total_income = summary_data.get("total_income", 0)
-        return f"Based on your uploaded statement, your total income is ₹{total_income:.2f}.\n\n💡 Tax Tip: For FY 2024-25, income up to ₹3 lakhs is tax-free under the new tax regime. Consider Section 80C investments (up to ₹1.5 lakhs) for additional tax savings under the old regime."
-    
-    elif "expense" in user_q or "spending" in user_q:
-        total_expenses = summary_data.get("total_expenses", 0)
-        return f"Your total expenses amount to ₹{total_expenses:.2f}.\n\n💡 Tip: Keep all bills for deductible expenses like medical insurance, home loan interest, and education fees to maximize tax savings."
-    
-    elif "80c" in user_q:
-        return "Section 80C allows deduction up to ₹1.5 lakhs for:\n• LIC premiums\n• EPF/PPF contributions\n• ELSS mutual funds\n• NSC\n• Home loan principal\n• Tuition fees (2 children)\n• Sukanya Samriddhi Yojana\n\nThis can save you up to ₹46,800 in taxes (at 30% slab)!"
-    
-    elif "80d" in user_q or "health insurance" in user_q or "medical" in user_q:
-        deductions = summary_data.get("potential_deductions", 0)
-        return f"I found potential medical/health deductions totaling ₹{deductions:.2f} in your transactions.\n\nSection 80D allows:\n• Self/family health insurance: ₹25,000\n• Parents (below 60): ₹25,000\n• Parents (above 60): ₹50,000\n\nMax savings: Up to ₹1 lakh deduction!"
-    
-    elif "deduction" in user_q or ("tax" in user_q and "save" in user_q):
-        deductions = summary_data.get("potential_deductions", 0)
-        total_income = summary_data.get("total_income", 0)
-        return f"I found potential tax deductions totaling ₹{deductions:.2f} in your transactions.\n\nKey deduction sections for Indians:\n• 80C: ₹1.5L (LIC, PPF, ELSS)\n• 80D: ₹1L (Health insurance)\n• 80E: Unlimited (Education loan interest)\n• 24: ₹2L (Home loan interest)\n\nWith ₹{total_income:.2f} income, these deductions could save you significant tax!"
-    
-    elif "gst" in user_q:
-        return "GST (Goods & Services Tax) rates in India:\n• 0%: Essential items\n• 5%: Household necessities\n• 12%: Processed foods\n• 18%: Most goods & services\n• 28%: Luxury items\n\nGST registration mandatory if turnover > ₹40 lakhs (goods) or ₹20 lakhs (services)."
-    
-    elif "itr" in user_q or "file" in user_q or "return" in user_q:
-        return "ITR filing for Indian taxpayers:\n\n📋 Common Forms:\n• ITR-1 (Sahaj): Salary < ₹50L, one house\n• ITR-2: Multiple properties, capital gains\n• ITR-3: Business income\n• ITR-4 (Sugam): Presumptive taxation\n\n📅 Deadline: July 31 (regular)\nLate filing: Penalty up to ₹5,000\n\nFile online at: incometaxindia.gov.in"
-    
-    elif "slab" in user_q or "rate" in user_q:
-        total_income = summary_data.get("total_income", 0)
-        return f"With income of ₹{total_income:.2f}, your tax calculation:\n\n📊 New Tax Regime (FY 24-25):\n• ₹0-3L: Nil\n• ₹3-6L: 5%\n• ₹6-9L: 10%\n• ₹9-12L: 15%\n• ₹12-15L: 20%\n• Above ₹15L: 30%\n\n💡 Tip: Compare with old regime if you have deductions!"
-    
-    elif any(word in user_q for word in ["health", "financial", "doing"]):
-        total_income = summary_data.get("total_income", 0)
-        total_expenses = summary_data.get("total_expenses", 0)
-        savings_rate = ((total_income - total_expenses) / total_income * 100) if total_income > 0 else 0
-        return f"Your financial health looks {'excellent' if savings_rate > 30 else 'good' if savings_rate > 20 else 'moderate'}! 💪\n\nSavings rate: {savings_rate:.1f}%\nIncome: ₹{total_income:.2f}\nExpenses: ₹{total_expenses:.2f}\n\n💡 Indian tax saving tip: Invest your savings in tax-saving instruments like PPF, ELSS, or NPS to reduce taxable income!"
-    
-    elif "how much" in user_q or "what" in user_q or "summary" in user_q:
-        total_income = summary_data.get("total_income", 0)
-        total_expenses = summary_data.get("total_expenses", 0)
-        deductions = summary_data.get("potential_deductions", 0)
-        net = total_income - total_expenses
-        return f"📊 Your Financial Summary:\n\n• Total Income: ₹{total_income:.2f}\n• Total Expenses: ₹{total_expenses:.2f}\n• Potential Deductions: ₹{deductions:.2f}\n• Net Savings: ₹{net:.2f}\n\n💡 With ₹{deductions:.2f} in deductible expenses, you could save up to ₹{deductions * 0.3:.2f} in taxes (at 30% slab)!"
-    
+def _income_reply(summary_data: Dict) -> str:
+    total_income = summary_data.get("total_income", 0)
+    return f"Based on your uploaded statement, your total income is ₹{total_income:.2f}.\n\n💡 Tax Tip: For FY 2024-25, income up to ₹3 lakhs is tax-free under the new tax regime. Consider Section 80C investments (up to ₹1.5 lakhs) for additional tax savings under the old regime."
+
+
+def _expenses_reply(summary_data: Dict) -> str:
+    total_expenses = summary_data.get("total_expenses", 0)
+    return f"Your total expenses amount to ₹{total_expenses:.2f}.\n\n💡 Tip: Keep all bills for deductible expenses like medical insurance, home loan interest, and education fees to maximize tax savings."
+
+
+def _80c_reply(summary_data: Dict) -> str:
+    return "Section 80C allows deduction up to ₹1.5 lakhs for:\n• LIC premiums\n• EPF/PPF contributions\n• ELSS mutual funds\n• NSC\n• Home loan principal\n• Tuition fees (2 children)\n• Sukanya Samriddhi Yojana\n\nThis can save you up to ₹46,800 in taxes (at 30% slab)!"
+
+
+def _80d_reply(summary_data: Dict) -> str:
+    sections = summary_data.get("section_totals")
+    if sections is not None:
+        deductions = sections.get("80D", {}).get("amount", 0)
     else:
-        # Generic helpful response for Indian context
-        return "Namaste! I'm your Indian tax assistant. I can help you with:\n\n• Income tax calculations & slabs\n• Section 80C, 80D deductions\n• GST information\n• ITR filing guidance\n• Tax-saving investment options\n• Financial health analysis\n\nUpload your bank statement or ask me any tax-related question! 🇮🇳"
+        deductions = summary_data.get("potential_deductions", 0)
+    return f"I found potential medical/health deductions totaling ₹{deductions:.2f} in your transactions.\n\nSection 80D allows:\n• Self/family health insurance: ₹25,000\n• Parents (below 60): ₹25,000\n• Parents (above 60): ₹50,000\n\nMax savings: Up to ₹1 lakh deduction!"
+
+
+def _deductions_reply(summary_data: Dict) -> str:
+    deductions = summary_data.get("potential_deductions", 0)
+    total_income = summary_data.get("total_income", 0)
+    if summary_data.get("section_totals"):
+        fy = tax.infer_fy(summary_data)
+        return (f"I found potential tax deductions totaling ₹{deductions:.2f} in your transactions, by section (FY {fy}, old regime):\n"
+                + "\n".join(tax.deduction_lines(summary_data["section_totals"], fy))
+                + "\n\n💡 The new regime allows none of these, so compare both before choosing!")
+    return f"I found potential tax deductions totaling ₹{deductions:.2f} in your transactions.\n\nKey deduction sections for Indians:\n• 80C: ₹1.5L (LIC, PPF, ELSS)\n• 80D: ₹1L (Health insurance)\n• 80E: Unlimited (Education loan interest)\n• 24: ₹2L (Home loan interest)\n\nWith ₹{total_income:.2f} income, these deductions could save you significant tax!"
+
+
+def _gst_reply(summary_data: Dict) -> str:
+    return "GST (Goods & Services Tax) rates in India:\n• 0%: Essential items\n• 5%: Household necessities\n• 12%: Processed foods\n• 18%: Most goods & services\n• 28%: Luxury items\n\nGST registration mandatory if turnover > ₹40 lakhs (goods) or ₹20 lakhs (services)."
+
+
+def _itr_reply(summary_data: Dict) -> str:
+    return "ITR filing for Indian taxpayers:\n\n📋 Common Forms:\n• ITR-1 (Sahaj): Salary < ₹50L, one house\n• ITR-2: Multiple properties, capital gains\n• ITR-3: Business income\n• ITR-4 (Sugam): Presumptive taxation\n\n📅 Deadline: July 31 (regular)\nLate filing: Penalty up to ₹5,000\n\nFile online at: incometaxindia.gov.in"
+
+
+def _slabs_reply(summary_data: Dict) -> str:
+    total_income = summary_data.get("total_income", 0)
+    fy = tax.infer_fy(summary_data)
+    reply = f"📊 New Tax Regime (FY {fy}):\n" + "\n".join(tax.slab_lines(fy, "new"))
+    if total_income:
+        result = tax.compute_tax(total_income, tax.deductions_from_summary(summary_data), fy)
+        reply = (f"With income of ₹{total_income:.2f}, your tax would be {tax.format_inr(result['new_regime']['total_tax'])} "
+                 f"under the new regime and {tax.format_inr(result['old_regime']['total_tax'])} under the old one.\n\n" + reply)
+    return reply + "\n\n💡 Tip: Compare with old regime if you have deductions!"
+
+
+def _health_reply(summary_data: Dict) -> str:
+    total_income = summary_data.get("total_income", 0)
+    total_expenses = summary_data.get("total_expenses", 0)
+    savings_rate = ((total_income - total_expenses) / total_income * 100) if total_income > 0 else 0
+    return f"Your financial health looks {'excellent' if savings_rate > 30 else 'good' if savings_rate > 20 else 'moderate'}! 💪\n\nSavings rate: {savings_rate:.1f}%\nIncome: ₹{total_income:.2f}\nExpenses: ₹{total_expenses:.2f}\n\n💡 Indian tax saving tip: Invest your savings in tax-saving instruments like PPF, ELSS, or NPS to reduce taxable income!"
+
+
+def _summary_reply(summary_data: Dict) -> str:
+    total_income = summary_data.get("total_income", 0)
+    total_expenses = summary_data.get("total_expenses", 0)
+    deductions = summary_data.get("potential_deductions", 0)
+    net = total_income - total_expenses
+    saved = tax.deduction_savings(total_income, tax.deductions_from_summary(summary_data), tax.infer_fy(summary_data)) if total_income else 0
+    return f"📊 Your Financial Summary:\n\n• Total Income: ₹{total_income:.2f}\n• Total Expenses: ₹{total_expenses:.2f}\n• Potential Deductions: ₹{deductions:.2f}\n• Net Savings: ₹{net:.2f}\n\n💡 With ₹{deductions:.2f} in deductible expenses, you could save {tax.format_inr(saved)} in taxes under the old regime (after section limits)!"
+
+
+# Generic helpful response for Indian context
+GENERIC_REPLY = "Namaste! I'm your Indian tax assistant. I can help you with:\n\n• Income tax calculations & slabs\n• Section 80C, 80D deductions\n• GST information\n• ITR filing guidance\n• Tax-saving investment options\n• Financial health analysis\n\nUpload your bank statement or ask me any tax-related question! 🇮🇳"
 
+# (intent, pattern, reply) tried in order on the lowercased question; the first match answers.
+# Whole words only, so "profile" is not a filing question and "separate" not a rate question.
+MOCK_INTENTS = [
+    ("income", re.compile(r"^(?=.*\bincome\b)(?=.*\b(?:total|how much)\b)", re.DOTALL), _income_reply),
+    ("expenses", re.compile(r"\b(?:expenses?|spending)\b"), _expenses_reply),
+    ("80c", re.compile(r"\b80c\b"), _80c_reply),
+    ("80d", re.compile(r"\b80d\b|\bhealth insurance\b|\bmedical\b"), _80d_reply),
+    ("deductions", re.compile(r"\bdeduct\w*|^(?=.*\btax\b)(?=.*\bsave\b)", re.DOTALL), _deductions_reply),
+    ("gst", re.compile(r"\bgst\b"), _gst_reply),
+    ("itr", re.compile(r"\bitr\b|\bfil(?:e|ed|es|ing)\b|\breturns?\b"), _itr_reply),
+    ("slabs", re.compile(r"\bslabs?\b|\brates?\b"), _slabs_reply),
+    ("health", re.compile(r"\b(?:health|financial(?:ly)?|doing)\b"), _health_reply),
+    ("summary", re.compile(r"\bhow much\b|\bwhat\b|\bsummary\b"), _summary_reply),
+]
+MOCK_REPLIES = {intent: reply for intent, _, reply in MOCK_INTENTS}
 
-def ask_llm_with_rag(prompt: str, system: Optional[str] = None, use_rag: bool = True) -> str:
-    """Enhanced LLM with RAG for Indian tax context"""
+
+def route_intent(question: str) -> Optional[str]:
+    """Name of the mock intent the question routes to; None for the generic reply"""
+    user_q = question.lower()
+    for intent, pattern, _ in MOCK_INTENTS:
+        if pattern.search(user_q):
+            return intent
+    return None
+
+
+def mock_llm_response(prompt: str, system: Optional[str] = None, context: Optional[Dict] = None) -> str:
+    """Enhanced mock LLM for Indian tax context
+
+    context is {"question", "summary"} as built by the chat endpoints; intents match on the
+    question only, not the summary or conversation history. Without it the whole prompt is
+    taken as the question, with no statement figures.
+    """
+    if context is None:
+        context = {"question": prompt}
+    intent = route_intent(context["question"])
+    if intent is None:
+        return GENERIC_REPLY
+    return MOCK_REPLIES[intent](context.get("summary") or {})
+
+
+def apply_rag(prompt: str, use_rag: bool = True, question: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """Add RAG context to the prompt; returns (prompt, direct_reply) where direct_reply is set in mock+RAG mode
+
+    Retrieval searches for question when given, otherwise for the whole prompt.
+    """
+    if not use_rag or not ENABLE_RAG:
+        return prompt, None
+    query = question or prompt
+    try:
+        from rag import get_rag
+        rag = get_rag()
+        rag_context = rag.get_context_for_query(query, max_chunks=3)
+        
+        # If using mock LLM AND RAG has good results AND no real LLM available
+        # Don't prepend RAG context to prompt for mock LLM (causes keyword conflicts)
+        # Instead, use RAG directly
+        if ENABLE_MOCK_LLM and not OPENAI_API_KEY and not OLLAMA_HOST:
+            # Return RAG results directly for better accuracy
+            return prompt, format_rag_response_with_summary(rag_context, query)
+        
+        # For real LLMs, enhance prompt with RAG context
+        return f"{rag_context}\n\nBased on the above tax information and the user's data, {prompt}", None
+    except Exception as e:
+        print(f"RAG error: {e}")
+        # Continue without RAG
+        return prompt, None
+
+
+def _ollama_payload(prompt: str, system: Optional[str], stream: bool) -> dict:
+    # Construct full prompt with system message for Ollama
+    full_prompt = prompt
+    if system:
+        full_prompt = f"{system}\n\n{prompt}"
+    return {
+        "model": OLLAMA_MODEL,
+        "prompt": full_prompt,
+        "stream": stream,
+        "options": {
+            "temperature": 0.7,
+            "top_p": 0.9,
+        }
+    }
+
+
+def _openai_messages(prompt: str, system: Optional[str]) -> list:
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def ask_llm_with_rag(
+    prompt: str, system: Optional[str] = None, use_rag: bool = True, context: Optional[Dict] = None
+) -> str:
+    """Enhanced LLM with RAG for Indian tax context; blocking, so not for use on the event loop.
+
+    context ({"question", "summary"}) is used as in ask_llm_async.
+    """
     
     # Add RAG context if enabled
-    rag_context = ""
-    if use_rag:
-        try:
-            from rag import initialize_rag
-            rag = initialize_rag()
-            rag_context = rag.get_context_for_query(prompt, max_chunks=3)
-            
-            # If using mock LLM AND RAG has good results AND no real LLM available
-            # Don't prepend RAG context to prompt for mock LLM (causes keyword conflicts)
-            # Instead, use RAG directly
-            if ENABLE_MOCK_LLM and not OPENAI_API_KEY and not OLLAMA_HOST:
-                # Return RAG results directly for better accuracy
-                return format_rag_response_with_summary(rag_context, prompt)
-            
-            # For real LLMs, enhance prompt with RAG context
-            prompt = f"{rag_context}\n\nBased on the above tax information and the user's data, {prompt}"
-        except Exception as e:
-            print(f"RAG error: {e}")
-            # Continue without RAG
+    prompt, direct_reply = apply_rag(prompt, use_rag, context["question"] if context else None)
+    if direct_reply is not None:
+        return direct_reply
     
     # Try Ollama first (prefer local LLM)
     if OLLAMA_HOST:
         try:
+            import requests  # only this legacy sync path needs it; the async providers use httpx
             print(f"🤖 Using Ollama at {OLLAMA_HOST} with model {OLLAMA_MODEL}")
             url = f"{OLLAMA_HOST}/api/generate"
-            
-            # Construct full prompt with system message for Ollama
-            full_prompt = prompt
-            if system:
-                full_prompt = f"{system}\n\n{prompt}"
-            
-            payload = {
-                "model": OLLAMA_MODEL,
-                "prompt": full_prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                }
-            }
-            r = requests.post(url, json=payload, timeout=120)
+            r = requests.post(url, json=_ollama_payload(prompt, system, stream=False), timeout=120)
             r.raise_for_status()
             data = r.json()
             
@@ -140,12 +219,10 @@ def ask_llm_with_rag(prompt: str, system: Optional[str] = None, use_rag: bool =
     # Try OpenAI
     if OPENAI_API_KEY:
         try:
+            import openai  # slow to import (~0.8 s), so not at module level
+            openai.api_key = OPENAI_API_KEY
             print(f"🤖 Using OpenAI API")
-            messages = []
-            if system:
-                messages.append({"role": "system", "content": system})
-            messages.append({"role": "user", "content": prompt})
-            resp = openai.ChatCompletion.create(model=OPENAI_MODEL, messages=messages, max_tokens=800)
+            resp = openai.ChatCompletion.create(model=OPENAI_MODEL, messages=_openai_messages(prompt, system), max_tokens=800)
             return resp.choices[0].message.content
         except Exception as e:
             print(f"⚠️ OpenAI error: {e}")
@@ -153,9 +230,94 @@ def ask_llm_with_rag(prompt: str, system: Optional[str] = None, use_rag: bool =
     # Use mock LLM as fallback
     if ENABLE_MOCK_LLM:
         print(f"🤖 Using Mock LLM")
-        return mock_llm_response(prompt, system)
+        return mock_llm_response(prompt, system, context)
     
-    raise RuntimeError("No LLM configured. Set OPENAI_API_KEY or OLLAMA_HOST environment variable, or enable ENABLE_MOCK_LLM=true for demo mode.")
+    raise RuntimeError(NO_LLM_MESSAGE)
+
+
+_providers: Optional[List[LLMProvider]] = None
+
+
+def get_providers() -> List[LLMProvider]:
+    """Async providers in fallback order: Ollama, OpenAI, then mock"""
+    global _providers
+    if _providers is None:
+        _providers = []
+        if OLLAMA_HOST:
+            _providers.append(OllamaProvider(OLLAMA_HOST, _ollama_payload))
+        if OPENAI_API_KEY:
+            _providers.append(OpenAIProvider(OPENAI_API_KEY, OPENAI_MODEL, OPENAI_BASE_URL))
+        if ENABLE_MOCK_LLM:
+            _providers.append(MockProvider(mock_llm_response))
+    return _providers
+
+
+async def ask_llm_async(
+    prompt: str, system: Optional[str] = None, use_rag: bool = True, context: Optional[Dict] = None
+) -> str:
+    """Non-blocking ask_llm_with_rag: RAG runs in a worker thread, generation on the pooled async client
+
+    context ({"question", "summary"}) goes to the providers alongside the prompt; the mock LLM
+    answers from it instead of parsing the prompt, and retrieval searches for the question alone.
+    """
+    question = context["question"] if context else None
+    with metrics.span("retrieve"):
+        prompt, direct_reply = await asyncio.to_thread(apply_rag, prompt, use_rag, question)
+    if direct_reply is not None:
+        return direct_reply
+
+    chain = get_providers()
+    for i, provider in enumerate(chain):
+        try:
+            with metrics.span("llm"):
+                reply = await provider.generate(prompt, system, context)
+        except Exception as e:
+            print(f"⚠️ {provider.name} error: {e}")
+            record_failure(provider, fell_back=i + 1 < len(chain))
+            continue
+        metrics.LLM_REQUESTS.inc(provider=provider.name, outcome="ok")
+        return reply
+    raise RuntimeError(NO_LLM_MESSAGE)
+
+
+def record_failure(provider: LLMProvider, fell_back: bool):
+    metrics.LLM_REQUESTS.inc(provider=provider.name, outcome="error")
+    if fell_back:
+        metrics.LLM_FALLBACKS.inc(provider=provider.name)
+
+
+async def ask_llm_stream(
+    prompt: str, system: Optional[str] = None, use_rag: bool = True, context: Optional[Dict] = None
+) -> AsyncIterator[str]:
+    """Streaming ask_llm_async: yields reply text as it is generated.
+
+    Falls back to the next provider only if the current one fails before its first token.
+    """
+    question = context["question"] if context else None
+    with metrics.span("retrieve"):
+        prompt, direct_reply = await asyncio.to_thread(apply_rag, prompt, use_rag, question)
+    if direct_reply is not None:
+        for piece in chunk_words(direct_reply):
+            yield piece
+        return
+
+    chain = get_providers()
+    for i, provider in enumerate(chain):
+        started = False
+        try:
+            # includes time the client takes to consume each token
+            with metrics.span("llm"):
+                async for token in provider.stream(prompt, system, context):
+                    started = True
+                    yield token
+            metrics.LLM_REQUESTS.inc(provider=provider.name, outcome="ok")
+            return
+        except Exception as e:
+            record_failure(provider, fell_back=not started and i + 1 < len(chain))
+            if started:
+                raise
+            print(f"⚠️ {provider.name} error: {e}")
+    raise RuntimeError(NO_LLM_MESSAGE)
 
 
 def format_rag_response_with_summary(rag_context: str, user_question: str) -> str:
@@ -174,7 +336,7 @@ def format_rag_response_with_summary(rag_context: str, user_question: str) -> st
     return response
 
 
-def ask_llm(prompt: str, system: Optional[str] = None) -> str:
+def ask_llm(prompt: str, system: Optional[str] = None, context: Optional[Dict] = None) -> str:
     """Legacy function - calls enhanced version with RAG"""
-    return ask_llm_with_rag(prompt, system, use_rag=True)
+    return ask_llm_with_rag(prompt, system, use_rag=True, context=context)
 
@@ -1,15 +1,28 @@
+import asyncio
+import importlib
 import json
+import multiprocessing
 import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
 from dotenv import load_dotenv
 
 # Load environment variables FIRST, before importing anything else that needs them
 load_dotenv()
 
-from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Form
+from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Form, Query
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-import db, models, utils, llm
-from schemas import UploadResponse, ChatRequest, ChatResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+import db, models, utils, llm, rag, providers, cache, prompt_context, jobs, memory, tax, metrics
+from schemas import UploadResponse, BatchUploadResponse, JobStatus, ChatRequest, ChatResponse, TransactionPage, TaxComputeRequest
 
 app = FastAPI(title="TaxEase AI Backend")
 app.add_middleware(
@@ -18,106 +31,615 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
 
-# initialize DB
-models.Base.metadata.create_all(bind=db.engine)
+# Upload limits: reject files above MAX_UPLOAD_MB, read CSVs CSV_CHUNK_ROWS rows at a time
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "200")) * 1024 * 1024)
+UPLOAD_READ_BYTES = 1024 * 1024
+CSV_CHUNK_ROWS = int(os.getenv("CSV_CHUNK_ROWS", "50000"))
+# Uploads larger than this are parsed by a background job instead of inside the request
+UPLOAD_BACKGROUND_BYTES = int(float(os.getenv("UPLOAD_BACKGROUND_MB", "20")) * 1024 * 1024)
+# Transactions returned in the /upload response; the rest are paged from /summary/{id}/transactions
+UPLOAD_PREVIEW_ROWS = int(os.getenv("UPLOAD_PREVIEW_ROWS", "1000"))
+# Worker processes for /upload/batch parsing
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", str(os.cpu_count() or 1)))
+_parse_pool: Optional[ProcessPoolExecutor] = None
 
+# RAG warm-up mode: "background" (default), "sync" (block startup until loaded) or "off" (load on first chat)
+RAG_WARMUP = os.getenv("RAG_WARMUP", "background").lower()
 
-@app.post("/upload", response_model=UploadResponse)
-async def upload_csv(file: UploadFile = File(...), session_id: int = Form(None)):
-    if not file.filename.endswith('.csv'):
-        raise HTTPException(status_code=400, detail="Only CSV files are supported")
-    contents = await file.read()
-    try:
-        from io import BytesIO, StringIO
-        # try to decode
-        text = None
+# Heavy modules `import main` leaves out (see benchmarks/startup_budget.json); imported in a background
+# thread after startup so the first upload doesn't pay for them
+IMPORT_WARMUP = os.getenv("IMPORT_WARMUP", "true").lower() == "true"
+WARM_IMPORTS = ["pandas"]
+
+# Answer cache: ANSWER_CACHE_SIZE=0 disables it; the semantic tier reuses the RAG embedding model
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1024"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+ANSWER_CACHE_SEMANTIC = os.getenv("ANSWER_CACHE_SEMANTIC", "false").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+
+
+def embed_question(text: str):
+    """Through RAG's query-embedding cache, so a probe and the retrieval after a miss encode the question once"""
+    return rag.get_rag().embed_queries([text])[0]
+
+
+answer_cache = cache.AnswerCache(
+    max_entries=ANSWER_CACHE_SIZE,
+    ttl_seconds=ANSWER_CACHE_TTL,
+    embed=embed_question if ANSWER_CACHE_SEMANTIC else None,
+    similarity_threshold=ANSWER_CACHE_THRESHOLD,
+)
+rag.on_knowledge_base_change(answer_cache.clear)
+
+
+def answer_cache_lookups():
+    stats = answer_cache.stats()
+    yield {"result": "hit"}, stats["hits"] - stats["semantic_hits"]
+    yield {"result": "semantic_hit"}, stats["semantic_hits"]
+    yield {"result": "miss"}, stats["misses"]
+
+
+def query_embedding_lookups():
+    stats = rag.query_cache_stats()
+    if stats is not None:
+        yield {"result": "hit"}, stats["hits"]
+        yield {"result": "miss"}, stats["misses"]
+
+
+metrics.CallbackMetric("taxease_answer_cache_lookups_total", "Answer cache lookups by result", "counter", answer_cache_lookups)
+metrics.CallbackMetric("taxease_answer_cache_entries", "Answers currently cached", "gauge",
+                       lambda: [({}, answer_cache.stats()["entries"])])
+metrics.CallbackMetric("taxease_query_embedding_cache_lookups_total", "RAG query embedding cache lookups by result", "counter",
+                       query_embedding_lookups)
+
+
+@app.on_event("startup")
+def create_tables():
+    """Create missing tables; registered first so it runs before the job workers read the jobs table"""
+    models.Base.metadata.create_all(bind=db.engine)
+
+
+@app.on_event("startup")
+def warm_up_imports():
+    if not IMPORT_WARMUP:
+        return
+
+    def _import():
+        for name in WARM_IMPORTS:
+            importlib.import_module(name)
+
+    threading.Thread(target=_import, name="import-warmup", daemon=True).start()
+
+
+@app.on_event("startup")
+def warm_up():
+    if RAG_WARMUP == "off":
+        return
+    rag.warm_up_rag(background=RAG_WARMUP != "sync")
+
+
+@app.on_event("startup")
+def start_job_workers():
+    job_queue.start()
+
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    await providers.close_http_client()
+    job_queue.stop()
+    await db.async_engine.dispose()
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Answer cache and RAG query-embedding cache counters"""
+    return {"answers": answer_cache.stats(), "query_embeddings": rag.query_cache_stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint: request/stage latency histograms, cache, LLM and upload counters"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe - 200 once the shared RAG instance is loaded"""
+    status = rag.rag_status()
+    if RAG_WARMUP != "off" and status["status"] != "ready":
+        return JSONResponse(status_code=503, content=status)
+    return status
+
+
+async def spool_upload(file: UploadFile, suffix: str = ".csv") -> str:
+    """Copy an upload to a temp file 1 MB at a time, enforcing MAX_UPLOAD_BYTES"""
+    size = 0
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
         try:
-            text = contents.decode('utf-8')
-            buf = StringIO(text)
+            while True:
+                block = await file.read(UPLOAD_READ_BYTES)
+                if not block:
+                    break
+                size += len(block)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail=f"File exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit")
+                tmp.write(block)
         except Exception:
-            buf = BytesIO(contents)
-        summary = utils.parse_csv(buf)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to parse CSV: {e}")
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    return tmp.name
 
-    # store summary in DB
-    db_session = next(db.get_db())
-    if session_id is None:
-        s = models.Session()
-        db_session.add(s)
-        db_session.commit()
-        db_session.refresh(s)
-        session_id = s.id
-    else:
-        s = db_session.query(models.Session).get(session_id)
-        if s is None:
-            s = models.Session()
-            db_session.add(s)
-            db_session.commit()
-            db_session.refresh(s)
-            session_id = s.id
-    # store summary
-    import datetime
+
+def clear_transactions(db_session: Session, session_id: int):
+    db_session.query(models.Transaction).filter(models.Transaction.session_id == session_id).delete(synchronize_session=False)
+
+
+def insert_transactions(db_session: Session, session_id: int, transactions: list):
+    """One executemany insert per CSV_CHUNK_ROWS batch"""
+    table = models.Transaction.__table__
+    for start in range(0, len(transactions), CSV_CHUNK_ROWS):
+        batch = transactions[start:start + CSV_CHUNK_ROWS]
+        db_session.execute(table.insert(), [dict(t, session_id=session_id) for t in batch])
+
+
+def store_transactions(db_session: Session, session_id: int, transactions: list):
+    """Replace a session's transactions"""
+    clear_transactions(db_session, session_id)
+    insert_transactions(db_session, session_id, transactions)
+
+
+def ensure_session(db_session: Session, session_id: Optional[int]) -> int:
+    """session_id if it exists, else the id of a new session (flushed, committed by the caller)"""
+    if session_id is not None and db_session.get(models.Session, session_id) is not None:
+        return session_id
+    s = models.Session()
+    db_session.add(s)
+    db_session.flush()
+    return s.id
+
+
+def save_statement(db_session: Session, session_id: int, summary: dict) -> int:
+    """Stage a parsed statement for a session (created if missing); the caller commits.
+
+    Sync so the job workers can share it; async handlers run it via AsyncSession.run_sync.
+    """
+    session_id = ensure_session(db_session, session_id)
+    # store rows in the transactions table and only the aggregates in the summary
+    store_transactions(db_session, session_id, summary["transactions"])
+    save_summary(db_session, session_id, summary)
+    return session_id
+
+
+def save_summary(db_session: Session, session_id: int, summary: dict):
+    aggregates = json.dumps(utils.aggregate_summary(summary))
     summ = db_session.query(models.Summary).filter(models.Summary.session_id == session_id).first()
     if summ is None:
-        summ = models.Summary(session_id=session_id, data=json.dumps(summary))
+        summ = models.Summary(session_id=session_id, data=aggregates)
         db_session.add(summ)
     else:
-        summ.data = json.dumps(summary)
-    db_session.commit()
+        summ.data = aggregates
+
+
+def begin_statement(db_session: Session, session_id: Optional[int]) -> int:
+    """Stage an empty statement for a session (created if missing); the caller commits"""
+    session_id = ensure_session(db_session, session_id)
+    clear_transactions(db_session, session_id)
+    return session_id
+
+
+def discard_statement(db_session: Session, session_id: int):
+    """Stage removal of a session's rows and summary after a failed ingest; the caller commits"""
+    clear_transactions(db_session, session_id)
+    db_session.query(models.Summary).filter(models.Summary.session_id == session_id).delete(synchronize_session=False)
+
+
+def run_in_session(fn, *args):
+    """fn(db_session, *args) in its own committed transaction; runs in a worker thread"""
+    with db.SessionLocal() as db_session:
+        result = fn(db_session, *args)
+        db_session.commit()
+    return result
+
+
+async def locked_write(fn, *args):
+    """run_in_session off the event loop, holding the write lock only for that transaction"""
+    async with db.write_lock():
+        with metrics.span("db_write"):
+            return await asyncio.to_thread(run_in_session, fn, *args)
+
+
+def ingest_statement(db_session: Session, session_id: Optional[int], source, on_chunk=None):
+    """Parse a statement chunk by chunk, inserting and committing each chunk's rows before
+    reading the next; for worker threads. Returns (session_id, summary).
 
+    Only one chunk of rows is in memory at a time: the summary holds the aggregates,
+    transaction_count and the first UPLOAD_PREVIEW_ROWS rows (the rest are paged from
+    /summary/transactions). Each commit holds db.sync_write_lock, so it queues with the
+    handlers' writes instead of sleeping in SQLite's busy handler.
+    """
+    with db.sync_write_lock():
+        session_id = begin_statement(db_session, session_id)
+        db_session.commit()
+    summary = utils.empty_summary()
+    chunks = utils.iter_csv_chunks(source, CSV_CHUNK_ROWS)
+    while True:
+        with metrics.span("parse"):
+            part = next(chunks, None)
+        if part is None:
+            break
+        rows = utils.fold_chunk(summary, part, UPLOAD_PREVIEW_ROWS)
+        with db.sync_write_lock(), metrics.span("db_write"):
+            insert_transactions(db_session, session_id, rows)
+            db_session.commit()
+        if on_chunk is not None:
+            on_chunk(summary)
+    summary["monthly"] = dict(sorted(summary["monthly"].items()))
+    with db.sync_write_lock():
+        save_summary(db_session, session_id, summary)
+        db_session.commit()
+    return session_id, summary
+
+
+async def ingest_upload(path: str, session_id: Optional[int]):
+    """ingest_statement for /upload: each chunk is parsed in a worker thread without the write
+    lock, then its rows are inserted and committed under it, so /chat writes are not queued
+    behind the parse. Returns (session_id, summary).
+
+    The first chunk is parsed before the session's old rows are cleared, so a file whose columns
+    can't be detected leaves them alone; a later failure removes the partial rows and the old
+    summary, as a failed upload job does.
+    """
+    summary = utils.empty_summary()
+    chunks = utils.iter_csv_chunks(path, CSV_CHUNK_ROWS)
+    try:
+        with metrics.span("parse"):
+            part = await asyncio.to_thread(next, chunks, None)
+        session_id = await locked_write(begin_statement, session_id)
+        try:
+            while part is not None:
+                rows = utils.fold_chunk(summary, part, UPLOAD_PREVIEW_ROWS)
+                await locked_write(insert_transactions, session_id, rows)
+                with metrics.span("parse"):
+                    part = await asyncio.to_thread(next, chunks, None)
+            summary["monthly"] = dict(sorted(summary["monthly"].items()))
+            await locked_write(save_summary, session_id, summary)
+        except Exception:
+            await locked_write(discard_statement, session_id)
+            raise
+    finally:
+        chunks.close()
+    return session_id, summary
+
+
+def run_upload_job(job: models.Job, report) -> dict:
+    """Job handler: stream a spooled statement into the transactions table chunk by chunk.
+
+    Runs on the job's own session, committing each chunk's rows (and the job's progress) as it
+    goes: memory stays at one chunk and the SQLite write lock is released between chunks. The
+    session is recorded on the job before the first row, so a retry after a crash replaces the
+    partial rows; a failed parse removes them along with the session's old summary.
+    """
+    db_session = object_session(job)
+    with db.sync_write_lock():
+        job.session_id = ensure_session(db_session, job.session_id)
+        db_session.commit()
+    try:
+        with open(job.file_path, "rb") as f:
+            session_id, summary = ingest_statement(
+                db_session, job.session_id, f,
+                on_chunk=lambda partial: report(partial["transaction_count"], f.tell()),
+            )
+    except Exception:
+        db_session.rollback()
+        with db.sync_write_lock():
+            discard_statement(db_session, job.session_id)
+            db_session.commit()
+        raise
+    metrics.UPLOAD_ROWS.inc(summary["transaction_count"], source="job")
     return {
         "total_income": summary["total_income"],
         "total_expenses": summary["total_expenses"],
         "potential_deductions": summary["potential_deductions"],
+        "section_totals": summary["section_totals"],
+        "transaction_count": summary["transaction_count"],
+        "session_id": session_id,
+    }
+
+
+job_queue = jobs.JobQueue({"upload": run_upload_job})
+
+
+def submit_upload(tmp_path: str, filename: str, session_id: Optional[int]) -> str:
+    """Move a spooled upload into the job spool dir and queue it; returns the job id"""
+    os.makedirs(jobs.JOB_SPOOL_DIR, exist_ok=True)
+    job_path = os.path.join(jobs.JOB_SPOOL_DIR, os.path.basename(tmp_path))
+    shutil.move(tmp_path, job_path)
+    try:
+        return job_queue.submit("upload", job_path, filename, session_id)
+    except jobs.QueueFull as e:
+        os.unlink(job_path)
+        raise HTTPException(status_code=429, detail=f"Too many uploads in progress ({e}), try again later")
+
+
+async def queue_upload(tmp_path: str, filename: str, session_id: Optional[int]) -> JSONResponse:
+    """submit_upload off the event loop (a file move and a sync count/insert/commit); 202 with the job status"""
+    async with db.write_lock():
+        job_id = await asyncio.to_thread(submit_upload, tmp_path, filename, session_id)
+    return JSONResponse(status_code=202, content={"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"})
+
+
+@app.post("/upload", response_model=UploadResponse)
+async def upload_csv(
+    file: UploadFile = File(...),
+    session_id: int = Form(None),
+    background: bool = Form(False),
+):
+    """Parse a statement; large files (or background=true) return 202 with a job id to poll instead.
+
+    Rows are classified and inserted one CSV_CHUNK_ROWS chunk at a time; the response carries the
+    totals, transaction_count and the first UPLOAD_PREVIEW_ROWS transactions.
+    """
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="Only CSV files are supported")
+    # Spool the upload to disk in chunks instead of holding the whole file in memory
+    tmp_path = await spool_upload(file)
+    if background or os.path.getsize(tmp_path) > UPLOAD_BACKGROUND_BYTES:
+        return await queue_upload(tmp_path, file.filename, session_id)
+    try:
+        session_id, summary = await ingest_upload(tmp_path, session_id)
+    except SQLAlchemyError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to parse CSV: {e}")
+    finally:
+        os.unlink(tmp_path)
+    metrics.UPLOAD_ROWS.inc(summary["transaction_count"], source="upload")
+
+    return {
+        "total_income": summary["total_income"],
+        "total_expenses": summary["total_expenses"],
+        "potential_deductions": summary["potential_deductions"],
+        "section_totals": summary["section_totals"],
+        "transaction_count": summary["transaction_count"],
         "transactions": summary["transactions"],
         "session_id": session_id,
     }
 
 
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str, db_session: AsyncSession = Depends(db.get_async_db)):
+    job = await db_session.get(models.Job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return jobs.job_status(job)
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Process pool for batch parsing (spawned, so workers don't inherit the RAG warm-up thread)"""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=UPLOAD_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _parse_pool
+
+
+def extract_zip_csvs(zip_path: str, budget: int) -> list:
+    """Extract the .csv members of a zip to temp files; returns [(name, path)].
+
+    budget caps the total uncompressed bytes so a zip bomb can't fill the disk.
+    """
+    extracted = []
+    try:
+        with zipfile.ZipFile(zip_path) as zf:
+            for info in zf.infolist():
+                name = os.path.basename(info.filename)
+                if info.is_dir() or not name.lower().endswith(".csv") or info.filename.startswith("__MACOSX"):
+                    continue
+                with zf.open(info) as src, tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as dst:
+                    extracted.append((name, dst.name))
+                    while True:
+                        block = src.read(UPLOAD_READ_BYTES)
+                        if not block:
+                            break
+                        budget -= len(block)
+                        if budget < 0:
+                            raise HTTPException(status_code=413, detail=f"Zip contents exceed {MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit")
+                        dst.write(block)
+    except zipfile.BadZipFile:
+        for _, path in extracted:
+            os.unlink(path)
+        raise HTTPException(status_code=400, detail="Invalid zip file")
+    except Exception:
+        for _, path in extracted:
+            os.unlink(path)
+        raise
+    return extracted
+
+
+@app.post("/upload/batch", response_model=BatchUploadResponse)
+async def upload_batch(
+    files: List[UploadFile] = File(...),
+    session_id: int = Form(None),
+    db_session: AsyncSession = Depends(db.get_async_db),
+):
+    """Upload several statements (CSVs and/or zips of CSVs) into one session.
+
+    Files are parsed in parallel in a process pool; rows repeated across overlapping
+    statements (same date, description and amount) are counted once.
+    """
+    statements = []  # (filename, temp path)
+    try:
+        for file in files:
+            name = file.filename or ""
+            if name.lower().endswith(".zip"):
+                zip_path = await spool_upload(file, suffix=".zip")
+                try:
+                    statements.extend(extract_zip_csvs(zip_path, MAX_UPLOAD_BYTES))
+                finally:
+                    os.unlink(zip_path)
+            elif name.lower().endswith(".csv"):
+                statements.append((name, await spool_upload(file)))
+            else:
+                raise HTTPException(status_code=400, detail=f"{name}: only CSV or zip files are supported")
+        if not statements:
+            raise HTTPException(status_code=400, detail="No CSV files in upload")
+
+        loop = asyncio.get_running_loop()
+        pool = get_parse_pool()
+        futures = [loop.run_in_executor(pool, utils.parse_csv, path, CSV_CHUNK_ROWS) for _, path in statements]
+        with metrics.span("parse"):
+            results = await asyncio.gather(*futures, return_exceptions=True)
+    finally:
+        for _, path in statements:
+            os.unlink(path)
+
+    for (name, _), result in zip(statements, results):
+        if isinstance(result, Exception):
+            raise HTTPException(status_code=400, detail=f"Failed to parse {name}: {result}")
+
+    with metrics.span("merge"):
+        merged = await asyncio.to_thread(utils.merge_statements, results)
+    metrics.UPLOAD_ROWS.inc(len(merged["transactions"]), source="batch")
+    async with db.write_lock():
+        with metrics.span("db_write"):
+            session_id = await db_session.run_sync(save_statement, session_id, merged)
+            await db_session.commit()
+
+    return {
+        "total_income": merged["total_income"],
+        "total_expenses": merged["total_expenses"],
+        "potential_deductions": merged["potential_deductions"],
+        "section_totals": merged["section_totals"],
+        "transaction_count": len(merged["transactions"]),
+        "duplicates_removed": merged["duplicates_removed"],
+        "files": [
+            {"filename": name, "transaction_count": len(result["transactions"])}
+            for (name, _), result in zip(statements, results)
+        ],
+        "session_id": session_id,
+    }
+
+
+TRANSACTION_COLUMNS = (
+    models.Transaction.date,
+    models.Transaction.description,
+    models.Transaction.amount,
+    models.Transaction.category,
+    models.Transaction.section,
+)
+
+TRANSACTION_SORTS = {
+    "date": (models.Transaction.date.asc(), models.Transaction.id.asc()),
+    "-date": (models.Transaction.date.desc(), models.Transaction.id.desc()),
+    "amount": (models.Transaction.amount.asc(), models.Transaction.id.asc()),
+    "-amount": (models.Transaction.amount.desc(), models.Transaction.id.desc()),
+}
+
+
+def transaction_rows(rows) -> list:
+    return [
+        {"date": date, "description": description, "amount": amount, "category": category, "section": section}
+        for date, description, amount, category, section in rows
+    ]
+
+
 @app.get("/summary")
-async def get_summary(session_id: int):
-    db_session = next(db.get_db())
-    summ = db_session.query(models.Summary).filter(models.Summary.session_id == session_id).first()
+async def get_summary(session_id: int, include_transactions: bool = False, db_session: AsyncSession = Depends(db.get_async_db)):
+    """Aggregates for a session; include_transactions=true also returns every row (prefer /summary/transactions)"""
+    summ = await db_session.scalar(select(models.Summary).where(models.Summary.session_id == session_id))
     if not summ:
         raise HTTPException(status_code=404, detail="Summary not found for session")
-    return json.loads(summ.data)
+    data = json.loads(summ.data)
+    if include_transactions:
+        query = (
+            select(*TRANSACTION_COLUMNS)
+            .where(models.Transaction.session_id == session_id)
+            .order_by(models.Transaction.id)
+        )
+        data["transactions"] = transaction_rows(await db_session.execute(query))
+    return data
 
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat(req: ChatRequest):
-    db_session = next(db.get_db())
-    # ensure session
-    if req.session_id is None:
-        s = models.Session()
-        db_session.add(s)
-        db_session.commit()
-        db_session.refresh(s)
-        session_id = s.id
-    else:
-        session_id = req.session_id
-        s = db_session.query(models.Session).get(session_id)
-        if s is None:
-            s = models.Session()
-            db_session.add(s)
-            db_session.commit()
-            db_session.refresh(s)
-            session_id = s.id
+@app.get("/summary/transactions", response_model=TransactionPage)
+async def get_transactions(
+    session_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    category: str = None,
+    section: str = None,
+    date_from: str = None,
+    date_to: str = None,
+    min_amount: float = None,
+    max_amount: float = None,
+    sort: str = Query("date", pattern="^-?(date|amount)$"),
+    db_session: AsyncSession = Depends(db.get_async_db),
+):
+    """One page of a session's transactions; date_to is inclusive.
 
-    # save user message
-    msg = models.Message(session_id=session_id, role='user', content=req.message)
-    db_session.add(msg)
-    db_session.commit()
+    Dates are stored as YYYY-MM-DD, so they filter and sort as strings; date_from/date_to
+    accept the same formats as a statement.
+    """
+    bounds = {}
+    for name, value in (("date_from", date_from), ("date_to", date_to)):
+        if value is not None:
+            bounds[name] = utils.iso_date(value)
+            if bounds[name] is None:
+                raise HTTPException(status_code=400, detail=f"Unrecognised {name}: {value}")
+    query = select(*TRANSACTION_COLUMNS).where(models.Transaction.session_id == session_id)
+    if category is not None:
+        query = query.where(models.Transaction.category == category)
+    if section is not None:
+        query = query.where(models.Transaction.section == section)
+    if "date_from" in bounds:
+        query = query.where(models.Transaction.date >= bounds["date_from"])
+    if "date_to" in bounds:
+        query = query.where(models.Transaction.date <= bounds["date_to"])
+    if min_amount is not None:
+        query = query.where(models.Transaction.amount >= min_amount)
+    if max_amount is not None:
+        query = query.where(models.Transaction.amount <= max_amount)
 
-    # retrieve summary if exists
-    summ = db_session.query(models.Summary).filter(models.Summary.session_id == session_id).first()
-    summary_text = "No uploaded data available."
-    if summ:
-        summary_text = summ.data
+    total = await db_session.scalar(select(func.count()).select_from(query.subquery()))
+    rows = await db_session.execute(query.order_by(*TRANSACTION_SORTS[sort]).offset(offset).limit(limit))
+    items = transaction_rows(rows)
+    next_offset = offset + limit if offset + limit < total else None
+    return {"items": items, "total": total, "limit": limit, "offset": offset, "next_offset": next_offset}
+
+
+@app.post("/tax/compute")
+async def compute_tax(req: TaxComputeRequest, db_session: AsyncSession = Depends(db.get_async_db)):
+    """Tax under the old and new regimes, from explicit figures and/or a session's statement.
+
+    income and deductions in the request override what the statement shows, section by section.
+    """
+    aggregates = {}
+    if req.session_id is not None:
+        summary_data = await db_session.scalar(select(models.Summary.data).where(models.Summary.session_id == req.session_id))
+        if summary_data is None:
+            raise HTTPException(status_code=404, detail="Summary not found for session")
+        aggregates = json.loads(summary_data)
+    income = req.income if req.income is not None else aggregates.get("total_income", 0.0)
+    if not income:
+        raise HTTPException(status_code=400, detail="Provide income or a session_id with uploaded income")
+    deductions = {**tax.deductions_from_summary(aggregates), **(req.deductions or {})}
+    fy = req.fy or tax.infer_fy(aggregates)
+    try:
+        result = tax.compute_tax(income, deductions, fy, req.salaried)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    note = None if req.fy else tax.fy_note(aggregates, fy)
+    if note:
+        result["fy_note"] = note
+    return result
 
-    system_prompt = """You are TaxEase AI, an expert Indian tax assistant specializing in Income Tax, GST, and financial planning. 
+
+SYSTEM_PROMPT = """You are TaxEase AI, an expert Indian tax assistant specializing in Income Tax, GST, and financial planning. 
     
     Your knowledge includes:
     - Indian Income Tax Act (Sections 80C, 80D, 24, etc.)
@@ -128,17 +650,148 @@ async def chat(req: ChatRequest):
     
     Always provide amounts in Indian Rupees (₹). Be helpful, accurate, and suggest legitimate tax-saving strategies. 
     Recommend consulting a CA for complex cases."""
-    
-    prompt = f"Session summary: {summary_text}\n\nUser question: {req.message}\n\nProvide a helpful answer based on the user's financial data and Indian tax regulations. Include specific section numbers (80C, 80D, etc.) when relevant."
 
-    try:
-        reply = llm.ask_llm(prompt, system=system_prompt)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
-    # save assistant message
-    amsg = models.Message(session_id=session_id, role='assistant', content=reply)
-    db_session.add(amsg)
-    db_session.commit()
+async def start_chat_turn(db_session: AsyncSession, req: ChatRequest):
+    """Build the prompt for a chat turn from the session's stored data; read-only.
+
+    Returns (session_id or None for a new session, prompt, LLM context, cache context key for
+    the session's aggregates and history, conversation history, direct reply). The LLM context is
+    {"question", "summary"}: the question and the parsed aggregates, handed to the providers
+    so the mock LLM needn't parse them back out of the prompt. The direct reply is set when
+    the tax engine can answer a numeric question without the LLM. Nothing is written until
+    record_chat_turn.
+    """
+    session_id, summary_data = None, None
+    if req.session_id is not None:
+        # session and its summary (if any) in one round trip
+        row = (await db_session.execute(
+            select(models.Session.id, models.Summary.data)
+            .outerjoin(models.Summary, models.Summary.session_id == models.Session.id)
+            .where(models.Session.id == req.session_id)
+        )).first()
+        if row is not None:
+            session_id, summary_data = row
+
+    aggregates = json.loads(summary_data) if summary_data else None
+    direct_reply = tax.answer_tax_question(req.message, aggregates)
+
+    summary_text = "No uploaded data available."
+    if aggregates and direct_reply is None:
+        # Aggregates plus the transactions relevant to this question, within PROMPT_TOKEN_BUDGET
+        summary_text = prompt_context.build_summary_context(
+            aggregates,
+            await prompt_context.relevant_transactions(db_session, session_id, req.message),
+        )
+
+    # last few turns verbatim plus the rolling summary of older ones
+    history = await memory.load_history(db_session, session_id) if session_id is not None else None
+    history_text = memory.format_history(history)
+    ctx = cache.context_key(summary_data, history_text)
+    # end the read transaction so the connection goes back to the pool during the LLM call
+    await db_session.rollback()
+
+    prompt = f"Session summary: {summary_text}\n\n"
+    if history_text:
+        prompt += f"{history_text}\n\n"
+    prompt += f"User question: {req.message}\n\nProvide a helpful answer based on the user's financial data and Indian tax regulations. Include specific section numbers (80C, 80D, etc.) when relevant."
+    llm_context = {"question": req.message, "summary": aggregates or {}}
+    return session_id, prompt, llm_context, ctx, history, direct_reply
+
+
+async def cache_call(fn, *args):
+    """Semantic cache lookups embed the question, so keep them off the event loop"""
+    if answer_cache.embed is not None:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+
+async def record_chat_turn(
+    db_session: AsyncSession, session_id: Optional[int], question: str, reply: str, history: Optional[dict] = None
+) -> int:
+    """Save the user message and the reply in one commit; session_id None creates a new session.
+
+    Turns pushed out of the history window are folded into the rolling summary in the same commit.
+    """
+    folded = memory.fold_history(history) if history else None
+    with metrics.span("persist"):
+        async with db.write_lock():
+            if session_id is None:
+                session_id = await db_session.run_sync(ensure_session, None)
+            db_session.add_all([
+                models.Message(session_id=session_id, role='user', content=question),
+                models.Message(session_id=session_id, role='assistant', content=reply),
+            ])
+            if folded:
+                await memory.save_memory(db_session, session_id, folded)
+            await db_session.commit()
+    return session_id
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(req: ChatRequest, db_session: AsyncSession = Depends(db.get_async_db)):
+    with metrics.span("prompt"):
+        session_id, prompt, llm_context, ctx, history, reply = await start_chat_turn(db_session, req)
+
+    if reply is None:
+        reply = await cache_call(answer_cache.get, req.message, ctx)
+    if reply is None:
+        try:
+            reply = await llm.ask_llm_async(prompt, system=SYSTEM_PROMPT, context=llm_context)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        await cache_call(answer_cache.put, req.message, ctx, reply)
+
+    # save both messages
+    session_id = await record_chat_turn(db_session, session_id, req.message, reply, history)
 
     return {"reply": reply, "session_id": session_id}
+
+
+def sse_event(data: dict, event: str = None) -> str:
+    """Format one Server-Sent Events frame"""
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest, db_session: AsyncSession = Depends(db.get_async_db)):
+    """Like /chat but relays the reply as Server-Sent Events.
+
+    Frames: `session` (session_id, null for a new session) first, then `data: {"token": ...}`
+    per chunk, then `done` with the session_id once the turn is saved, or `error`.
+    """
+    with metrics.span("prompt"):
+        session_id, prompt, llm_context, ctx, history, direct_reply = await start_chat_turn(db_session, req)
+
+    async def save(reply: str) -> int:
+        # the request's session is closed once the handler returns, so the generator uses its own
+        async with db.AsyncSessionLocal() as write_session:
+            return await record_chat_turn(write_session, session_id, req.message, reply, history)
+
+    async def events():
+        yield sse_event({"session_id": session_id}, event="session")
+        cached = direct_reply or await cache_call(answer_cache.get, req.message, ctx)
+        if cached is not None:
+            for piece in providers.chunk_words(cached):
+                yield sse_event({"token": piece})
+            yield sse_event({"session_id": await save(cached)}, event="done")
+            return
+
+        parts = []
+        try:
+            async for token in llm.ask_llm_stream(prompt, system=SYSTEM_PROMPT, context=llm_context):
+                parts.append(token)
+                yield sse_event({"token": token})
+        except Exception as e:
+            yield sse_event({"detail": str(e)}, event="error")
+            return
+        reply = "".join(parts)
+        await cache_call(answer_cache.put, req.message, ctx, reply)
+        yield sse_event({"session_id": await save(reply)}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,116 @@
+"""
+Conversation memory for /chat
+The last HISTORY_TURNS turns go into the prompt verbatim; older turns are folded into a
+rolling per-session summary, so the history context stays under a fixed token budget
+however long the session grows.
+"""
+import os
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+
+import models
+from prompt_context import count_tokens
+
+HISTORY_TURNS = int(os.getenv("HISTORY_TURNS", "4"))
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "800"))
+MEMORY_SUMMARY_TOKENS = int(os.getenv("MEMORY_SUMMARY_TOKENS", "300"))
+# Older messages fetched alongside the window, so folding needs no extra query
+HISTORY_FOLD_BATCH = 20
+
+QUESTION_CHARS = 120
+ANSWER_CHARS = 160
+
+
+def window_size() -> int:
+    """Messages kept verbatim (a turn is a user message plus the reply)"""
+    return HISTORY_TURNS * 2
+
+
+async def load_history(db_session, session_id: int) -> Dict:
+    """Recent messages (oldest first) plus the session's rolling summary.
+
+    Reads the newest messages through the (session_id, timestamp) index, so the cost
+    doesn't grow with the session.
+    """
+    M = models.Message
+    rows = await db_session.execute(
+        select(M.id, M.role, M.content)
+        .where(M.session_id == session_id)
+        .order_by(M.timestamp.desc(), M.id.desc())
+        .limit(window_size() + HISTORY_FOLD_BATCH)
+    )
+    messages = [{"id": id_, "role": role, "content": content} for id_, role, content in rows]
+    messages.reverse()
+    memory = await db_session.scalar(select(models.ChatMemory).where(models.ChatMemory.session_id == session_id))
+    return {
+        "summary": memory.summary if memory else "",
+        "summarized_through": memory.summarized_through if memory else 0,
+        "messages": messages,
+    }
+
+
+def format_history(history: Optional[Dict], budget: int = HISTORY_TOKEN_BUDGET) -> str:
+    """Prompt section with the rolling summary and as many recent messages as fit the budget"""
+    if not history or not (history["summary"] or history["messages"]):
+        return ""
+    used = 0
+    parts = []
+    if history["summary"]:
+        summary = f"Earlier in this conversation:\n{history['summary']}"
+        used = count_tokens(summary)
+        parts.append(summary)
+
+    recent = []
+    for m in reversed(history["messages"][-window_size():]):
+        line = f"{'User' if m['role'] == 'user' else 'Assistant'}: {m['content']}"
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            break
+        recent.append(line)
+        used += cost
+    if recent:
+        parts.append("Recent conversation:\n" + "\n".join(reversed(recent)))
+    return "\n\n".join(parts)
+
+
+def _snippet(text: str, limit: int, first_sentence: bool = False) -> str:
+    text = " ".join((text or "").split())
+    if first_sentence:
+        text = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def fold_history(history: Dict, new_messages: int = 2) -> Optional[Dict]:
+    """Fold messages pushed out of the window by this turn into the rolling summary.
+
+    Returns {"summary", "summarized_through"} to store, or None if nothing left the window.
+    The summary is extractive (question, first sentence of the answer) and trimmed from
+    the oldest line to MEMORY_SUMMARY_TOKENS.
+    """
+    keep = max(window_size() - new_messages, 0)
+    messages = history["messages"]
+    leaving = [m for m in messages[:len(messages) - keep] if m["id"] > history["summarized_through"]]
+    if not leaving:
+        return None
+
+    lines = history["summary"].splitlines() if history["summary"] else []
+    for m in leaving:
+        if m["role"] == "user":
+            lines.append(f"- User asked: {_snippet(m['content'], QUESTION_CHARS)}")
+        else:
+            lines.append(f"  Answer: {_snippet(m['content'], ANSWER_CHARS, first_sentence=True)}")
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > MEMORY_SUMMARY_TOKENS:
+        lines.pop(0)
+    return {"summary": "\n".join(lines), "summarized_through": leaving[-1]["id"]}
+
+
+async def save_memory(db_session, session_id: int, folded: Dict):
+    """Upsert the session's rolling summary (committed with the chat turn)"""
+    memory = await db_session.scalar(select(models.ChatMemory).where(models.ChatMemory.session_id == session_id))
+    if memory is None:
+        db_session.add(models.ChatMemory(session_id=session_id, **folded))
+    else:
+        memory.summary = folded["summary"]
+        memory.summarized_through = folded["summarized_through"]
@@ -0,0 +1,292 @@
+"""
+Hot-path instrumentation: Prometheus-format metrics, stage timing spans and an opt-in sampling profiler
+span("stage") records into taxease_stage_duration_seconds and, inside a request, into its
+Server-Timing header. With PROFILE_SAMPLE_RATE > 0 that fraction of requests is stack-sampled
+and written to PROFILE_DIR as collapsed stacks (input for flamegraph.pl or speedscope).
+"""
+import asyncio
+import bisect
+import contextvars
+import itertools
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter as StackCounter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+REGISTRY: List["Metric"] = []
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        f'{k}="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (last one is +Inf), sum, count]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self._lock:
+            values = {key: (list(counts), total, n) for key, (counts, total, n) in self._values.items()}
+        for key, (counts, total, n) in sorted(values.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                yield f"{self.name}_bucket{_format_labels({**labels, 'le': le})} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(labels)} {n}"
+
+
+class CallbackMetric(Metric):
+    """Values read at scrape time, for counters another module already keeps (e.g. cache stats)"""
+
+    def __init__(self, name: str, help: str, type: str, fn: Callable[[], Iterable[Tuple[Dict, float]]]):
+        super().__init__(name, help)
+        self.type = type
+        self.fn = fn
+
+    def samples(self):
+        try:
+            values = list(self.fn())
+        except Exception as e:
+            print(f"⚠️ Metric {self.name} failed: {e}")
+            return
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+HTTP_REQUESTS = Counter("taxease_http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_SECONDS = Histogram("taxease_http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+STAGE_SECONDS = Histogram("taxease_stage_duration_seconds", "Time spent in each hot-path stage", ("stage",))
+UPLOAD_ROWS = Counter("taxease_upload_rows_total", "Statement rows parsed, by entry point", ("source",))
+LLM_REQUESTS = Counter("taxease_llm_requests_total", "LLM generations by provider and outcome", ("provider", "outcome"))
+LLM_FALLBACKS = Counter("taxease_llm_fallbacks_total", "Provider failures that fell through to the next provider", ("provider",))
+
+# Spans finished during the current request, for its Server-Timing header (None outside requests)
+_request_spans: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("request_spans", default=None)
+
+
+@contextmanager
+def span(stage: str):
+    """Time a block as one stage of the hot path"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((stage, elapsed))
+
+
+def server_timing(spans: List[Tuple[str, float]]) -> str:
+    """Server-Timing header value; repeated stages are summed"""
+    totals: Dict[str, float] = {}
+    for stage, elapsed in spans:
+        totals[stage] = totals.get(stage, 0.0) + elapsed
+    return ", ".join(f"{stage};dur={elapsed * 1000:.1f}" for stage, elapsed in totals.items())
+
+
+# Stacks whose leaf frame is in one of these modules or functions are threads waiting, not working
+IDLE_MODULES = {"threading.py", "selectors.py", "queue.py"}
+IDLE_FUNCTIONS = {
+    ("thread.py", "_worker"),  # idle executor thread blocked on its work queue
+    ("core.py", "_connection_worker_thread"),  # idle aiosqlite connection thread
+}
+_profile_lock = threading.Lock()
+_profile_ids = itertools.count(1)
+
+
+class SamplingProfiler:
+    """Samples every thread's Python stack each interval; stacks are kept in collapsed form"""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_MS / 1000):
+        self.interval = interval
+        self.stacks: StackCounter = StackCounter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                leaf = os.path.basename(frame.f_code.co_filename)
+                if ident == me or leaf in IDLE_MODULES or (leaf, frame.f_code.co_name) in IDLE_FUNCTIONS:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path: str):
+        """Collapsed stacks, one "frame;frame;frame count" line per distinct stack"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _profile_path(method: str, route: str, elapsed: float) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(PROFILE_DIR, f"{stamp}-{next(_profile_ids)}-{method}-{slug}-{elapsed * 1000:.0f}ms.folded")
+
+
+def _save_profile(profiler: SamplingProfiler, method: str, route: str, elapsed: float):
+    """Stop a request's profiler and write its stacks (if it took any samples); frees the profile slot"""
+    try:
+        profiler.stop()
+        if profiler.stacks:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = _profile_path(method, route, elapsed)
+            profiler.dump(path)
+            print(f"🔥 Profile ({profiler.samples} samples) written to {path}")
+    except OSError as e:
+        print(f"⚠️ Could not write profile: {e}")
+    finally:
+        _profile_lock.release()
+
+
+class MetricsMiddleware:
+    """ASGI middleware: request counters and latency, Server-Timing spans, sampled profiles"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        spans = []
+        token = _request_spans.set(spans)
+        profiler = None
+        # one profile at a time: concurrent samplers would each record the other requests too
+        if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE and _profile_lock.acquire(blocking=False):
+            profiler = SamplingProfiler()
+            profiler.start()
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if spans:
+                    headers = list(message.get("headers", [])) + [(b"server-timing", server_timing(spans).encode())]
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_spans.reset(token)
+            # the matched route template (e.g. /jobs/{job_id}) keeps label cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_SECONDS.observe(elapsed, method=scope["method"], route=route)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=status)
+            if profiler is not None:
+                # stop() joins the sampler thread and dump() writes a file: both off the event loop
+                await asyncio.to_thread(_save_profile, profiler, scope["method"], route, elapsed)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Index
 from sqlalchemy.types import JSON
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -11,6 +11,7 @@ class Session(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     messages = relationship("Message", back_populates="session")
     summary = relationship("Summary", back_populates="session", uselist=False)
+    transactions = relationship("Transaction", back_populates="session")
 
 class Message(Base):
     __tablename__ = "messages"
@@ -20,11 +21,57 @@ class Message(Base):
     content = Column(Text)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     session = relationship("Session", back_populates="messages")
+    __table_args__ = (
+        Index("ix_messages_session_timestamp", "session_id", "timestamp"),
+    )
 
 class Summary(Base):
     __tablename__ = "summaries"
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("sessions.id"), unique=True)
-    data = Column(Text)  # store JSON string
+    data = Column(Text)  # JSON string of aggregates only; rows live in transactions
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     session = relationship("Session", back_populates="summary")
+
+class ChatMemory(Base):
+    __tablename__ = "chat_memory"
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("sessions.id"), unique=True)
+    summary = Column(Text)  # rolling summary of turns older than the history window
+    summarized_through = Column(Integer, default=0)  # highest messages.id folded into summary
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class Transaction(Base):
+    __tablename__ = "transactions"
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("sessions.id"), index=True)
+    date = Column(String)  # YYYY-MM-DD, so it sorts and filters as a string (as given if unparseable)
+    description = Column(Text)
+    amount = Column(Float)
+    category = Column(String)  # income, expense or deductible
+    section = Column(String, nullable=True)  # deduction section (80C, 80D, 24(b), ...) for deductible rows
+    session = relationship("Session", back_populates="transactions")
+    __table_args__ = (
+        Index("ix_transactions_session_category", "session_id", "category"),
+        Index("ix_transactions_session_date", "session_id", "date"),
+    )
+
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(String, primary_key=True)  # uuid4 hex
+    kind = Column(String, index=True)  # e.g. upload
+    status = Column(String, index=True, default="queued")  # queued, running, done or failed
+    filename = Column(String)
+    file_path = Column(String)  # spooled input, removed once the job finishes
+    session_id = Column(Integer, ForeignKey("sessions.id"), nullable=True)
+    total_bytes = Column(Integer, default=0)
+    bytes_processed = Column(Integer, default=0)
+    rows_processed = Column(Integer, default=0)
+    attempts = Column(Integer, default=0)
+    owner = Column(String)  # JobQueue instance running it (host:pid:id)
+    heartbeat_at = Column(DateTime(timezone=True))  # refreshed on claim and with each progress commit
+    result = Column(Text)  # JSON once done
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
@@ -0,0 +1,101 @@
+"""
+Compact prompt context for /chat
+Sends the session aggregates plus only the transactions relevant to the question,
+kept under a token budget, instead of the whole statement.
+"""
+import json
+import math
+import os
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, or_, select
+
+import models
+import utils
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "1200"))
+PROMPT_TOP_K = int(os.getenv("PROMPT_TOP_K", "10"))
+
+# Question words that point at a whole category rather than a merchant keyword
+CATEGORY_HINTS = {
+    "income": ["income", "salary", "earn"],
+    "deductible": ["deduct", "80c", "80d", "save", "saving", "insurance", "invest"],
+    "expense": ["expense", "spend", "spent", "spending"],
+}
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Tokens per tiktoken's cl100k_base; ~4 chars/token if tiktoken or its BPE file is unavailable"""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def question_terms(question: str) -> Tuple[List[str], List[str], List[str]]:
+    """Classifier keywords, categories and deduction sections mentioned in the question"""
+    q = question.lower()
+    keywords = []
+    for pattern in (utils.INCOME_PATTERN, utils.DEDUCTIBLE_PATTERN, utils.EXPENSE_PATTERN):
+        keywords.extend(pattern.findall(q))
+    categories = [cat for cat, hints in CATEGORY_HINTS.items() if any(h in q for h in hints)]
+    return list(dict.fromkeys(keywords)), categories, utils.sections_in(q)
+
+
+async def relevant_transactions(db_session, session_id: int, question: str, k: int = PROMPT_TOP_K) -> List[Dict]:
+    """Top-k transactions (largest first) matching the question's keywords or categories.
+
+    Falls back to the k largest transactions when the question names neither.
+    """
+    T = models.Transaction
+    keywords, categories, sections = question_terms(question)
+    query = select(T.date, T.description, T.amount, T.category, T.section).where(T.session_id == session_id)
+    conditions = [T.description.ilike(f"%{kw}%") for kw in keywords]
+    if categories:
+        conditions.append(T.category.in_(categories))
+    if sections:
+        conditions.append(T.section.in_(sections))
+    if conditions:
+        query = query.where(or_(*conditions))
+    rows = await db_session.execute(query.order_by(func.abs(T.amount).desc()).limit(k))
+    return [
+        {"date": date, "description": description, "amount": amount, "category": category, "section": section}
+        for date, description, amount, category, section in rows
+    ]
+
+
+def build_summary_context(aggregates: Dict, transactions: List[Dict], budget: int = PROMPT_TOKEN_BUDGET) -> str:
+    """Single-line JSON for the prompt: totals and category totals always, then relevant
+    transactions and monthly rollups (most recent first) while they fit the token budget"""
+    context = {k: v for k, v in aggregates.items() if k != "monthly"}
+    used = count_tokens(json.dumps(context, separators=(",", ":"), ensure_ascii=False))
+
+    picked = []
+    for t in transactions:
+        cost = count_tokens(json.dumps(t, separators=(",", ":"), ensure_ascii=False)) + 1
+        if used + cost > budget:
+            break
+        picked.append(t)
+        used += cost
+
+    monthly = {}
+    for month, totals in sorted(aggregates.get("monthly", {}).items(), reverse=True):
+        cost = count_tokens(json.dumps({month: totals}, separators=(",", ":"))) + 1
+        if used + cost > budget:
+            break
+        monthly[month] = totals
+        used += cost
+
+    if picked:
+        context["relevant_transactions"] = picked
+    if monthly:
+        context["monthly"] = dict(sorted(monthly.items()))
+    return json.dumps(context, separators=(",", ":"), ensure_ascii=False)
@@ -0,0 +1,166 @@
+"""
+Async LLM providers (Ollama, OpenAI, mock) on one shared, pooled httpx client
+"""
+import asyncio
+import json
+import os
+import re
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    import httpx  # imported on first use: mock-only deployments never need it
+
+# Connection pool / concurrency settings shared by every provider
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "64"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+
+_client: Optional["httpx.AsyncClient"] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """Shared keep-alive client for the running event loop (recreated if the loop changes)"""
+    global _client, _semaphore, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        import httpx
+
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_KEEPALIVE),
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+        )
+        _semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        _client_loop = loop
+    return _client
+
+
+def generation_slot() -> asyncio.Semaphore:
+    """Semaphore capping in-flight generations across all providers"""
+    get_http_client()
+    return _semaphore
+
+
+async def close_http_client():
+    global _client, _semaphore, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = _semaphore = _client_loop = None
+
+
+def chunk_words(text: str):
+    """Split a finished reply into word-sized pieces (whitespace kept) for streaming"""
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+class LLMProvider:
+    """Base class: generate() returns the full reply, stream() yields it piece by piece.
+
+    context is the turn's structured data ({"question", "summary"}); providers that send the
+    prompt text to a model ignore it.
+    """
+    name = "base"
+
+    async def generate(self, prompt: str, system: Optional[str] = None, context: Optional[Dict] = None) -> str:
+        parts = []
+        async for token in self.stream(prompt, system, context):
+            parts.append(token)
+        return "".join(parts)
+
+    def stream(self, prompt: str, system: Optional[str] = None, context: Optional[Dict] = None) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+
+class OllamaProvider(LLMProvider):
+    name = "ollama"
+
+    def __init__(self, host: str, payload_builder: Callable[[str, Optional[str], bool], dict]):
+        self.url = f"{host.rstrip('/')}/api/generate"
+        self.payload_builder = payload_builder
+
+    async def generate(self, prompt: str, system: Optional[str] = None, context: Optional[Dict] = None) -> str:
+        async with generation_slot():
+            r = await get_http_client().post(self.url, json=self.payload_builder(prompt, system, False))
+        r.raise_for_status()
+        data = r.json()
+        # Handle Ollama response format
+        if isinstance(data, dict):
+            if "response" in data:
+                return data["response"]
+            elif "text" in data:
+                return data["text"]
+        return str(data)
+
+    async def stream(self, prompt: str, system: Optional[str] = None, context: Optional[Dict] = None) -> AsyncIterator[str]:
+        async with generation_slot():
+            async with get_http_client().stream("POST", self.url, json=self.payload_builder(prompt, system, True)) as r:
+                r.raise_for_status()
+                # Ollama streams one JSON object per line until "done": true
+                async for line in r.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    token = data.get("response", "")
+                    if token:
+                        yield token
+                    if data.get("done"):
+                        break
+
+
+class OpenAIProvider(LLMProvider):
+    """Chat Completions over REST, so it shares the pooled client instead of the blocking SDK"""
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str, base_url: str = "https://api.openai.com/v1", max_tokens: int = 800):
+        self.url = f"{base_url.rstrip('/')}/chat/completions"
+        self.headers = {"Authorization": f"Bearer {api_key}"}
+        self.model = model
+        self.max_tokens = max_tokens
+
+    def _payload(self, prompt: str, system: Optional[str], stream: bool) -> dict:
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+        return {"model": self.model, "messages": messages, "max_tokens": self.max_tokens, "stream": stream}
+
+    async def generate(self, prompt: str, system: Optional[str] = None, context: Optional[Dict] = None) -> str:
+        async with generation_slot():
+            r = await get_http_client().post(self.url, json=self._payload(prompt, system, False), headers=self.headers)
+        r.raise_for_status()
+        return r.json()["choices"][0]["message"]["content"]
+
+    async def stream(self, prompt: str, system: Optional[str] = None, context: Optional[Dict] = None) -> AsyncIterator[str]:
+        async with generation_slot():
+            async with get_http_client().stream(
+                "POST", self.url, json=self._payload(prompt, system, True), headers=self.headers
+            ) as r:
+                r.raise_for_status()
+                # SSE: "data: {...}" lines, terminated by "data: [DONE]"
+                async for line in r.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data = line[len("data: "):]
+                    if data.strip() == "[DONE]":
+                        break
+                    token = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                    if token:
+                        yield token
+
+
+class MockProvider(LLMProvider):
+    """Rule-based replies from a sync function of (prompt, system, context); streamed word by word"""
+    name = "mock"
+
+    def __init__(self, respond: Callable[[str, Optional[str], Optional[Dict]], str]):
+        self.respond = respond
+
+    async def generate(self, prompt: str, system: Optional[str] = None, context: Optional[Dict] = None) -> str:
+        return self.respond(prompt, system, context)
+
+    async def stream(self, prompt: str, system: Optional[str] = None, context: Optional[Dict] = None) -> AsyncIterator[str]:
+        for piece in chunk_words(self.respond(prompt, system, context)):
+            yield piece
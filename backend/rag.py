@@ -1,53 +1,185 @@
 """
 RAG System for Indian Tax Knowledge Base
-Uses ChromaDB + Sentence Transformers for semantic search
+Uses Sentence Transformers for semantic search over a NumPy or ChromaDB vector store
 """
+import atexit
+import hashlib
+import json
 import os
-from typing import List, Dict
-from sentence_transformers import SentenceTransformer
-import chromadb
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Dict, Optional
 import re
+import numpy as np
+
+import lexical
+import metrics
+import vector_store
+
+EMBEDDING_MODEL_NAME = 'sentence-transformers/paraphrase-multilingual-mpnet-base-v2'
+
+# How the embedding model runs on CPU: torch (full precision), int8 (Linear layers dynamically
+# quantized to int8) or onnx (ONNX Runtime, needs sentence-transformers[onnx])
+RAG_EMBEDDING_BACKEND = os.getenv("RAG_EMBEDDING_BACKEND", "torch").lower()
+# ONNX file in the model repo for the onnx backend, e.g. onnx/model_qint8_avx2.onnx (default onnx/model.onnx)
+RAG_ONNX_FILE = os.getenv("RAG_ONNX_FILE")
+EMBEDDING_BACKENDS = ("torch", "int8", "onnx")
+
+# Query embedding cache: capacity (0 disables) and optional .npz file persisted across restarts
+RAG_QUERY_CACHE_SIZE = int(os.getenv("RAG_QUERY_CACHE_SIZE", "2048"))
+RAG_QUERY_CACHE_PATH = os.getenv("RAG_QUERY_CACHE_PATH")
+
+# Re-hash knowledge/ on startup and index only changed chunks
+RAG_SYNC_ON_STARTUP = os.getenv("RAG_SYNC_ON_STARTUP", "true").lower() == "true"
+
+# BM25 over the same chunks: queries naming a section/form skip the embedding, others fuse both rankings
+RAG_LEXICAL = os.getenv("RAG_LEXICAL", "true").lower() == "true"
+# Vector hits fetched per query for fusion with the BM25 ranking
+RAG_FUSION_CANDIDATES = int(os.getenv("RAG_FUSION_CANDIDATES", "20"))
+
+# Vector store backend: numpy (memory-mapped .npy, exact search) or chroma
+RAG_VECTOR_STORE = os.getenv("RAG_VECTOR_STORE", "numpy").lower()
+RAG_STORE_PATH = os.getenv("RAG_STORE_PATH") or vector_store.default_path(RAG_VECTOR_STORE)
+
+
+def embedding_model_id(backend: str = RAG_EMBEDDING_BACKEND) -> str:
+    """Names the vectors a backend produces; the query cache and the NumPy index are rebuilt when it changes"""
+    if backend == "torch":
+        return EMBEDDING_MODEL_NAME
+    if backend == "onnx" and RAG_ONNX_FILE:
+        return f"{EMBEDDING_MODEL_NAME}#onnx:{RAG_ONNX_FILE}"
+    return f"{EMBEDDING_MODEL_NAME}#{backend}"
+
+
+def load_embedding_model(backend: str = RAG_EMBEDDING_BACKEND):
+    """SentenceTransformer running on the chosen backend; encode() is the same for all of them"""
+    # Imported here so rag_status()/get_rag() stay cheap to import before warm-up
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(EMBEDDING_MODEL_NAME, device='cpu')
+    if backend == "int8":
+        import torch
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME, device='cpu')
+        # int8 weights for every Linear layer, activations quantized on the fly
+        torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        return model
+    if backend == "onnx":
+        model_kwargs = {"file_name": RAG_ONNX_FILE} if RAG_ONNX_FILE else None
+        return SentenceTransformer(EMBEDDING_MODEL_NAME, device='cpu', backend="onnx", model_kwargs=model_kwargs)
+    raise ValueError(f"Unknown embedding backend: {backend!r} (expected one of {', '.join(EMBEDDING_BACKENDS)})")
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: lowercased with whitespace collapsed"""
+    return " ".join(query.lower().split())
+
+
+class EmbeddingCache:
+    """Thread-safe LRU of query embeddings, optionally persisted to an .npz file"""
+
+    def __init__(self, capacity: int = 2048, path: Optional[str] = None, model_id: str = ""):
+        self.capacity = capacity
+        self.path = path
+        self.model_id = model_id
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path and os.path.exists(path):
+            self.load()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vec = self._entries.get(key)
+            if vec is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vec
+
+    def put(self, key: str, vec: np.ndarray):
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._entries[key] = np.asarray(vec, dtype=np.float32)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def load(self):
+        """Load persisted embeddings; ignored if they came from a different model"""
+        try:
+            data = np.load(self.path, allow_pickle=False)
+            if str(data["model_id"]) != self.model_id:
+                print(f"Query cache {self.path} was built with another model, ignoring")
+                return
+            with self._lock:
+                for key, vec in zip(data["keys"].tolist(), data["vectors"]):
+                    self._entries[key] = vec
+            print(f"Loaded {len(self._entries)} cached query embeddings")
+        except Exception as e:
+            print(f"Warning: could not load query cache {self.path}: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            if not self._entries:
+                return
+            keys = np.array(list(self._entries.keys()))
+            vectors = np.stack(list(self._entries.values()))
+        # through a file handle: np.savez(path) appends .npz to a path without it, which load() then misses
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, keys=keys, vectors=vectors, model_id=np.array(self.model_id))
+        os.replace(tmp, self.path)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "persisted_to": self.path,
+            }
+
 
 class IndianTaxRAG:
     def __init__(self, knowledge_dir: str = "./knowledge", collection_name: str = "indian_tax_kb"):
-        """Initialize RAG system with ChromaDB and sentence transformers"""
+        """Initialize RAG system with the configured vector store and sentence transformers"""
         self.knowledge_dir = knowledge_dir
         self.collection_name = collection_name
         
         # Initialize embedding model (multilingual for Hindi support)
-        print("Loading embedding model...")
-        self.embedding_model = SentenceTransformer('sentence-transformers/paraphrase-multilingual-mpnet-base-v2', device='cpu')
-        
-        # Initialize ChromaDB with persistent client (new API)
-        print("Initializing ChromaDB...")
-        try:
-            # Try new ChromaDB API first (v0.4+)
-            self.chroma_client = chromadb.PersistentClient(path="./chroma_db")
-        except (AttributeError, TypeError):
-            # Fallback to older API if needed
-            try:
-                from chromadb.config import Settings
-                self.chroma_client = chromadb.Client(Settings(
-                    chroma_db_impl="duckdb+parquet",
-                    persist_directory="./chroma_db"
-                ))
-            except Exception as e:
-                print(f"Warning: Falling back to in-memory ChromaDB: {e}")
-                self.chroma_client = chromadb.Client()
+        print(f"Loading embedding model ({RAG_EMBEDDING_BACKEND})...")
+        self.embedding_model = load_embedding_model()
+        self.query_cache = EmbeddingCache(RAG_QUERY_CACHE_SIZE, RAG_QUERY_CACHE_PATH, model_id=embedding_model_id())
+        if RAG_QUERY_CACHE_PATH:
+            atexit.register(self.query_cache.save)
         
-        # Get or create collection
-        try:
-            self.collection = self.chroma_client.get_collection(name=collection_name)
-            print(f"Loaded existing collection: {collection_name}")
-        except:
-            self.collection = self.chroma_client.create_collection(
-                name=collection_name,
-                metadata={"description": "Indian Tax Knowledge Base"}
-            )
-            print(f"Created new collection: {collection_name}")
-            self._load_knowledge_base()
-    
-    def _chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
+        print(f"Opening {RAG_VECTOR_STORE} vector store in {RAG_STORE_PATH}...")
+        self.store = vector_store.open_store(RAG_VECTOR_STORE, RAG_STORE_PATH, collection_name, model_id=embedding_model_id())
+        if RAG_SYNC_ON_STARTUP or self.store.count() == 0:
+            self.sync_knowledge_base()
+        self._build_lexical_index()
+
+    def _build_lexical_index(self):
+        """(Re)build the BM25 index from what the vector store holds, so both rank the same chunks"""
+        self.lexical_index = lexical.BM25Index(*self.store.get_documents())
+
+    @staticmethod
+    def _chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
         """Split text into overlapping chunks"""
         # Split by paragraphs first
         paragraphs = text.split('\n\n')
@@ -67,72 +199,125 @@ class IndianTaxRAG:
         
         return chunks
     
-    def _load_knowledge_base(self):
-        """Load all markdown files from knowledge directory"""
+    def _knowledge_files(self) -> Dict[str, str]:
+        return read_knowledge_files(self.knowledge_dir)
+
+    def sync_knowledge_base(self) -> Dict:
+        """Incrementally index the knowledge directory.
+
+        Chunk IDs are content hashes, so only new or edited chunks are embedded; chunks that
+        disappeared (edited, or whose file was removed) are deleted. Files whose hash matches
+        the indexed copy are skipped without re-chunking.
+        """
+        stats = {"added": 0, "deleted": 0, "unchanged_files": 0, "updated_files": 0}
         if not os.path.exists(self.knowledge_dir):
             print(f"Warning: Knowledge directory {self.knowledge_dir} not found")
-            return
-        
-        documents = []
-        metadatas = []
-        ids = []
-        
-        for filename in os.listdir(self.knowledge_dir):
-            if filename.endswith('.md'):
-                filepath = os.path.join(self.knowledge_dir, filename)
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Chunk the document
-                chunks = self._chunk_text(content)
-                
-                for i, chunk in enumerate(chunks):
+            return stats
+
+        # What is indexed now, grouped by source file
+        indexed_by_source: Dict[str, Dict[str, Dict]] = {}
+        for chunk_id, meta in self.store.get_metadatas().items():
+            indexed_by_source.setdefault(meta.get("source"), {})[chunk_id] = meta
+
+        documents, metadatas, ids = [], [], []
+        stale_ids = []
+        moved_ids, moved_metadatas = [], []
+
+        files = self._knowledge_files()
+        for filename, content in files.items():
+            file_hash = _sha1(content)
+            existing = indexed_by_source.get(filename, {})
+            if existing and all(m.get("file_hash") == file_hash for m in existing.values()):
+                stats["unchanged_files"] += 1
+                continue
+            stats["updated_files"] += 1
+
+            seen = {}
+            wanted = set()
+            for i, chunk in enumerate(self._chunk_text(content)):
+                chunk_hash = _sha1(chunk)
+                # Identical chunks within one file get an occurrence suffix to keep IDs unique
+                occurrence = seen.get(chunk_hash, 0)
+                seen[chunk_hash] = occurrence + 1
+                chunk_id = f"{filename}:{chunk_hash[:16]}" + (f":{occurrence}" if occurrence else "")
+                wanted.add(chunk_id)
+                meta = {
+                    "source": filename,
+                    "chunk_id": i,
+                    "type": "tax_knowledge",
+                    "file_hash": file_hash,
+                    "chunk_hash": chunk_hash,
+                }
+                if chunk_id in existing:
+                    # Same text, possibly new position: update metadata without re-embedding
+                    moved_ids.append(chunk_id)
+                    moved_metadatas.append(meta)
+                else:
                     documents.append(chunk)
-                    metadatas.append({
-                        "source": filename,
-                        "chunk_id": i,
-                        "type": "tax_knowledge"
-                    })
-                    ids.append(f"{filename}_{i}")
-        
+                    metadatas.append(meta)
+                    ids.append(chunk_id)
+            stale_ids.extend(chunk_id for chunk_id in existing if chunk_id not in wanted)
+
+        # Chunks from files that no longer exist
+        for source, chunks in indexed_by_source.items():
+            if source not in files:
+                stale_ids.extend(chunks)
+
+        if stale_ids:
+            self.store.delete(stale_ids)
+            stats["deleted"] = len(stale_ids)
+        if moved_ids:
+            self.store.update_metadatas(moved_ids, moved_metadatas)
         if documents:
-            print(f"Loading {len(documents)} chunks into vector database...")
-            # Generate embeddings
-            embeddings = self.embedding_model.encode(documents).tolist()
-            
-            # Add to ChromaDB
-            self.collection.add(
-                embeddings=embeddings,
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
-            print(f"✅ Loaded {len(documents)} chunks successfully!")
-        else:
+            print(f"Embedding {len(documents)} new/changed chunks...")
+            embeddings = self.embedding_model.encode(documents)
+            self.store.add(ids, embeddings, documents, metadatas)
+            stats["added"] = len(documents)
+
+        if stats["added"] or stats["deleted"] or moved_ids:
+            print(f"✅ Knowledge base synced: {stats}")
+            self._build_lexical_index()
+            _notify_kb_change()
+        elif not files:
             print("No knowledge base documents found")
-    
+        return stats
+
+    def embed_queries(self, queries: List[str]) -> List[np.ndarray]:
+        """Query embeddings via the LRU cache; all misses are encoded in one batch"""
+        keys = [normalize_query(q) for q in queries]
+        vectors = [self.query_cache.get(k) for k in keys]
+        missing = list(dict.fromkeys(k for k, v in zip(keys, vectors) if v is None))
+        if missing:
+            with metrics.span("embed"):
+                encoded = dict(zip(missing, self.embedding_model.encode(missing)))
+            for k, vec in encoded.items():
+                self.query_cache.put(k, vec)
+            vectors = [v if v is not None else encoded[k] for k, v in zip(keys, vectors)]
+        return vectors
+
+    def search_many(self, queries: List[str], n_results: int = 3) -> List[List[Dict]]:
+        """Search several queries; those naming a section/form are answered lexically, the rest
+        share one encoder pass and one vector query"""
+        results: List[Optional[List[Dict]]] = [None] * len(queries)
+        if RAG_LEXICAL:
+            with metrics.span("lexical"):
+                for q, query in enumerate(queries):
+                    results[q] = self.lexical_index.exact_match(query, n_results)
+        pending = [q for q, hits in enumerate(results) if hits is None]
+        if not pending:
+            return results
+
+        query_embeddings = self.embed_queries([queries[q] for q in pending])
+        candidates = max(n_results, RAG_FUSION_CANDIDATES) if RAG_LEXICAL else n_results
+        with metrics.span("vector_query"):
+            vector_results = self.store.query(query_embeddings, candidates)
+        for q, hits in zip(pending, vector_results):
+            results[q] = self.lexical_index.fuse(queries[q], hits, n_results) if RAG_LEXICAL else hits
+        return results
+
     def search(self, query: str, n_results: int = 3) -> List[Dict]:
         """Search for relevant chunks based on query"""
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode([query])[0].tolist()
-        
-        # Search in ChromaDB
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=n_results
-        )
-        
-        # Format results
-        formatted_results = []
-        if results['documents'] and results['documents'][0]:
-            for i, doc in enumerate(results['documents'][0]):
-                formatted_results.append({
-                    "content": doc,
-                    "metadata": results['metadatas'][0][i] if results['metadatas'] else {},
-                    "distance": results['distances'][0][i] if results['distances'] else None
-                })
-        
-        return formatted_results
+        return self.search_many([query], n_results=n_results)[0]
     
     def get_context_for_query(self, query: str, max_chunks: int = 3) -> str:
         """Get relevant context as a formatted string"""
@@ -149,31 +334,226 @@ class IndianTaxRAG:
         return context.strip()
     
     def clear_collection(self):
-        """Clear the collection (useful for rebuilding)"""
-        self.chroma_client.delete_collection(name=self.collection_name)
-        print(f"Cleared collection: {self.collection_name}")
+        """Clear the index (useful for rebuilding)"""
+        self.store.clear()
+        self._build_lexical_index()
+        _notify_kb_change()
+
+    def rebuild(self) -> Dict:
+        """Drop the index and re-embed the whole knowledge base"""
+        self.clear_collection()
+        return self.sync_knowledge_base()
+
+
+def read_knowledge_files(knowledge_dir: str) -> Dict[str, str]:
+    """filename -> content for every markdown file in the knowledge directory"""
+    files = {}
+    for filename in sorted(os.listdir(knowledge_dir)):
+        if filename.endswith('.md'):
+            filepath = os.path.join(knowledge_dir, filename)
+            with open(filepath, 'r', encoding='utf-8') as f:
+                files[filename] = f.read()
+    return files
+
+
+def _sha1(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+# Callbacks run whenever the indexed knowledge base changes (e.g. answer cache invalidation)
+_kb_listeners: List[Callable[[], None]] = []
+
+
+def on_knowledge_base_change(callback: Callable[[], None]) -> None:
+    """Register a callback for knowledge base (re)loads and clears"""
+    _kb_listeners.append(callback)
+
+
+def _notify_kb_change():
+    for callback in list(_kb_listeners):
+        try:
+            callback()
+        except Exception as e:
+            print(f"⚠️ Knowledge base listener failed: {e}")
 
 
 def initialize_rag() -> IndianTaxRAG:
     """Initialize RAG system - call this once at startup"""
-    return IndianTaxRAG()
+    with metrics.span("rag_load"):
+        return IndianTaxRAG()
+
+
+# Process-wide shared instance (embedding model + vector store are expensive to build)
+_rag_instance: Optional[IndianTaxRAG] = None
+_rag_lock = threading.Lock()
+_rag_error: Optional[str] = None
+_warmup_thread: Optional[threading.Thread] = None
+
+
+def get_rag() -> IndianTaxRAG:
+    """Return the shared RAG instance, building it on first use"""
+    global _rag_instance, _rag_error
+    if _rag_instance is None:
+        with _rag_lock:
+            # Re-check: another request may have finished loading while we waited
+            if _rag_instance is None:
+                try:
+                    _rag_instance = initialize_rag()
+                    _rag_error = None
+                except Exception as e:
+                    _rag_error = str(e)
+                    raise
+    return _rag_instance
+
+
+def warm_up_rag(background: bool = True) -> None:
+    """Build the shared RAG instance at startup, optionally in a background thread"""
+    global _warmup_thread
+
+    def _warm():
+        try:
+            get_rag()
+            print("✅ RAG system ready")
+        except Exception as e:
+            print(f"⚠️ RAG warm-up failed: {e}")
+
+    if not background:
+        _warm()
+        return
+    if _warmup_thread is not None and _warmup_thread.is_alive():
+        return
+    _warmup_thread = threading.Thread(target=_warm, name="rag-warmup", daemon=True)
+    _warmup_thread.start()
+
+
+def query_cache_stats() -> Optional[Dict]:
+    """Query embedding cache stats of the shared instance (None until it is loaded)"""
+    if _rag_instance is None:
+        return None
+    return _rag_instance.query_cache.stats()
+
+
+def rag_status() -> Dict:
+    """Readiness of the shared RAG instance: ready, loading, error or not_loaded"""
+    if _rag_instance is not None:
+        status = "ready"
+    elif _rag_lock.locked():
+        status = "loading"
+    elif _rag_error:
+        status = "error"
+    else:
+        status = "not_loaded"
+    return {"status": status, "error": _rag_error}
+
+
+# Knowledge base test queries, also used by the embedding backend parity check
+TEST_QUERIES = [
+    "What are the income tax slabs in India?",
+    "How can I save tax under Section 80C?",
+    "What is the GST rate on services?",
+    "When is the ITR filing deadline?",
+    "What deductions can I claim for health insurance?",
+    "How is HRA exemption calculated?",
+    "Is interest on education loan deductible?",
+    "Which ITR form should a salaried person file?",
+    "What is the standard deduction for salaried employees?",
+    "Deduction for donations to charity",
+]
+# A backend passes the parity check when this share of torch's top-k chunks is also in its top-k
+PARITY_MIN_RECALL = 0.9
+
+
+def _rss_mb() -> float:
+    """Resident set size of this process (Linux /proc), else its peak from getrusage"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def embedding_stats(backend: str, k: int = 3, knowledge_dir: str = "./knowledge") -> Dict:
+    """Load one backend, embed the knowledge base and TEST_QUERIES: timings, RSS and each query's top-k chunks"""
+    chunks = [c for text in read_knowledge_files(knowledge_dir).values() for c in IndianTaxRAG._chunk_text(text)]
+    start = time.perf_counter()
+    model = load_embedding_model(backend)
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    docs = np.asarray(model.encode(chunks), dtype=np.float32)
+    encode_s = time.perf_counter() - start
+    queries, latencies = [], []
+    for query in TEST_QUERIES:
+        start = time.perf_counter()
+        queries.append(model.encode([query])[0])
+        latencies.append(time.perf_counter() - start)
+
+    docs /= np.linalg.norm(docs, axis=1, keepdims=True)
+    queries = np.asarray(queries, dtype=np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    top_k = np.argsort(-(queries @ docs.T), axis=1)[:, :k]
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "chunks_per_s": len(chunks) / encode_s,
+        "query_p50_ms": float(np.median(latencies)) * 1000,
+        "query_p95_ms": float(np.percentile(latencies, 95)) * 1000,
+        "rss_mb": _rss_mb(),
+        "top_k": top_k.tolist(),
+    }
+
+
+def embedding_parity(candidate: str, k: int = 3) -> Dict[str, Dict]:
+    """Stats for torch and candidate, each in its own process so RSS is per backend, with recall@k against torch"""
+    results = {}
+    for backend in dict.fromkeys(["torch", candidate]):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--embedding-stats", backend, str(k)],
+            stdout=subprocess.PIPE, text=True, check=True,
+        )
+        results[backend] = json.loads(out.stdout.strip().splitlines()[-1])
+    reference = results["torch"]["top_k"]
+    for stats in results.values():
+        hits = sum(len(set(got) & set(want)) for got, want in zip(stats["top_k"], reference))
+        stats["recall_at_k"] = hits / (k * len(reference))
+    return results
 
 
 # Test function
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ('--sync', '--rebuild'):
+        # Index maintenance: --sync embeds only changed chunks, --rebuild re-embeds everything
+        rag = initialize_rag()
+        stats = rag.sync_knowledge_base() if sys.argv[1] == '--sync' else rag.rebuild()
+        print(stats)
+        sys.exit(0)
+
+    if len(sys.argv) > 1 and sys.argv[1] == '--embedding-stats':
+        print(json.dumps(embedding_stats(sys.argv[2], int(sys.argv[3]))))
+        sys.exit(0)
+
+    if len(sys.argv) > 1 and sys.argv[1] == '--parity':
+        # Compare an embedding backend against full-precision torch: python rag.py --parity int8
+        candidate = sys.argv[2] if len(sys.argv) > 2 else RAG_EMBEDDING_BACKEND
+        results = embedding_parity(candidate)
+        print(f"{'backend':<8} {'load s':>7} {'chunks/s':>9} {'query p50 ms':>13} {'query p95 ms':>13} {'RSS MB':>8} {'recall@3':>9}")
+        for r in results.values():
+            print(f"{r['backend']:<8} {r['load_s']:>7.2f} {r['chunks_per_s']:>9.1f} {r['query_p50_ms']:>13.2f} "
+                  f"{r['query_p95_ms']:>13.2f} {r['rss_mb']:>8.0f} {r['recall_at_k']:>9.3f}")
+        recall = results[candidate]["recall_at_k"]
+        if recall < PARITY_MIN_RECALL:
+            print(f"❌ {candidate} recall@3 {recall:.3f} is below {PARITY_MIN_RECALL}")
+            sys.exit(1)
+        print(f"✅ {candidate} keeps recall@3 {recall:.3f} against torch on {len(TEST_QUERIES)} queries")
+        sys.exit(0)
+
     print("🚀 Testing Indian Tax RAG System\n")
     
     rag = initialize_rag()
     
-    test_queries = [
-        "What are the income tax slabs in India?",
-        "How can I save tax under Section 80C?",
-        "What is the GST rate on services?",
-        "When is the ITR filing deadline?",
-        "What deductions can I claim for health insurance?"
-    ]
-    
-    for query in test_queries:
+    for query in TEST_QUERIES:
         print(f"\n❓ Query: {query}")
         print("-" * 60)
         context = rag.get_context_for_query(query, max_chunks=2)
@@ -1,19 +1,67 @@
 from pydantic import BaseModel
-from typing import List, Optional, Any
+from typing import Any, Dict, List, Optional
 
 class ClassifiedTransaction(BaseModel):
     date: Optional[str]
     description: Optional[str]
     amount: float
     category: str
+    section: Optional[str] = None
+
+class SectionTotal(BaseModel):
+    count: int
+    amount: float
 
 class UploadResponse(BaseModel):
     total_income: float
     total_expenses: float
     potential_deductions: float
-    transactions: List[ClassifiedTransaction]
+    section_totals: Dict[str, SectionTotal] = {}  # deductible spending by section, e.g. "80D"
+    transaction_count: int = 0
+    transactions: List[ClassifiedTransaction]  # the first UPLOAD_PREVIEW_ROWS; page the rest from /summary/transactions
     session_id: int
 
+class BatchFileResult(BaseModel):
+    filename: str
+    transaction_count: int
+
+class BatchUploadResponse(BaseModel):
+    total_income: float
+    total_expenses: float
+    potential_deductions: float
+    section_totals: Dict[str, SectionTotal] = {}
+    transaction_count: int
+    duplicates_removed: int
+    files: List[BatchFileResult]
+    session_id: int
+
+class JobStatus(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    filename: Optional[str] = None
+    session_id: Optional[int] = None
+    rows_processed: int
+    progress: float
+    eta_seconds: Optional[float] = None
+    attempts: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class TaxComputeRequest(BaseModel):
+    session_id: Optional[int] = None
+    income: Optional[float] = None
+    deductions: Optional[Dict[str, float]] = None  # section -> amount claimed, e.g. {"80C": 150000}
+    fy: Optional[str] = None  # e.g. "2024-25"; defaults to the statement's year
+    salaried: bool = True
+
+class TransactionPage(BaseModel):
+    items: List[ClassifiedTransaction]
+    total: int
+    limit: int
+    offset: int
+    next_offset: Optional[int]
+
 class ChatRequest(BaseModel):
     session_id: Optional[int]
     message: str
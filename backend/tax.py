@@ -0,0 +1,328 @@
+"""
+Deterministic income tax computation, old vs new regime
+Rules (slabs, standard deduction, 87A rebate, surcharge, cess, section caps) are data in
+tax_rules/<FY>.json, loaded once per financial year.
+"""
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+RULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tax_rules")
+DEFAULT_FY = os.getenv("TAX_FY", "2025-26")
+
+# Numeric tax questions /chat answers from the engine instead of the LLM: explicit requests for a
+# figure or a regime comparison only, so "how can I reduce my tax?" still goes to the LLM
+TAX_QUESTION_PATTERN = re.compile(
+    r"how much (?:income )?tax|tax liability|tax payable|tax (?:do|will|would|should|shall) i (?:have to |need to )?(?:pay|owe)"
+    r"|(?:what|how much) (?:will|would) my (?:income )?tax be|tax on (?:an? )?(?:income of |salary of )?(?:₹|rs\.?|inr)?\s*\d"
+    r"|which regime|better regime|old (?:or|vs\.?|versus) new|new (?:or|vs\.?|versus) old|compare .*regime"
+    r"|(?:calculate|compute|estimate) (?:my )?(?:income )?tax"
+)
+AMOUNT_PATTERN = re.compile(r"(?:₹|rs\.?|inr)?\s*(\d[\d,]*(?:\.\d+)?)\s*(lakhs?|lacs?|l|crores?|cr|k)?\b")
+UNIT_MULTIPLIERS = {"l": 1e5, "lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "lacs": 1e5, "cr": 1e7, "crore": 1e7, "crores": 1e7, "k": 1e3}
+# Words that mark an amount in a question as the income
+INCOME_CUE_PATTERN = re.compile(r"\b(?:income|salary|salaried|earn\w*|ctc|package|gross)\b")
+
+
+@lru_cache(maxsize=None)
+def available_years() -> tuple:
+    return tuple(sorted(f[:-len(".json")] for f in os.listdir(RULES_DIR) if f.endswith(".json")))
+
+
+@lru_cache(maxsize=None)
+def load_rules(fy: str) -> Dict:
+    """Rule table for a financial year, e.g. "2024-25" (cached)"""
+    path = os.path.join(RULES_DIR, f"{fy}.json")
+    if not os.path.exists(path):
+        raise ValueError(f"No tax rules for FY {fy}; available: {', '.join(available_years())}")
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def fy_for_month(month: str) -> str:
+    """Financial year (April-March) containing a YYYY-MM month"""
+    year, mon = int(month[:4]), int(month[5:7])
+    start = year if mon >= 4 else year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def statement_fy(aggregates: Optional[Dict]) -> Optional[str]:
+    """FY of the statement's latest month, None without monthly totals"""
+    months = sorted((aggregates or {}).get("monthly", {}))
+    return fy_for_month(months[-1]) if months else None
+
+
+def infer_fy(aggregates: Optional[Dict]) -> str:
+    """FY whose rules apply to the statement: its own FY, else the nearest year with rules
+    (DEFAULT_FY without a statement)"""
+    fy = statement_fy(aggregates)
+    if fy is None:
+        return DEFAULT_FY
+    years = available_years()
+    if fy in years:
+        return fy
+    start = int(fy[:4])
+    # ties go to the later year
+    return min(years, key=lambda y: (abs(int(y[:4]) - start), -int(y[:4])))
+
+
+def fy_note(aggregates: Optional[Dict], fy: str) -> Optional[str]:
+    """Says which rules were used when the statement's FY has none of its own"""
+    own = statement_fy(aggregates)
+    if own is None or own == fy:
+        return None
+    return f"Your statement is from FY {own}, which has no tax rules here, so FY {fy} rules were used."
+
+
+def slab_tax(income: float, slabs: List) -> float:
+    """Progressive tax over [[upper bound or null, rate], ...]"""
+    tax, lower = 0.0, 0.0
+    for upper, rate in slabs:
+        if income <= lower:
+            break
+        top = income if upper is None else min(income, upper)
+        tax += (top - lower) * rate
+        if upper is None:
+            break
+        lower = upper
+    return tax
+
+
+def _surcharge(taxable: float, tax: float, rules: Dict) -> float:
+    """Surcharge at the highest threshold crossed, with marginal relief: tax + surcharge
+    may exceed the amount at the threshold by no more than the income above it"""
+    bands = rules.get("surcharge", [])
+    for i in range(len(bands) - 1, -1, -1):
+        threshold, rate = bands[i]
+        if taxable > threshold:
+            prev_rate = bands[i - 1][1] if i > 0 else 0.0
+            at_threshold = slab_tax(threshold, rules["slabs"]) * (1 + prev_rate)
+            return max(min(tax * rate, at_threshold + (taxable - threshold) - tax), 0.0)
+    return 0.0
+
+
+def allowed_deductions(claimed: Dict[str, float], caps: Dict[str, Optional[float]]) -> Dict[str, float]:
+    """Claimed amounts limited to each section's cap; sections the regime doesn't allow are dropped"""
+    allowed = {}
+    for section, amount in claimed.items():
+        if section not in caps or amount <= 0:
+            continue
+        cap = caps[section]
+        allowed[section] = round(amount if cap is None else min(amount, cap), 2)
+    return allowed
+
+
+def compute_regime(income: float, deductions: Dict[str, float], rules: Dict, cess_rate: float, salaried: bool = True) -> Dict:
+    standard = min(rules["standard_deduction"], income) if salaried else 0.0
+    allowed = allowed_deductions(deductions, rules["deduction_caps"])
+    taxable = max(income - standard - sum(allowed.values()), 0.0)
+
+    tax = slab_tax(taxable, rules["slabs"])
+    rebate = 0.0
+    rebate_rules = rules.get("rebate_87a")
+    if rebate_rules:
+        limit = rebate_rules["max_taxable_income"]
+        if taxable <= limit:
+            rebate = min(tax, rebate_rules["max_rebate"])
+        elif rebate_rules.get("marginal_relief"):
+            # tax just above the rebate limit can't exceed the income above the limit
+            rebate = max(tax - (taxable - limit), 0.0)
+    tax -= rebate
+    surcharge = _surcharge(taxable, tax, rules) if tax > 0 else 0.0
+    cess = (tax + surcharge) * cess_rate
+    return {
+        "gross_income": round(income, 2),
+        "standard_deduction": round(standard, 2),
+        "deductions": allowed,
+        "taxable_income": round(taxable, 2),
+        "slab_tax": round(tax + rebate, 2),
+        "rebate_87a": round(rebate, 2),
+        "surcharge": round(surcharge, 2),
+        "cess": round(cess, 2),
+        "total_tax": round(tax + surcharge + cess),
+    }
+
+
+def compute_tax(income: float, deductions: Optional[Dict[str, float]] = None, fy: Optional[str] = None, salaried: bool = True) -> Dict:
+    """Liability under both regimes and which one is cheaper"""
+    fy = fy or DEFAULT_FY
+    rules = load_rules(fy)
+    deductions = deductions or {}
+    regimes = {
+        name: compute_regime(income, deductions, regime_rules, rules["cess_rate"], salaried)
+        for name, regime_rules in rules["regimes"].items()
+    }
+    old_tax, new_tax = regimes["old"]["total_tax"], regimes["new"]["total_tax"]
+    return {
+        "fy": fy,
+        "income": round(income, 2),
+        "old_regime": regimes["old"],
+        "new_regime": regimes["new"],
+        "recommended": "old" if old_tax < new_tax else "new",
+        "savings": abs(old_tax - new_tax),
+    }
+
+
+def deduction_savings(income: float, deductions: Dict[str, float], fy: Optional[str] = None) -> float:
+    """Old-regime tax saved by the deductions (after caps) versus claiming none"""
+    rules = load_rules(fy or DEFAULT_FY)
+    old = rules["regimes"]["old"]
+    without = compute_regime(income, {}, old, rules["cess_rate"])["total_tax"]
+    return without - compute_regime(income, deductions, old, rules["cess_rate"])["total_tax"]
+
+
+def slab_lines(fy: Optional[str] = None, regime: str = "new") -> List[str]:
+    """Human-readable slab table, one "• ₹4L-8L: 5%" line per slab"""
+    lines, lower = [], 0
+    for upper, rate in load_rules(fy or DEFAULT_FY)["regimes"][regime]["slabs"]:
+        pct = f"{rate * 100:g}%" if rate else "Nil"
+        band = f"Above ₹{lower / 1e5:g}L" if upper is None else f"₹{lower / 1e5:g}L-{upper / 1e5:g}L"
+        lines.append(f"• {band}: {pct}")
+        lower = upper
+    return lines
+
+
+def deductions_from_summary(aggregates: Dict) -> Dict[str, float]:
+    """Deductible amounts by section from a session's aggregates.
+
+    Untagged deductible spending (no per-section totals) is counted under 80C.
+    """
+    if aggregates.get("section_totals"):
+        return {section: t["amount"] for section, t in aggregates["section_totals"].items()}
+    amount = aggregates.get("potential_deductions", 0.0)
+    return {"80C": amount} if amount else {}
+
+
+def deduction_lines(section_totals: Dict, fy: str) -> List[str]:
+    """One bullet per tagged section: amount found vs the old-regime cap for the FY"""
+    caps = load_rules(fy)["regimes"]["old"]["deduction_caps"]
+    lines = []
+    for section, totals in sorted(section_totals.items(), key=lambda item: -item[1]["amount"]):
+        amount = totals["amount"]
+        if section not in caps:
+            limit = "not counted in the tax estimate"
+        elif caps[section] is None:
+            limit = "no upper limit"
+        else:
+            limit = f"limit {format_inr(caps[section])}, claimable {format_inr(min(amount, caps[section]))}"
+        count = totals["count"]
+        lines.append(f"• {section}: {format_inr(amount)} across {count} transaction{'' if count == 1 else 's'} ({limit})")
+    return lines
+
+
+def _amounts(question: str) -> List[tuple]:
+    """(start, end, rupees) for each amount in a lowercased question; bare numbers under 10,000 are skipped"""
+    amounts = []
+    for m in AMOUNT_PATTERN.finditer(question):
+        number, unit = m.groups()
+        value = float(number.replace(",", ""))
+        if unit:
+            value *= UNIT_MULTIPLIERS[unit.rstrip("s") if unit not in UNIT_MULTIPLIERS else unit]
+        elif value < 10000:
+            continue
+        amounts.append((m.start(1), m.end(), value))
+    return amounts
+
+
+@lru_cache(maxsize=None)
+def _section_cue_pattern() -> tuple:
+    """(pattern, term -> section) over the section aliases and keywords in deduction_sections.json"""
+    import utils  # utils imports this module at load time
+
+    terms = {}
+    for rule in utils.SECTION_RULES:  # highest priority first, so it keeps shared terms
+        for term in rule.get("aliases", []) + rule["keywords"]:
+            terms.setdefault(term, rule["section"])
+    alternation = "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+    return re.compile(rf"(?<![\w(])(?:{alternation})(?![\w)])"), terms
+
+
+def question_figures(question: str) -> tuple:
+    """(income, deductions by section) stated in a question.
+
+    Each income word ("income", "salary", ...) and each section term ("80C", "PPF", "home loan")
+    belongs to the nearest amount. Amounts tied to a section are deductions; the income is the
+    largest amount tied to an income word, else the largest amount tied to nothing.
+    "If I invest 1.5 lakh in PPF, how much tax on 15 lakh income?" -> (1500000, {"80C": 150000}).
+    """
+    q = question.lower()
+    amounts = _amounts(q)
+    if not amounts:
+        return None, {}
+
+    def nearest(start: int, end: int) -> int:
+        return min(range(len(amounts)), key=lambda i: max(amounts[i][0] - end, start - amounts[i][1], 0))
+
+    pattern, terms = _section_cue_pattern()
+    sections = {}
+    for m in pattern.finditer(q):
+        sections.setdefault(nearest(m.start(), m.end()), terms[m.group(0)])
+    income_tied = {nearest(m.start(), m.end()) for m in INCOME_CUE_PATTERN.finditer(q)} - set(sections)
+
+    deductions: Dict[str, float] = {}
+    for i, section in sections.items():
+        deductions[section] = deductions.get(section, 0.0) + amounts[i][2]
+    candidates = income_tied or set(range(len(amounts))) - set(sections)
+    income = max((amounts[i][2] for i in candidates), default=None)
+    return income, deductions
+
+
+def income_in_question(question: str) -> Optional[float]:
+    """An income figure stated in the question ("12 lakh", "₹15,00,000", "1.2 cr"), if any"""
+    return question_figures(question)[0]
+
+
+def format_inr(amount: float) -> str:
+    """Whole rupees with Indian digit grouping, e.g. ₹12,34,567"""
+    digits = f"{abs(round(amount)):d}"
+    head, tail = digits[:-3], digits[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    if head:
+        groups.insert(0, head)
+    return ("-" if amount < 0 else "") + "₹" + ",".join(groups + [tail])
+
+
+def answer_tax_question(question: str, aggregates: Optional[Dict]) -> Optional[str]:
+    """Reply to a numeric tax question from the engine, or None if it isn't one
+    (or there is no income to compute on)"""
+    q = question.lower()
+    if not TAX_QUESTION_PATTERN.search(q):
+        return None
+    income, deductions = question_figures(q)
+    source = "the income in your question"
+    if income is None:
+        income = (aggregates or {}).get("total_income", 0.0)
+        # amounts the question names for a section replace the statement's
+        deductions = {**deductions_from_summary(aggregates or {}), **deductions}
+        source = "your uploaded statement"
+    if not income:
+        return None
+
+    fy = infer_fy(aggregates)
+    result = compute_tax(income, deductions, fy)
+    old, new = result["old_regime"], result["new_regime"]
+    claimed = sum(old["deductions"].values())
+    lines = [
+        f"🧮 Tax estimate for FY {result['fy']} on income of {format_inr(income)} (from {source}):",
+        "",
+        f"• Old regime: {format_inr(old['total_tax'])} — taxable {format_inr(old['taxable_income'])} "
+        f"after {format_inr(old['standard_deduction'])} standard deduction"
+        + (f" and {format_inr(claimed)} in deductions ({', '.join(old['deductions'])})" if claimed else ""),
+        f"• New regime: {format_inr(new['total_tax'])} — taxable {format_inr(new['taxable_income'])}"
+        + (f", {format_inr(new['rebate_87a'])} rebate under 87A" if new["rebate_87a"] else ""),
+        "",
+    ]
+    if result["savings"]:
+        lines.append(f"✅ The {result['recommended']} regime saves you {format_inr(result['savings'])}.")
+    else:
+        lines.append("✅ Both regimes come out the same.")
+    note = fy_note(aggregates, fy)
+    if note:
+        lines.append(note)
+    lines.append("Includes 4% health & education cess; assumes the income is salary. Consult a CA for your exact liability.")
+    return "\n".join(lines)
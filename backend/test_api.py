@@ -66,7 +66,7 @@ def test_summary(session_id):
     if response.status_code == 200:
         data = response.json()
         print(f"✅ Summary retrieved!")
-        print(f"   Transactions: {len(data['transactions'])}")
+        print(f"   Transactions: {data['transaction_count']}")
     else:
         print(f"❌ Failed: {response.status_code}")
 
@@ -0,0 +1,55 @@
+"""
+Shared pytest setup: the backend on a throwaway SQLite database, mock LLM, no RAG or caches
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+
+# Before main (and db) are imported, which read these at module load
+TEST_DB_DIR = tempfile.mkdtemp(prefix="taxease_tests_")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(TEST_DB_DIR, 'test.db')}",
+    "ENABLE_MOCK_LLM": "true",
+    "ENABLE_RAG": "false",
+    "RAG_WARMUP": "off",
+    "IMPORT_WARMUP": "false",
+    "ANSWER_CACHE_SIZE": "0",
+    "JOB_SPOOL_DIR": os.path.join(TEST_DB_DIR, "uploads"),
+})
+for var in ("OPENAI_API_KEY", "OLLAMA_HOST", "ASYNC_DATABASE_URL"):
+    os.environ.pop(var, None)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+    shutil.rmtree(TEST_DB_DIR, ignore_errors=True)
+
+
+STATEMENT = """date,description,amount
+2025-04-01,Salary Credit - ABC Tech Pvt Ltd,150000
+2025-04-05,Rent Payment - Landlord,-25000
+2025-04-07,LIC Premium Payment,-12000
+2025-04-10,Medical - Apollo Pharmacy,-850
+2025-05-01,Salary Credit - ABC Tech Pvt Ltd,150000
+2025-05-12,Grocery Shopping,-4200
+"""
+
+
+@pytest.fixture
+def session_id(client):
+    """A session with a small FY 2025-26 statement uploaded"""
+    response = client.post("/upload", files={"file": ("statement.csv", STATEMENT, "text/csv")})
+    response.raise_for_status()
+    return response.json()["session_id"]
@@ -0,0 +1,101 @@
+"""
+Answer cache: exact and semantic tiers, expiry, and keys that only hit when the data and conversation match
+"""
+import cache
+import main
+
+
+def test_context_key_covers_history():
+    assert cache.context_key("{}", "") == cache.context_key("{}", None)
+    assert cache.context_key("{}", "User: list my 80C items") != cache.context_key("{}", "User: list my 80D items")
+
+
+def test_follow_up_misses_across_conversations(client, monkeypatch):
+    answers = cache.AnswerCache(max_entries=16)
+    monkeypatch.setattr(main, "answer_cache", answers)
+
+    def chat(session_id, message):
+        response = client.post("/chat", json={"session_id": session_id, "message": message})
+        response.raise_for_status()
+        return response.json()["session_id"]
+
+    first = chat(None, "Tell me about GST rates")
+    second = chat(None, "Tell me about ITR forms")
+    assert answers.hits == 0
+
+    chat(first, "What about the second one?")
+    chat(second, "What about the second one?")
+    assert answers.hits == 0
+
+    # a fresh conversation asking an opening question can reuse the answer
+    chat(None, "Tell me about GST rates")
+    assert answers.hits == 1
+
+
+def test_semantic_tier_shares_the_rag_query_embeddings(monkeypatch):
+    import numpy as np
+
+    import rag
+
+    encoded = []
+
+    class Model:
+        def encode(self, texts):
+            encoded.extend(texts)
+            return [np.ones(4, dtype=np.float32) for _ in texts]
+
+    kb = rag.IndianTaxRAG.__new__(rag.IndianTaxRAG)
+    kb.embedding_model = Model()
+    kb.query_cache = rag.EmbeddingCache(capacity=8)
+    monkeypatch.setattr(rag, "get_rag", lambda: kb)
+
+    answers = cache.AnswerCache(max_entries=16, embed=main.embed_question)
+    assert answers.get("What is the 80C limit?", "ctx") is None
+    kb.embed_queries(["What is the 80C limit?"])  # retrieval after the miss
+    answers.put("What is the 80C limit?", "ctx", "1.5 lakh")
+    assert encoded == ["what is the 80c limit?"]
+
+
+def test_exact_tier_matches_normalized_questions():
+    answers = cache.AnswerCache(max_entries=16)
+    answers.put("What is the 80C limit?", "ctx", "1.5 lakh")
+    assert answers.get("what is the   80c limit", "ctx") == "1.5 lakh"
+    assert answers.get("What is the 80C limit?", "other ctx") is None
+    assert (answers.hits, answers.misses) == (1, 1)
+
+
+def test_entries_expire_and_evict_least_recently_used(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    answers = cache.AnswerCache(max_entries=2, ttl_seconds=60)
+    answers.put("a", "ctx", "A")
+    answers.put("b", "ctx", "B")
+    answers.get("a", "ctx")
+    answers.put("c", "ctx", "C")  # "b" is the least recently used
+    assert answers.get("b", "ctx") is None and answers.evictions == 1
+    now[0] += 61
+    assert answers.get("a", "ctx") is None
+
+
+def test_semantic_tier_matches_paraphrases_in_the_same_context():
+    import numpy as np
+
+    vectors = {
+        "How much can I claim under 80C?": [1.0, 0.0, 0.0],
+        "What's the maximum 80C deduction?": [0.96, 0.28, 0.0],
+        "What is the GST rate on food?": [0.0, 0.0, 1.0],
+    }
+    answers = cache.AnswerCache(max_entries=16, embed=lambda q: np.array(vectors[q]), similarity_threshold=0.9)
+    answers.put("How much can I claim under 80C?", "ctx", "Up to 1.5 lakh")
+    assert answers.get("What's the maximum 80C deduction?", "ctx") == "Up to 1.5 lakh"
+    assert answers.semantic_hits == 1
+    assert answers.get("What is the GST rate on food?", "ctx") is None
+    assert answers.get("What's the maximum 80C deduction?", "other ctx") is None
+
+
+def test_clear_drops_every_entry():
+    answers = cache.AnswerCache(max_entries=16)
+    answers.put("a", "ctx", "A")
+    answers.clear()
+    assert answers.get("a", "ctx") is None
+    assert answers.stats()["invalidations"] == 1
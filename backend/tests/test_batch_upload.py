@@ -0,0 +1,41 @@
+"""
+/upload/batch: overlapping statements are merged from their aggregates without double counting
+"""
+import io
+import math
+
+import utils
+from synthetic import make_statement
+
+
+def test_merge_statements_matches_retotalling_the_kept_rows():
+    full = make_statement(2000, seed=1)
+    overlap = "\n".join(full.splitlines()[:900]) + "\n"
+    files = [utils.parse_csv(io.StringIO(text)) for text in (full, make_statement(1500, seed=2), overlap)]
+
+    merged = utils.merge_statements(files)
+    expected = utils.summarize_transactions(merged["transactions"])
+
+    assert merged["duplicates_removed"] == 899
+    assert len(merged["transactions"]) == 3500
+    for key in ("total_income", "total_expenses", "potential_deductions"):
+        assert math.isclose(merged[key], expected[key], rel_tol=1e-9)
+    for key in ("category_totals", "section_totals"):
+        assert merged[key].keys() == expected[key].keys()
+        for name, totals in expected[key].items():
+            assert merged[key][name]["count"] == totals["count"]
+            assert math.isclose(merged[key][name]["amount"], totals["amount"], rel_tol=1e-9)
+    assert list(merged["monthly"]) == sorted(expected["monthly"])
+
+
+def test_batch_upload_counts_overlapping_rows_once(client):
+    full = make_statement(300, seed=3)
+    overlap = "\n".join(full.splitlines()[:101]) + "\n"
+    response = client.post("/upload/batch", files=[
+        ("files", ("a.csv", full, "text/csv")),
+        ("files", ("b.csv", overlap, "text/csv")),
+    ])
+    response.raise_for_status()
+    body = response.json()
+    assert body["transaction_count"] == 300
+    assert body["duplicates_removed"] == 100
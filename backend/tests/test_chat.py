@@ -0,0 +1,39 @@
+"""
+/chat routing: which questions the tax engine answers and which go to the LLM
+"""
+import pytest
+
+import llm
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """Questions that reached the LLM path"""
+    calls = []
+    ask = llm.ask_llm_async
+
+    async def recording_ask(prompt, system=None, use_rag=True, context=None):
+        calls.append(context["question"])
+        return await ask(prompt, system, use_rag, context)
+
+    monkeypatch.setattr(llm, "ask_llm_async", recording_ask)
+    return calls
+
+
+@pytest.mark.parametrize("question", [
+    "How can I reduce my tax?",
+    "What documents do I need to file my tax return?",
+    "Is my tax refund taxable?",
+])
+def test_non_numeric_tax_questions_go_to_the_llm(client, session_id, llm_calls, question):
+    response = client.post("/chat", json={"session_id": session_id, "message": question})
+    response.raise_for_status()
+    assert llm_calls == [question]
+    assert "Tax estimate" not in response.json()["reply"]
+
+
+def test_numeric_tax_question_is_answered_by_the_engine(client, session_id, llm_calls):
+    response = client.post("/chat", json={"session_id": session_id, "message": "How much tax will I pay?"})
+    response.raise_for_status()
+    assert llm_calls == []
+    assert response.json()["reply"].startswith("🧮 Tax estimate for FY 2025-26")
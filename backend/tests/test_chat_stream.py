@@ -0,0 +1,55 @@
+"""
+/chat/stream: Server-Sent Events framing, the saved turn and provider errors
+"""
+import json
+
+import db
+import llm
+import models
+
+
+def sse_frames(body: str) -> list:
+    """(event, data) per frame; event is None for plain data frames"""
+    frames = []
+    for block in body.strip().split("\n\n"):
+        event = None
+        for line in block.split("\n"):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                frames.append((event, json.loads(line[len("data: "):])))
+    return frames
+
+
+def test_stream_relays_the_reply_and_saves_the_turn(client):
+    question = "Tell me about GST rates"
+    response = client.post("/chat/stream", json={"session_id": None, "message": question})
+    response.raise_for_status()
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = sse_frames(response.text)
+
+    assert frames[0] == ("session", {"session_id": None})
+    tokens = [data["token"] for event, data in frames[1:-1]]
+    assert all(event is None for event, _ in frames[1:-1]) and len(tokens) > 1
+    reply = "".join(tokens)
+    assert reply == client.post("/chat", json={"session_id": None, "message": question}).json()["reply"]
+
+    event, data = frames[-1]
+    assert event == "done"
+    with db.SessionLocal() as db_session:
+        saved = [(m.role, m.content) for m in db_session.query(models.Message)
+                 .filter(models.Message.session_id == data["session_id"]).order_by(models.Message.id)]
+    assert saved == [("user", question), ("assistant", reply)]
+
+
+def test_provider_failure_ends_the_stream_with_an_error_frame(client, monkeypatch):
+    async def failing_stream(prompt, system=None, use_rag=True, context=None):
+        raise RuntimeError("all providers down")
+        yield  # unreachable; makes this an async generator
+
+    monkeypatch.setattr(llm, "ask_llm_stream", failing_stream)
+    response = client.post("/chat/stream", json={"session_id": None, "message": "Tell me about GST rates"})
+    frames = sse_frames(response.text)
+    assert frames[0][0] == "session"
+    assert frames[-1] == ("error", {"detail": "all providers down"})
+    assert all(event != "done" for event, _ in frames)
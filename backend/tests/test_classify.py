@@ -0,0 +1,33 @@
+"""
+Statement classification: the column-wise tagger agrees with the per-row rules
+"""
+import pandas as pd
+
+import utils
+
+DESCRIPTIONS = [
+    "Salary Credit - ABC Tech Pvt Ltd",
+    "LIC Premium Payment",
+    "Star Health medical insurance",
+    "LIC premium with home loan EMI",  # 24(b) outranks 80C wherever it appears
+    "Donation to NGO via LIC counter",
+    "Grocery Shopping",
+    "Unknown merchant",
+    None,
+    "LIC Premium Payment",
+    "Grocery Shopping",
+]
+AMOUNTS = [150000, -12000, -9000, -42000, -500, -4200, 300, -100, -12000, -4200]
+
+
+def test_tag_series_matches_the_per_row_rules():
+    categories, sections = utils.tag_series(pd.Series(DESCRIPTIONS, dtype=object), pd.Series(AMOUNTS, dtype=float))
+    for desc, amount, category, section in zip(DESCRIPTIONS, AMOUNTS, categories, sections):
+        assert category == utils.classify_description(desc, amount), desc
+        assert section == (utils.deduction_section(desc) if category == "deductible" else None), desc
+
+
+def test_highest_priority_section_wins_at_any_offset():
+    assert utils.deduction_section("LIC premium with home loan EMI") == "24(b)"
+    assert utils.deduction_section("home loan EMI and LIC premium") == "24(b)"
+    assert utils.deduction_section("Donation to NGO via LIC counter") == "80G"
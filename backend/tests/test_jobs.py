@@ -0,0 +1,159 @@
+"""
+Background upload jobs: streamed ingestion, progress and ownership of running jobs
+"""
+import time
+
+import main
+from synthetic import make_statement
+
+
+def wait_for(client, job_id: str, timeout: float = 30.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.get(f"/jobs/{job_id}").json()
+        if status["status"] in ("done", "failed"):
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} still {status['status']} after {timeout}s")
+
+
+def test_background_upload_streams_rows_in_chunks(client, monkeypatch):
+    monkeypatch.setattr(main, "CSV_CHUNK_ROWS", 100)
+    response = client.post("/upload", data={"background": "true"},
+                           files={"file": ("statement.csv", make_statement(450), "text/csv")})
+    assert response.status_code == 202
+    status = wait_for(client, response.json()["job_id"])
+    assert status["status"] == "done", status["error"]
+    assert status["rows_processed"] == 450
+    assert status["progress"] == 1.0
+    session_id = status["result"]["session_id"]
+    assert status["result"]["transaction_count"] == 450
+    page = client.get("/summary/transactions", params={"session_id": session_id, "limit": 1}).json()
+    assert page["total"] == 450
+
+
+def test_failed_background_upload_leaves_no_partial_rows(client, session_id):
+    # the last row has no parseable amount
+    bad = "date,description,amount\n" + "2025-04-01,Salary,1000\n" * 3 + "2025-04-02,Broken,abc\n"
+    response = client.post("/upload", data={"background": "true", "session_id": session_id},
+                           files={"file": ("statement.csv", bad, "text/csv")})
+    status = wait_for(client, response.json()["job_id"])
+    assert status["status"] == "failed"
+    page = client.get("/summary/transactions", params={"session_id": session_id, "limit": 1}).json()
+    assert page["total"] == 0
+
+
+def test_only_stale_running_jobs_are_reclaimed(client):
+    import db
+    import jobs
+    import models
+
+    now = jobs._now()
+    stale_at = now.replace(year=now.year - 1)
+    with db.SessionLocal() as db_session:
+        for job_id, heartbeat in (("live-elsewhere", now), ("stale", stale_at), ("no-heartbeat", None)):
+            db_session.add(models.Job(id=job_id, kind="upload", status="running", filename="x.csv",
+                                      owner="other-host:1:abc", heartbeat_at=heartbeat))
+        db_session.commit()
+
+    queue = jobs.JobQueue({"upload": lambda job, report: {}})
+    assert sorted(queue._reclaim_stale()) == ["no-heartbeat", "stale"]
+    with db.SessionLocal() as db_session:
+        statuses = dict(db_session.query(models.Job.id, models.Job.status).filter(
+            models.Job.id.in_(["live-elsewhere", "stale", "no-heartbeat"])))
+        db_session.query(models.Job).filter(models.Job.id.in_(list(statuses))).delete(synchronize_session=False)
+        db_session.commit()
+    assert statuses == {"live-elsewhere": "running", "stale": "queued", "no-heartbeat": "queued"}
+
+
+def test_full_queue_rejects_background_upload(client, monkeypatch):
+    import os
+
+    import jobs
+
+    monkeypatch.setattr(jobs, "JOB_MAX_QUEUED", 0)
+    spooled = set(os.listdir(jobs.JOB_SPOOL_DIR)) if os.path.isdir(jobs.JOB_SPOOL_DIR) else set()
+    response = client.post("/upload", data={"background": "true"},
+                           files={"file": ("statement.csv", make_statement(10), "text/csv")})
+    assert response.status_code == 429
+    assert set(os.listdir(jobs.JOB_SPOOL_DIR)) == spooled
+
+
+def test_stale_job_is_reclaimed_while_the_workers_are_busy(client, monkeypatch, tmp_path):
+    import threading
+
+    import db
+    import jobs
+    import models
+
+    monkeypatch.setattr(jobs, "JOB_RECLAIM_INTERVAL", 0.05)
+    release = threading.Event()
+    ran = []
+
+    def handler(job, report):
+        ran.append(job.id)
+        if job.filename == "busy.csv":
+            release.wait(10)
+        return {}
+
+    queue = jobs.JobQueue({"upload": handler}, workers=1)
+    queue.start()
+    try:
+        spooled = tmp_path / "busy.csv"
+        spooled.write_text("date,description,amount\n")
+        busy_id = queue.submit("upload", str(spooled), "busy.csv")
+        deadline = time.monotonic() + 5
+        while busy_id not in ran and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert ran == [busy_id]
+
+        # a job whose owner died mid-run turns up while the only worker is occupied
+        now = jobs._now()
+        with db.SessionLocal() as db_session:
+            db_session.add(models.Job(id="orphaned", kind="upload", status="running", filename="orphaned.csv",
+                                      owner="dead-host:1:abc", heartbeat_at=now.replace(year=now.year - 1)))
+            db_session.commit()
+        deadline = time.monotonic() + 5
+        status = "running"
+        while status == "running" and time.monotonic() < deadline:
+            time.sleep(0.02)
+            with db.SessionLocal() as db_session:
+                status = db_session.get(models.Job, "orphaned").status
+        assert status == "queued"
+        assert ran == [busy_id]
+
+        release.set()
+        deadline = time.monotonic() + 5
+        while "orphaned" not in ran and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert ran == [busy_id, "orphaned"]
+    finally:
+        release.set()
+        queue.stop()
+        with db.SessionLocal() as db_session:
+            db_session.query(models.Job).filter(models.Job.id.in_([busy_id, "orphaned"])).delete(synchronize_session=False)
+            db_session.commit()
+
+
+def test_job_writes_wait_for_the_handlers_write_lock(client):
+    import asyncio
+    import threading
+
+    import db
+
+    order = []
+
+    def job_write():
+        with db.sync_write_lock():
+            order.append("job")
+
+    async def handler_write():
+        async with db.write_lock():
+            worker = threading.Thread(target=job_write)
+            worker.start()
+            await asyncio.sleep(0.05)
+            order.append("handler")
+        await asyncio.to_thread(worker.join)
+
+    asyncio.run(handler_write())
+    assert order == ["handler", "job"]
@@ -0,0 +1,70 @@
+"""
+Lexical fast path: BM25 over the knowledge base chunks, exact section/form lookups and rank fusion
+"""
+import numpy as np
+import pytest
+
+import lexical
+import rag
+import vector_store
+
+CHUNKS = {
+    "80c": "Section 80C allows a deduction of up to 1.5 lakh for LIC premiums, PPF and ELSS.",
+    "80ccd": "Section 80CCD(1B) gives an extra 50,000 deduction for NPS contributions beyond 80C.",
+    "24b": "Section 24(b) allows home loan interest up to 2 lakh for a self-occupied house.",
+    "itr": "ITR-2 is for individuals with capital gains or more than one house property.",
+    "slabs": "Tax slabs under the new regime start at nil tax up to 4 lakh of income.",
+}
+
+
+@pytest.fixture
+def index():
+    ids = list(CHUNKS)
+    return lexical.BM25Index(ids, [CHUNKS[i] for i in ids], [{"source": f"{i}.txt"} for i in ids])
+
+
+def test_tokenize_keeps_section_and_form_names_whole():
+    assert lexical.tokenize("Can I claim 80CCD(1B) and 24(b) on ITR-2?") == ["claim", "80ccd(1b)", "24(b)", "itr-2"]
+    assert lexical.is_exact_term("80c") and lexical.is_exact_term("gst")
+    assert not lexical.is_exact_term("1st") and not lexical.is_exact_term("lakh")
+
+
+def test_exact_match_returns_only_chunks_naming_the_section(index):
+    hits = index.exact_match("Does PPF count for 80C?", n_results=3)
+    assert [h["id"] for h in hits] == ["80c", "80ccd"]  # both name 80C; only the first mentions PPF
+    assert hits[0]["score"] >= hits[1]["score"] and hits[0]["metadata"] == {"source": "80c.txt"}
+    assert [h["id"] for h in index.exact_match("who files ITR-2", n_results=3)] == ["itr"]
+
+
+def test_queries_naming_no_section_fall_through(index):
+    assert index.exact_match("How do the new regime slabs work?", n_results=3) is None
+
+
+def test_fuse_ranks_chunks_found_by_both_first(index):
+    vector_hits = [{"id": "slabs", "distance": 0.1}, {"id": "24b", "distance": 0.2}, {"id": "80c", "distance": 0.3}]
+    fused = index.fuse("home loan interest", vector_hits, n_results=2)
+    assert [h["id"] for h in fused] == ["24b", "slabs"]
+    assert index.fuse("zzz", vector_hits, n_results=2) == vector_hits[:2]
+
+
+def test_section_queries_skip_the_embedding(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag, "RAG_LEXICAL", True)
+    encoded = []
+
+    class Model:
+        def encode(self, texts):
+            encoded.extend(texts)
+            return np.ones((len(texts), 3), dtype=np.float32)
+
+    kb = rag.IndianTaxRAG.__new__(rag.IndianTaxRAG)
+    kb.embedding_model = Model()
+    kb.query_cache = rag.EmbeddingCache(capacity=8)
+    kb.store = vector_store.NumpyStore(str(tmp_path), "kb")
+    ids = list(CHUNKS)
+    kb.store.add(ids, np.eye(len(ids), 3, dtype=np.float32) + 0.01, [CHUNKS[i] for i in ids], [{} for _ in ids])
+    kb._build_lexical_index()
+
+    section, generic = kb.search_many(["Explain 24(b)", "How do slabs work?"], n_results=2)
+    assert [h["id"] for h in section] == ["24b"]
+    assert len(generic) == 2
+    assert encoded == ["how do slabs work?"]
@@ -0,0 +1,39 @@
+"""
+Metrics middleware: sampled profiling must not change what the client sees
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import metrics
+
+
+@pytest.fixture
+def profiled_app(monkeypatch, tmp_path):
+    monkeypatch.setattr(metrics, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(metrics, "PROFILE_DIR", str(tmp_path))
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    @app.get("/ok")
+    async def ok():
+        return {"ok": True}
+
+    return app
+
+
+def test_exception_in_profiled_request_propagates(profiled_app):
+    # finishes before the profiler's first sample, which used to return from `finally` and swallow this
+    with pytest.raises(RuntimeError, match="boom"):
+        TestClient(profiled_app).get("/boom")
+    assert not metrics._profile_lock.locked()
+
+
+def test_profiled_request_still_answers(profiled_app):
+    response = TestClient(profiled_app).get("/ok")
+    assert response.json() == {"ok": True}
+    assert not metrics._profile_lock.locked()
@@ -0,0 +1,38 @@
+"""
+Mock LLM: replies are routed by intent on the question, with figures from the structured context
+"""
+import pytest
+
+import llm
+
+SUMMARY = {"total_income": 300000.0, "total_expenses": 42050.0, "potential_deductions": 12850.0}
+
+
+@pytest.mark.parametrize("question, intent", [
+    ("What is my total income?", "income"),
+    ("Can you update my profile?", None),
+    ("Should I keep separate accounts for my business?", None),
+    ("Who should file ITR-2?", "itr"),
+    ("Show me the tax slabs", "slabs"),
+])
+def test_reply_follows_the_routed_intent(question, intent):
+    assert llm.route_intent(question) == intent
+    reply = llm.mock_llm_response("ignored prompt", context={"question": question, "summary": SUMMARY})
+    expected = llm.MOCK_REPLIES[intent](SUMMARY) if intent else llm.GENERIC_REPLY
+    assert reply == expected
+
+
+def test_summary_in_the_prompt_does_not_pick_the_intent():
+    # "income" and "expenses" appear in the summary, but the question is about GST
+    prompt = 'Session summary: {"total_income": 1, "total_expenses": 2}\n\nUser question: What is the GST rate?'
+    reply = llm.mock_llm_response(prompt, context={"question": "What is the GST rate?", "summary": SUMMARY})
+    assert reply.startswith("GST (Goods & Services Tax)")
+
+
+def test_without_context_the_prompt_is_the_question():
+    assert llm.mock_llm_response("What is my total income?") == llm.MOCK_REPLIES["income"]({})
+
+
+def test_legacy_blocking_path_passes_the_context_through():
+    context = {"question": "What is my total income?", "summary": SUMMARY}
+    assert llm.ask_llm_with_rag("full prompt text", use_rag=False, context=context) == llm.MOCK_REPLIES["income"](SUMMARY)
@@ -0,0 +1,47 @@
+"""
+Prompt context: token counting (tiktoken or the chars/4 fallback) and the budget it enforces
+"""
+import pytest
+
+import prompt_context
+from synthetic import make_statement
+
+
+@pytest.fixture
+def fallback_counter(monkeypatch):
+    """count_tokens as it runs without tiktoken (or without its encoding file)"""
+    monkeypatch.setattr(prompt_context, "_encoding", False)
+
+
+def test_fallback_counts_four_chars_per_token(fallback_counter):
+    assert prompt_context.count_tokens("") == 0
+    assert prompt_context.count_tokens("abcd") == 1
+    assert prompt_context.count_tokens("abcde") == 2
+    assert prompt_context.count_tokens("x" * 400) == 100
+
+
+def test_missing_tiktoken_selects_the_fallback(monkeypatch):
+    import builtins
+
+    real_import = builtins.__import__
+
+    def no_tiktoken(name, *args, **kwargs):
+        if name == "tiktoken":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(prompt_context, "_encoding", None)
+    monkeypatch.setattr(builtins, "__import__", no_tiktoken)
+    assert prompt_context.count_tokens("abcdefgh") == 2
+    assert prompt_context._encoding is False
+
+
+def test_fallback_counter_keeps_context_within_budget(fallback_counter):
+    import io
+
+    import utils
+
+    summary = utils.parse_csv(io.StringIO(make_statement(500)))
+    aggregates = {k: v for k, v in summary.items() if k != "transactions"}
+    text = prompt_context.build_summary_context(aggregates, summary["transactions"][:50], budget=300)
+    assert prompt_context.count_tokens(text) <= 300
@@ -0,0 +1,20 @@
+"""
+RAG query-embedding cache persistence
+"""
+import numpy as np
+import pytest
+
+import rag
+
+
+@pytest.mark.parametrize("name", ["query_cache.npz", "query_cache", "query_cache.bin"])
+def test_saved_cache_reloads_at_the_configured_path(tmp_path, name):
+    path = str(tmp_path / name)
+    cache = rag.EmbeddingCache(capacity=8, path=path, model_id="model-a")
+    cache.put("80c limit", np.arange(4, dtype=np.float32))
+    cache.save()
+
+    reloaded = rag.EmbeddingCache(capacity=8, path=path, model_id="model-a")
+    np.testing.assert_array_equal(reloaded.get("80c limit"), np.arange(4, dtype=np.float32))
+    assert rag.EmbeddingCache(capacity=8, path=path, model_id="model-b").get("80c limit") is None
+    assert sorted(p.name for p in tmp_path.iterdir()) == [name]
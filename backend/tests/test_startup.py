@@ -0,0 +1,33 @@
+"""
+Startup: the schema is created by the app's startup hook, and the async engine URL is derived from DATABASE_URL
+"""
+import pytest
+from sqlalchemy import inspect
+
+import db
+import main
+
+
+def test_schema_exists_after_startup(client):
+    tables = set(inspect(db.engine).get_table_names())
+    assert {"sessions", "messages", "summaries", "chat_memory", "transactions", "jobs"} <= tables
+
+
+def test_create_tables_runs_first():
+    # the job workers started by later hooks query the jobs table
+    assert main.app.router.on_startup[0] is main.create_tables
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite:///./taxease.db", "sqlite+aiosqlite:///./taxease.db"),
+    ("postgresql://u:p@host/taxease", "postgresql+asyncpg://u:p@host/taxease"),
+    ("postgresql+psycopg2://u:p@host/taxease", "postgresql+asyncpg://u:p@host/taxease"),
+    ("postgres://u:p@host/taxease", "postgresql+asyncpg://u:p@host/taxease"),
+])
+def test_async_url_swaps_in_the_async_driver(url, expected):
+    assert db.async_url(url) == expected
+
+
+def test_async_url_rejects_unsupported_databases():
+    with pytest.raises(ValueError, match="ASYNC_DATABASE_URL"):
+        db.async_url("mysql+pymysql://u:p@host/taxease")
@@ -0,0 +1,56 @@
+"""
+Statement storage: rows in the transactions table, only aggregates in Summary.data
+"""
+import json
+
+import db
+import models
+
+
+def stored_summary(session_id: int) -> dict:
+    with db.SessionLocal() as db_session:
+        summ = db_session.query(models.Summary).filter(models.Summary.session_id == session_id).one()
+        return json.loads(summ.data)
+
+
+def test_upload_stores_rows_apart_from_the_aggregates(client, session_id):
+    data = stored_summary(session_id)
+    assert "transactions" not in data
+    assert data["transaction_count"] == 6
+    with db.SessionLocal() as db_session:
+        rows = db_session.query(models.Transaction).filter(models.Transaction.session_id == session_id).count()
+    assert rows == 6
+
+
+def test_summary_returns_aggregates_and_rows_on_request(client, session_id):
+    summary = client.get("/summary", params={"session_id": session_id}).json()
+    assert "transactions" not in summary
+    assert summary["total_income"] == 300000.0
+
+    full = client.get("/summary", params={"session_id": session_id, "include_transactions": True}).json()
+    assert [t["description"] for t in full["transactions"]][:2] == [
+        "Salary Credit - ABC Tech Pvt Ltd", "Rent Payment - Landlord"]
+    assert len(full["transactions"]) == 6
+
+
+def test_migrate_moves_legacy_summary_rows_into_the_table(client):
+    import init_db
+
+    legacy = {
+        "total_income": 1000.0, "total_expenses": 0.0, "potential_deductions": 0.0,
+        "transactions": [{"date": "2025-04-01", "description": "Salary", "amount": 1000.0, "category": "income"}],
+    }
+    with db.SessionLocal() as db_session:
+        session = models.Session()
+        db_session.add(session)
+        db_session.flush()
+        session_id = session.id
+        db_session.add(models.Summary(session_id=session_id, data=json.dumps(legacy)))
+        db_session.commit()
+
+    init_db.migrate_summaries()
+    data = stored_summary(session_id)
+    assert "transactions" not in data
+    assert data["transaction_count"] == 1
+    page = client.get("/summary/transactions", params={"session_id": session_id}).json()
+    assert [t["description"] for t in page["items"]] == ["Salary"]
@@ -0,0 +1,93 @@
+"""
+Tax engine: slabs, 87A rebate, surcharge, question parsing and FY selection
+"""
+import pytest
+
+import tax
+
+
+def test_new_regime_rebate_makes_12_lakh_taxable_tax_free():
+    # 12,75,000 - 75,000 standard deduction = 12,00,000 taxable; 60,000 slab tax fully rebated
+    new = tax.compute_tax(1_275_000, fy="2025-26")["new_regime"]
+    assert new["taxable_income"] == 1_200_000
+    assert new["slab_tax"] == 60_000
+    assert new["rebate_87a"] == 60_000
+    assert new["total_tax"] == 0
+
+
+def test_new_regime_rebate_marginal_relief():
+    # 12,25,000 taxable: slab tax 63,750, capped at the 25,000 above the limit, plus cess
+    new = tax.compute_tax(1_300_000, fy="2025-26")["new_regime"]
+    assert new["slab_tax"] == 63_750
+    assert new["rebate_87a"] == 38_750
+    assert new["total_tax"] == 26_000
+
+
+def test_old_regime_slabs_and_capped_80c():
+    result = tax.compute_tax(1_000_000, fy="2025-26")
+    # 9,50,000 taxable: 12,500 + 90,000, plus 4% cess
+    assert result["old_regime"]["total_tax"] == 106_600
+    capped = tax.compute_tax(1_000_000, {"80C": 200_000}, fy="2025-26")["old_regime"]
+    assert capped["deductions"] == {"80C": 150_000}
+    assert capped["total_tax"] == 75_400
+
+
+def test_2024_25_slabs():
+    # 7,00,000 taxable under the FY 2024-25 new regime: 20,000 slab tax, fully rebated
+    new = tax.compute_tax(775_000, fy="2024-25")["new_regime"]
+    assert new["slab_tax"] == 20_000
+    assert new["total_tax"] == 0
+
+
+def test_surcharge():
+    # 60,00,000 taxable: 13,80,000 slab tax, 10% surcharge, 4% cess
+    new = tax.compute_tax(6_075_000, fy="2025-26")["new_regime"]
+    assert new["slab_tax"] == 1_380_000
+    assert new["surcharge"] == 138_000
+    assert new["total_tax"] == 1_578_720
+
+
+def test_surcharge_marginal_relief():
+    # 50,10,000 taxable: the surcharge is capped at the 10,000 above the threshold less the extra tax
+    new = tax.compute_tax(5_085_000, fy="2025-26")["new_regime"]
+    assert new["slab_tax"] == 1_083_000
+    assert new["surcharge"] == 7_000
+    assert new["total_tax"] == 1_133_600
+
+
+@pytest.mark.parametrize("question, income, deductions", [
+    ("how much tax on 12 lakh", 1_200_000, {}),
+    ("If I invest 1.5 lakh in PPF how much tax will I pay on 15 lakh income", 1_500_000, {"80C": 150_000}),
+    ("tax on 15 lakh salary with 2 lakh home loan interest", 1_500_000, {"24(b)": 200_000}),
+    ("80C of 1.5 lakh and income 12 lakh, how much tax?", 1_200_000, {"80C": 150_000}),
+    ("how much tax for FY 2024-25 on ₹15,00,000", 1_500_000, {}),
+    ("how much tax on 8 lakh or 1.2 cr", 12_000_000, {}),
+    ("how much tax will I save with 1.5 lakh in 80C", None, {"80C": 150_000}),
+])
+def test_question_figures(question, income, deductions):
+    assert tax.question_figures(question) == (income, deductions)
+
+
+def test_answer_counts_investment_in_question():
+    reply = tax.answer_tax_question("If I invest 1.5 lakh in PPF how much tax will I pay on 15 lakh income", None)
+    assert "₹15,00,000" in reply
+    assert "₹1,50,000 in deductions (80C)" in reply
+
+
+@pytest.mark.parametrize("question", [
+    "How can I reduce my tax?",
+    "What documents do I need to file my tax return?",
+    "Is my tax refund taxable?",
+])
+def test_non_numeric_questions_are_not_answered(question):
+    assert tax.answer_tax_question(question, {"total_income": 1_500_000}) is None
+
+
+def test_fy_outside_the_rules_uses_nearest_year_and_says_so():
+    aggregates = {"total_income": 900_000, "monthly": {"2023-12": {}, "2024-01": {}}}
+    assert tax.infer_fy(aggregates) == "2024-25"
+    assert tax.infer_fy({"monthly": {"2031-06": {}}}) == max(tax.available_years())
+    assert tax.infer_fy({}) == tax.DEFAULT_FY
+    reply = tax.answer_tax_question("how much tax do I have to pay?", aggregates)
+    assert "FY 2024-25" in reply
+    assert "statement is from FY 2023-24" in reply
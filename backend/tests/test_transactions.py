@@ -0,0 +1,78 @@
+"""
+/summary/transactions: paging, filters and sorting over the stored rows
+"""
+import pytest
+
+import utils
+
+# DD/MM/YYYY rows, out of order; as raw strings "02/05" sorts before "15/04"
+DAY_FIRST_STATEMENT = """date,description,amount
+02/05/2025,Salary Credit - ABC Tech Pvt Ltd,150000
+15/04/2025,LIC Premium Payment,-12000
+28/04/2025,Grocery Shopping,-4200
+01/06/2025,Medical - Apollo Pharmacy,-850
+"""
+
+
+@pytest.fixture
+def day_first_session(client):
+    response = client.post("/upload", files={"file": ("statement.csv", DAY_FIRST_STATEMENT, "text/csv")})
+    response.raise_for_status()
+    return response.json()["session_id"]
+
+
+def dates(client, **params) -> list:
+    page = client.get("/summary/transactions", params=params).json()
+    return [t["date"] for t in page["items"]]
+
+
+def test_day_first_dates_sort_chronologically(client, day_first_session):
+    expected = ["2025-04-15", "2025-04-28", "2025-05-02", "2025-06-01"]
+    assert dates(client, session_id=day_first_session) == expected
+    assert dates(client, session_id=day_first_session, sort="-date") == expected[::-1]
+
+
+def test_day_first_dates_filter_by_range(client, day_first_session):
+    assert dates(client, session_id=day_first_session, date_from="2025-04-20", date_to="2025-05-02") == [
+        "2025-04-28", "2025-05-02"]
+    # bounds in the statement's own format work too
+    assert dates(client, session_id=day_first_session, date_from="20/04/2025", date_to="02/05/2025") == [
+        "2025-04-28", "2025-05-02"]
+
+
+def test_unparseable_date_bound_is_rejected(client, day_first_session):
+    response = client.get("/summary/transactions", params={"session_id": day_first_session, "date_from": "soon"})
+    assert response.status_code == 400
+
+
+def test_iso_dates_keeps_unparseable_values():
+    import pandas as pd
+
+    raw = pd.Series(["15-Mar-25", "2025-04-02", "not a date"], dtype=object)
+    assert utils.iso_dates(raw).tolist() == ["2025-03-15", "2025-04-02", "not a date"]
+
+
+def test_pages_cover_every_row_once(client, session_id):
+    seen = []
+    offset = 0
+    while offset is not None:
+        page = client.get("/summary/transactions", params={"session_id": session_id, "limit": 4, "offset": offset}).json()
+        assert page["total"] == 6
+        seen.extend(t["description"] for t in page["items"])
+        offset = page["next_offset"]
+    assert len(seen) == 6 and len(set(seen)) == 5  # the salary credit appears twice
+
+
+def test_filters_by_category_section_and_amount(client, session_id):
+    def descriptions(**params):
+        page = client.get("/summary/transactions", params={"session_id": session_id, **params}).json()
+        return [t["description"] for t in page["items"]]
+
+    assert descriptions(category="income") == ["Salary Credit - ABC Tech Pvt Ltd"] * 2
+    assert descriptions(section="80C") == ["LIC Premium Payment"]
+    assert descriptions(min_amount=-5000, max_amount=0, sort="amount") == ["Grocery Shopping", "Medical - Apollo Pharmacy"]
+
+
+def test_invalid_sort_is_rejected(client, session_id):
+    response = client.get("/summary/transactions", params={"session_id": session_id, "sort": "description"})
+    assert response.status_code == 422
@@ -0,0 +1,72 @@
+"""
+/upload: chunked ingestion, the transaction preview and what lands in the database
+"""
+import main
+from synthetic import make_statement
+
+
+def test_upload_streams_chunks_and_caps_the_preview(client, monkeypatch):
+    monkeypatch.setattr(main, "CSV_CHUNK_ROWS", 100)
+    monkeypatch.setattr(main, "UPLOAD_PREVIEW_ROWS", 30)
+    response = client.post("/upload", files={"file": ("statement.csv", make_statement(250), "text/csv")})
+    response.raise_for_status()
+    body = response.json()
+    assert body["transaction_count"] == 250
+    assert len(body["transactions"]) == 30
+
+    summary = client.get("/summary", params={"session_id": body["session_id"]}).json()
+    assert summary["transaction_count"] == 250
+    assert summary["total_income"] == body["total_income"]
+    page = client.get("/summary/transactions", params={"session_id": body["session_id"], "limit": 1}).json()
+    assert page["total"] == 250
+
+
+def test_reupload_replaces_the_session_rows(client, session_id):
+    response = client.post("/upload", data={"session_id": session_id},
+                           files={"file": ("statement.csv", make_statement(40), "text/csv")})
+    response.raise_for_status()
+    page = client.get("/summary/transactions", params={"session_id": session_id, "limit": 1}).json()
+    assert page["total"] == 40
+
+
+def test_unparseable_upload_is_rejected(client):
+    response = client.post("/upload", files={"file": ("statement.csv", "date,description\n2025-04-01,nothing\n", "text/csv")})
+    assert response.status_code == 400
+
+
+def test_parse_runs_without_the_write_lock(client, monkeypatch):
+    import db
+    import utils
+
+    held = []
+    iter_csv_chunks = utils.iter_csv_chunks
+
+    def watched(*args, **kwargs):
+        for part in iter_csv_chunks(*args, **kwargs):
+            held.append(any(lock.locked() for lock in db._write_locks.values()))
+            yield part
+
+    monkeypatch.setattr(main, "CSV_CHUNK_ROWS", 50)
+    monkeypatch.setattr(utils, "iter_csv_chunks", watched)
+    response = client.post("/upload", files={"file": ("statement.csv", make_statement(200), "text/csv")})
+    response.raise_for_status()
+    assert held == [False] * 4
+
+
+def test_rejected_reupload_keeps_the_old_rows(client, session_id):
+    response = client.post("/upload", data={"session_id": session_id},
+                           files={"file": ("statement.csv", "date,description\n2025-04-01,nothing\n", "text/csv")})
+    assert response.status_code == 400
+    page = client.get("/summary/transactions", params={"session_id": session_id, "limit": 1}).json()
+    assert page["total"] == 6
+
+
+def test_failure_after_the_first_chunk_removes_the_partial_rows(client, session_id, monkeypatch):
+    monkeypatch.setattr(main, "CSV_CHUNK_ROWS", 50)
+    statement = make_statement(120) + "2025-06-01,Broken row,not-a-number\n"
+    response = client.post("/upload", data={"session_id": session_id},
+                           files={"file": ("statement.csv", statement, "text/csv")})
+    assert response.status_code == 400
+    page = client.get("/summary/transactions", params={"session_id": session_id, "limit": 1}).json()
+    assert page["total"] == 0
+    assert client.get("/summary", params={"session_id": session_id}).status_code == 404
@@ -0,0 +1,52 @@
+"""
+NumpyStore: exact cosine top-k, persistence across reopen, and invalidation on a model change
+"""
+import numpy as np
+import pytest
+
+import vector_store
+
+IDS = ["80c", "80d", "gst", "itr"]
+VECTORS = np.array([[1, 0, 0], [0.8, 0.6, 0], [0, 0, 1], [0, 1, 0]], dtype=np.float32)
+DOCUMENTS = ["80C limit", "80D health insurance", "GST rates", "ITR forms"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = vector_store.NumpyStore(str(tmp_path), "kb", model_id="model-a")
+    s.add(IDS, VECTORS, DOCUMENTS, [{"source": f"{i}.txt"} for i in IDS])
+    return s
+
+
+def test_query_returns_closest_first_with_cosine_distances(store):
+    [results] = store.query([np.array([2.0, 0.2, 0.0])], n_results=2)
+    assert [r["id"] for r in results] == ["80c", "80d"]
+    assert results[0]["content"] == "80C limit" and results[0]["metadata"] == {"source": "80c.txt"}
+    scores = VECTORS / np.linalg.norm(VECTORS, axis=1, keepdims=True) @ (np.array([2.0, 0.2, 0.0]) / np.linalg.norm([2.0, 0.2, 0.0]))
+    assert [r["distance"] for r in results] == pytest.approx([1 - scores[0], 1 - scores[1]], abs=1e-6)
+
+
+def test_query_batches_and_caps_n_results(store):
+    results = store.query(np.array([[0, 0, 1], [0, 1, 0]]), n_results=10)
+    assert [r["id"] for r in results[0]][0] == "gst"
+    assert [r["id"] for r in results[1]][0] == "itr"
+    assert all(len(row) == len(IDS) for row in results)
+
+
+def test_index_persists_and_reopens(store, tmp_path):
+    store.delete(["gst"])
+    store.update_metadatas(["itr"], [{"source": "itr-2026.txt"}])
+    reopened = vector_store.NumpyStore(str(tmp_path), "kb", model_id="model-a")
+    assert reopened.count() == 3
+    assert reopened.get_metadatas()["itr"] == {"source": "itr-2026.txt"}
+    [results] = reopened.query([np.array([0, 0, 1.0])], n_results=3)
+    assert "gst" not in [r["id"] for r in results]
+
+
+def test_another_model_starts_an_empty_index(store, tmp_path):
+    assert vector_store.NumpyStore(str(tmp_path), "kb", model_id="model-b").count() == 0
+
+
+def test_dimension_mismatch_is_rejected(store):
+    with pytest.raises(ValueError, match="dimension"):
+        store.add(["x"], np.ones((1, 5)), ["x"], [{}])
@@ -1,5 +1,15 @@
-import pandas as pd
-from typing import List, Dict
+import json
+import os
+import re
+import numpy as np
+from typing import TYPE_CHECKING, Callable, List, Dict, Optional, Tuple
+
+import metrics
+import tax
+
+if TYPE_CHECKING:
+    # pandas costs ~0.35 s to import, so functions import it when a statement is first parsed
+    import pandas as pd
 
 # Indian context keywords
 INCOME_KEYWORDS = [
@@ -16,33 +26,47 @@ EXPENSE_KEYWORDS = [
     "fuel", "petrol", "diesel", "maintenance", "repair"
 ]
 
-# Indian tax deductible categories (Section 80C, 80D, etc.)
-DEDUCTIBLE_KEYWORDS = [
-    # Medical - Section 80D
-    "medical", "doctor", "hospital", "pharmacy", "apollo", "fortis",
-    "health insurance", "mediclaim", "star health",
-    
-    # Insurance - Section 80C
-    "lic", "life insurance", "sbi life", "hdfc life", "icici prudential",
-    
-    # Investments - Section 80C
-    "ppf", "epf", "pf", "provident fund", "elss", "mutual fund",
-    "nsc", "national savings", "tax saver", "sukanya samriddhi",
-    
-    # Donations - Section 80G
-    "charity", "donation", "charitable", "ngo", "relief fund",
-    "pm cares", "national defence fund",
-    
-    # Education - Section 80E
-    "tuition", "school fees", "college fees", "education loan",
-    
-    # Home Loan - Section 24
-    "home loan", "housing loan", "mortgage interest", "hdfc home",
-    "sbi home loan", "icici home loan",
-    
-    # NPS - Section 80CCD(1B)
-    "nps", "national pension", "pension scheme"
-]
+# Indian tax deductible categories (Section 80C, 80D, etc.), tagged by section
+SECTION_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "deduction_sections.json")
+
+
+def load_section_rules(path: str = SECTION_RULES_PATH, fy: str = tax.DEFAULT_FY) -> List[Dict]:
+    """Deduction section rules, highest priority first; caps default to the FY's old-regime limits"""
+    with open(path, encoding="utf-8") as f:
+        sections = json.load(f)["sections"]
+    caps = tax.load_rules(fy)["regimes"]["old"]["deduction_caps"]
+    rules = []
+    for rule in sorted(sections, key=lambda r: -r["priority"]):
+        rules.append(dict(rule, cap=rule.get("cap", caps.get(rule["section"]))))
+    return rules
+
+
+SECTION_RULES = load_section_rules()
+DEDUCTION_SECTIONS = {rule["section"]: rule for rule in SECTION_RULES}
+DEDUCTIBLE_KEYWORDS = [k for rule in SECTION_RULES for k in rule["keywords"]]
+
+
+def _compile_keywords(keywords: List[str]) -> "re.Pattern":
+    """Compile a keyword list into one alternation regex (plain substring semantics)"""
+    return re.compile("|".join(re.escape(k) for k in dict.fromkeys(keywords)))
+
+
+# Compiled once at import; matched against lowercased descriptions
+INCOME_PATTERN = _compile_keywords(INCOME_KEYWORDS)
+DEDUCTIBLE_PATTERN = _compile_keywords(DEDUCTIBLE_KEYWORDS)
+EXPENSE_PATTERN = _compile_keywords(EXPENSE_KEYWORDS)
+
+
+def _compile_aliases(rules: List[Dict]) -> "re.Pattern":
+    """Section mentions in questions, longest first so 80ccd wins over 80c"""
+    aliases = sorted({a for rule in rules for a in rule.get("aliases", [])}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(a) for a in aliases))
+
+
+# One pattern per rule, in SECTION_RULES order: a row's rank is the position of the first rule that matches
+SECTION_PATTERNS = [_compile_keywords(rule["keywords"]) for rule in SECTION_RULES]
+SECTION_ALIASES = {a: rule["section"] for rule in reversed(SECTION_RULES) for a in rule.get("aliases", [])}
+SECTION_ALIAS_PATTERN = _compile_aliases(SECTION_RULES)
 
 
 def classify_description(desc: str, amount: float) -> str:
@@ -52,27 +76,92 @@ def classify_description(desc: str, amount: float) -> str:
     txt = desc.lower()
     
     # Check for income keywords
-    for k in INCOME_KEYWORDS:
-        if k in txt:
-            return "income"
+    if INCOME_PATTERN.search(txt):
+        return "income"
     
     # Check for deductible keywords (important for Indian tax saving)
-    for k in DEDUCTIBLE_KEYWORDS:
-        if k in txt:
-            return "deductible"
+    if DEDUCTIBLE_PATTERN.search(txt):
+        return "deductible"
     
     # Check for expense keywords
-    for k in EXPENSE_KEYWORDS:
-        if k in txt:
-            return "expense"
+    if EXPENSE_PATTERN.search(txt):
+        return "expense"
     
     # Fallback by amount sign
     return "income" if amount > 0 else "expense"
 
 
-def parse_csv(file_path_or_buffer) -> Dict:
-    # read CSV with pandas, try to infer columns
-    df = pd.read_csv(file_path_or_buffer)
+def _section_rank(txt) -> int:
+    """Rank of the highest-priority section with a keyword in txt, len(SECTION_RULES) if none"""
+    if not isinstance(txt, str) or not DEDUCTIBLE_PATTERN.search(txt):
+        return len(SECTION_RULES)
+    return next(rank for rank, pattern in enumerate(SECTION_PATTERNS) if pattern.search(txt))
+
+
+def _section_ranks(txt: "pd.Series") -> np.ndarray:
+    """_section_rank over a whole lowercased column: one str.contains pass per rule, highest
+    priority first, over the deductible rows no earlier rule has claimed"""
+    ranks = np.full(len(txt), len(SECTION_RULES), dtype=np.intp)
+    remaining = np.flatnonzero(txt.str.contains(DEDUCTIBLE_PATTERN, na=False).to_numpy(dtype=bool))
+    for rank, pattern in enumerate(SECTION_PATTERNS):
+        if not len(remaining):
+            break
+        hit = txt.iloc[remaining].str.contains(pattern).to_numpy(dtype=bool)
+        ranks[remaining[hit]] = rank
+        remaining = remaining[~hit]
+    return ranks
+
+
+def deduction_section(desc: str) -> Optional[str]:
+    """Highest-priority deduction section whose keywords appear in the description"""
+    rank = _section_rank(desc.lower() if isinstance(desc, str) else None)
+    return SECTION_RULES[rank]["section"] if rank < len(SECTION_RULES) else None
+
+
+def sections_in(question: str) -> List[str]:
+    """Deduction sections a question refers to ("80D", "home loan interest", ...)"""
+    return list(dict.fromkeys(SECTION_ALIASES[a] for a in SECTION_ALIAS_PATTERN.findall(question.lower())))
+
+
+def classify_series(descriptions: "pd.Series", amounts: "pd.Series") -> np.ndarray:
+    """Vectorized classify_description over whole columns; same precedence income > deductible > expense > sign"""
+    return tag_series(descriptions, amounts)[0]
+
+
+def tag_series(descriptions: "pd.Series", amounts: "pd.Series"):
+    """(categories, sections) for whole columns; section is None unless the row is deductible.
+
+    Statements repeat descriptions (the same salary credit, rent, merchants), so the keyword
+    patterns run once per distinct description and the results are broadcast to rows by code.
+    """
+    import pandas as pd
+
+    codes, uniques = pd.factorize(descriptions.str.lower())
+    txt = pd.Series(uniques, dtype=object)
+    # A missing description has code -1, which picks the slot appended after the distinct ones
+    is_income = np.append(txt.str.contains(INCOME_PATTERN, na=False).to_numpy(dtype=bool), False)[codes]
+    # The winning section per row; rows with none rank len(SECTION_RULES), so this is also "deductible?"
+    ranks = np.append(_section_ranks(txt), len(SECTION_RULES))[codes]
+    is_deductible = ranks < len(SECTION_RULES)
+    is_expense = np.append(txt.str.contains(EXPENSE_PATTERN, na=False).to_numpy(dtype=bool), False)[codes]
+    fallback = np.where(amounts.to_numpy(dtype=float) > 0, "income", "expense")
+    categories = np.select(
+        [is_income, is_deductible, is_expense],
+        ["income", "deductible", "expense"],
+        default=fallback,
+    ).astype(object)
+    labels = np.array([rule["section"] for rule in SECTION_RULES] + [None], dtype=object)
+    sections = np.where(categories == "deductible", labels[ranks], None)
+    return categories, sections
+
+
+def _as_text(col: "pd.Series") -> "pd.Series":
+    """str() every value like the old per-row loop did (NaN -> 'nan' on every pandas version)"""
+    return col.astype(str).fillna("nan").astype(object)
+
+
+def _detect_columns(df: "pd.DataFrame"):
+    """Infer (date, description, amount) column names from a statement frame"""
     # Normalize column names
     cols = {c.lower(): c for c in df.columns}
     # Try to find date, desc, amount
@@ -93,35 +182,280 @@ def parse_csv(file_path_or_buffer) -> Dict:
             amount_col = numeric_cols[0]
         else:
             raise ValueError("Could not find amount column in CSV")
+    return date_col, desc_col, amount_col
+
+
+def _summarize_frame(df: "pd.DataFrame", date_col, desc_col, amount_col) -> Dict:
+    """Classify one frame (whole file or a single chunk) and total it"""
+    import pandas as pd
+
+    amounts = df[amount_col].astype(float)
+    descs = _as_text(df[desc_col]) if desc_col is not None else pd.Series("", index=df.index, dtype=object)
+    dates = _as_text(df[date_col]) if date_col is not None else pd.Series([None] * len(df), index=df.index, dtype=object)
+    return _summarize_columns(dates, descs, amounts)
+
+
+def _summarize_columns(dates: "pd.Series", descs: "pd.Series", amounts: "pd.Series") -> Dict:
+    """Classify and total already-normalized date/description/amount columns"""
+    dates = iso_dates(dates)
+    with metrics.span("classify"):
+        categories, sections = tag_series(descs, amounts)
+    values = amounts.to_numpy(dtype=float)
+    summary = _totals(dates, values, categories, sections)
+
+    # zip over plain lists is several times faster than DataFrame.to_dict("records")
+    summary["transactions"] = [
+        {"date": d, "description": desc, "amount": a, "category": c, "section": sec}
+        for d, desc, a, c, sec in zip(dates.tolist(), descs.tolist(), values.tolist(), categories.tolist(), sections.tolist())
+    ]
+    return summary
+
+
+def _totals(dates: "pd.Series", values: np.ndarray, categories: np.ndarray, sections: np.ndarray) -> Dict:
+    """Totals, per-category/per-section and monthly rollups of classified rows (no transactions)"""
+    import pandas as pd
+
+    # Totals from boolean masks instead of per-row accumulation
+    abs_values = np.abs(values)
+    income_mask = categories == "income"
+    deductible_mask = categories == "deductible"
+    expense_mask = (categories == "expense") | deductible_mask
+    total_income = float(values[income_mask].sum())
+    total_expenses = float(abs_values[expense_mask].sum())
+    potential_deductions = float(abs_values[deductible_mask].sum())
 
-    transactions = []
-    total_income = 0.0
-    total_expenses = 0.0
-    potential_deductions = 0.0
-
-    for _, row in df.iterrows():
-        amount = float(row[amount_col])
-        desc = row[desc_col] if desc_col in row else ""
-        date = row[date_col] if date_col in row else None
-        category = classify_description(str(desc), amount)
-        if category == "income":
-            total_income += amount
-        elif category == "expense":
-            total_expenses += abs(amount)
-        elif category == "deductible":
-            potential_deductions += abs(amount)
-            total_expenses += abs(amount)
-        transactions.append({
-            "date": str(date) if date is not None else None,
-            "description": str(desc),
-            "amount": float(amount),
-            "category": category,
-        })
-
-    summary = {
+    # Per-category and per-month rollups in the same pass (stored as summary aggregates)
+    by_category = pd.Series(abs_values).groupby(categories).agg(["count", "sum"])
+    category_totals = {
+        cat: {"count": int(row["count"]), "amount": float(row["sum"])}
+        for cat, row in by_category.iterrows()
+    }
+    by_section = pd.Series(abs_values[deductible_mask]).groupby(sections[deductible_mask]).agg(["count", "sum"])
+    section_totals = {
+        section: {"count": int(row["count"]), "amount": float(row["sum"])}
+        for section, row in by_section.iterrows()
+    }
+    months = pd.DataFrame({
+        "month": _month_numbers(dates),
+        "income": np.where(income_mask, values, 0.0),
+        "expenses": np.where(expense_mask, abs_values, 0.0),
+        "deductions": np.where(deductible_mask, abs_values, 0.0),
+    }).groupby("month", dropna=False).sum()
+    monthly = {_month_label(month): {k: float(v) for k, v in row.items()} for month, row in months.iterrows()}
+
+    return {
         "total_income": total_income,
         "total_expenses": total_expenses,
         "potential_deductions": potential_deductions,
-        "transactions": transactions,
+        "category_totals": category_totals,
+        "section_totals": section_totals,
+        "monthly": monthly,
+    }
+
+
+def totals_of_rows(transactions: List[Dict]) -> Dict:
+    """Aggregates of rows that already carry category and section; the classifier is not re-run"""
+    import pandas as pd
+
+    if not transactions:
+        return {k: v for k, v in empty_summary().items() if k != "transactions"}
+    return _totals(
+        pd.Series([t["date"] for t in transactions], dtype=object),
+        np.array([t["amount"] for t in transactions], dtype=float),
+        np.array([t["category"] for t in transactions], dtype=object),
+        np.array([t["section"] for t in transactions], dtype=object),
+    )
+
+
+def _parse_dates(dates: "pd.Series") -> "Tuple[pd.Series, pd.Series]":
+    """(datetimes, mask of rows that were not ISO) per row, NaT when unparseable;
+    ISO dates take the fast path, others parse day-first"""
+    import pandas as pd
+
+    parsed = pd.to_datetime(dates, errors="coerce", format="ISO8601")
+    retry = parsed.isna() & dates.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(dates[retry], errors="coerce", dayfirst=True, format="mixed")
+    return parsed, retry
+
+
+def iso_dates(dates: "pd.Series") -> "pd.Series":
+    """Statement dates as YYYY-MM-DD, so they sort and compare correctly as strings; unparseable ones are kept as given"""
+    parsed, retry = _parse_dates(dates)
+    # only rows not already in that exact form are formatted (strftime is per row)
+    reformat = parsed.notna() & (retry | (dates.str.len() != 10))
+    if not reformat.any():
+        return dates
+    dates = dates.copy()
+    dates[reformat] = parsed[reformat].dt.strftime("%Y-%m-%d")
+    return dates
+
+
+def iso_date(value: str) -> Optional[str]:
+    """One date in any statement format as YYYY-MM-DD, or None when unparseable"""
+    import pandas as pd
+
+    parsed, _ = _parse_dates(pd.Series([value], dtype=object))
+    return None if pd.isna(parsed[0]) else parsed[0].strftime("%Y-%m-%d")
+
+
+def _month_numbers(dates: "pd.Series") -> "pd.Series":
+    """year*100+month per row (NaN when unparseable)"""
+    parsed, _ = _parse_dates(dates)
+    # Numbers group much faster than per-row strftime; labels are formatted per group
+    return parsed.dt.year * 100 + parsed.dt.month
+
+
+def _month_label(ym) -> str:
+    return f"{int(ym) // 100:04d}-{int(ym) % 100:02d}" if ym == ym else "unknown"
+
+
+def merge_summaries(summary: Dict, part: Dict, sign: int = 1) -> Dict:
+    """Fold one partial summary (a chunk or another file) into summary, in place; sign=-1 takes it out"""
+    summary["total_income"] += sign * part["total_income"]
+    summary["total_expenses"] += sign * part["total_expenses"]
+    summary["potential_deductions"] += sign * part["potential_deductions"]
+    for key in ("category_totals", "section_totals"):
+        for name, totals in part.get(key, {}).items():
+            into = summary[key].setdefault(name, {"count": 0, "amount": 0.0})
+            into["count"] += sign * totals["count"]
+            into["amount"] += sign * totals["amount"]
+            if into["count"] == 0:
+                del summary[key][name]
+    for month, totals in part.get("monthly", {}).items():
+        into = summary["monthly"].setdefault(month, {"income": 0.0, "expenses": 0.0, "deductions": 0.0})
+        for k, v in totals.items():
+            into[k] += sign * v
+    if sign > 0:
+        summary["transactions"].extend(part.get("transactions", []))
+    return summary
+
+
+def empty_summary() -> Dict:
+    return {
+        "total_income": 0.0,
+        "total_expenses": 0.0,
+        "potential_deductions": 0.0,
+        "category_totals": {},
+        "section_totals": {},
+        "monthly": {},
+        "transactions": [],
     }
+
+
+def iter_csv_chunks(file_path_or_buffer, chunksize: int = 50_000):
+    """Yield a partial summary per chunk of rows; columns are detected on the first chunk"""
+    import pandas as pd
+
+    columns = None
+    for chunk in pd.read_csv(file_path_or_buffer, chunksize=chunksize):
+        if columns is None:
+            columns = _detect_columns(chunk)
+        yield _summarize_frame(chunk, *columns)
+
+
+def parse_csv(file_path_or_buffer, chunksize: Optional[int] = None, on_chunk: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Parse and classify a bank statement; with chunksize the CSV is read incrementally
+    and on_chunk (if given) is called with the running summary after each chunk"""
+    import pandas as pd
+
+    if chunksize is None:
+        # read CSV with pandas, try to infer columns
+        df = pd.read_csv(file_path_or_buffer)
+        return _summarize_frame(df, *_detect_columns(df))
+
+    summary = empty_summary()
+    for part in iter_csv_chunks(file_path_or_buffer, chunksize):
+        merge_summaries(summary, part)
+        if on_chunk is not None:
+            on_chunk(summary)
+    summary["monthly"] = dict(sorted(summary["monthly"].items()))
+    return summary
+
+
+def stream_csv(
+    file_path_or_buffer,
+    chunksize: int,
+    on_rows: Callable[[List[Dict]], None],
+    preview: int = 0,
+    on_chunk: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
+    """Parse a statement chunk by chunk without keeping its rows.
+
+    Each chunk's classified rows go to on_rows (e.g. an insert) and are then dropped, so memory
+    stays at one chunk whatever the file size. Returns the aggregates plus transaction_count,
+    with only the first `preview` rows in "transactions". on_chunk (if given) gets the running
+    summary after each chunk.
+    """
+    summary = empty_summary()
+    summary["transaction_count"] = 0
+    for part in iter_csv_chunks(file_path_or_buffer, chunksize):
+        on_rows(fold_chunk(summary, part, preview))
+        if on_chunk is not None:
+            on_chunk(summary)
+    summary["monthly"] = dict(sorted(summary["monthly"].items()))
     return summary
+
+
+def fold_chunk(summary: Dict, part: Dict, preview: int = 0) -> List[Dict]:
+    """Fold one iter_csv_chunks part into a streamed summary and return the part's rows.
+
+    Only the first `preview` rows are kept in summary["transactions"]; transaction_count counts them all.
+    """
+    rows = part.pop("transactions")
+    room = preview - len(summary["transactions"])
+    if room > 0:
+        summary["transactions"].extend(rows[:room])
+    summary["transaction_count"] = summary.get("transaction_count", 0) + len(rows)
+    merge_summaries(summary, part)
+    return rows
+
+
+def aggregate_summary(summary: Dict) -> Dict:
+    """Aggregates stored in Summary.data - everything except the transaction rows"""
+    aggregates = {k: v for k, v in summary.items() if k != "transactions"}
+    aggregates.setdefault("transaction_count", len(summary.get("transactions", [])))
+    return aggregates
+
+
+def summarize_transactions(transactions: List[Dict]) -> Dict:
+    """Recompute a full summary (totals, rollups, categories) from transaction rows"""
+    import pandas as pd
+
+    if not transactions:
+        return empty_summary()
+    return _summarize_columns(
+        pd.Series([t["date"] for t in transactions], dtype=object),
+        pd.Series([t["description"] for t in transactions], dtype=object),
+        pd.Series([t["amount"] for t in transactions], dtype=float),
+    )
+
+
+def merge_statements(summaries: List[Dict]) -> Dict:
+    """Merge parsed statements into one summary, dropping rows repeated across overlapping files.
+
+    Rows match on (date, description, amount). Repeats inside a single file are kept: a row
+    that appears k times in one statement is kept k times, not once per file it appears in.
+    The files' aggregates are added up and the dropped rows' totals taken back out, so only
+    the duplicates are re-totalled and nothing is classified again.
+    """
+    merged = empty_summary()
+    dropped = []
+    included = {}
+    for summary in summaries:
+        merge_summaries(merged, {k: v for k, v in summary.items() if k != "transactions"})
+        occurrences = {}
+        for t in summary["transactions"]:
+            key = (t["date"], t["description"], t["amount"])
+            occurrences[key] = occurrences.get(key, 0) + 1
+            if occurrences[key] > included.get(key, 0):
+                included[key] = occurrences[key]
+                merged["transactions"].append(t)
+            else:
+                dropped.append(t)
+    if dropped:
+        # each dropped row has a kept twin with the same date, so no month empties out
+        merge_summaries(merged, totals_of_rows(dropped), sign=-1)
+    merged["monthly"] = dict(sorted(merged["monthly"].items()))
+    merged["duplicates_removed"] = len(dropped)
+    return merged
@@ -0,0 +1,271 @@
+"""
+Vector stores for the RAG knowledge base
+NumpyStore keeps normalized chunk embeddings in a memory-mapped .npy file with a JSON sidecar
+(ids, documents, metadatas) and answers a query with one matrix product and argpartition top-k,
+which is all a few hundred chunks need. ChromaStore wraps a Chroma collection for larger indexes.
+"""
+import json
+import os
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class VectorStore:
+    """Chunk embeddings keyed by id; query returns {id, content, metadata, distance} per result, closest first"""
+
+    backend = "base"
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def get_metadatas(self) -> Dict[str, Dict]:
+        """chunk id -> metadata for everything indexed"""
+        raise NotImplementedError
+
+    def get_documents(self) -> Tuple[List[str], List[str], List[Dict]]:
+        """(ids, documents, metadatas) for everything indexed"""
+        raise NotImplementedError
+
+    def add(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        raise NotImplementedError
+
+    def delete(self, ids: List[str]):
+        raise NotImplementedError
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict]):
+        raise NotImplementedError
+
+    def query(self, query_embeddings, n_results: int) -> List[List[Dict]]:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+def _normalize(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class NumpyStore(VectorStore):
+    """Exact cosine search over <path>/<name>.npy (memory-mapped) and <name>.json
+
+    Writes rewrite both files (a temp file then os.replace), which is cheap at knowledge-base size.
+    Distances are cosine distances (1 - cosine similarity).
+    """
+
+    backend = "numpy"
+
+    def __init__(self, path: str, name: str, model_id: str = ""):
+        self.vectors_path = os.path.join(path, f"{name}.npy")
+        self.meta_path = os.path.join(path, f"{name}.json")
+        self.model_id = model_id
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        # (vectors, ids, documents, metadatas), swapped as a whole so queries never see a half-applied write
+        self._state = self._load()
+
+    def _empty(self):
+        return np.zeros((0, 0), dtype=np.float32), [], [], []
+
+    def _load(self):
+        if not (os.path.exists(self.vectors_path) and os.path.exists(self.meta_path)):
+            return self._empty()
+        try:
+            with open(self.meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            vectors = np.load(self.vectors_path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not load vector index {self.vectors_path}: {e}")
+            return self._empty()
+        if meta.get("model_id") != self.model_id:
+            print(f"Vector index {self.vectors_path} was built with another model, re-indexing")
+            return self._empty()
+        if vectors.shape[0] != len(meta["ids"]):
+            print(f"Vector index {self.vectors_path} does not match its metadata, re-indexing")
+            return self._empty()
+        return vectors, meta["ids"], meta["documents"], meta["metadatas"]
+
+    def _write(self, vectors: np.ndarray, ids: List[str], documents: List[str], metadatas: List[Dict]):
+        """Persist and re-map; the sidecar is written last so a crash in between is caught by _load"""
+        vectors = np.array(vectors, dtype=np.float32)  # in-memory copy: the old mapping is dropped before its file is replaced
+        self._state = (vectors, ids, documents, metadatas)
+        tmp = self.vectors_path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, vectors)
+        os.replace(tmp, self.vectors_path)
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"model_id": self.model_id, "ids": ids, "documents": documents, "metadatas": metadatas}, f)
+        os.replace(tmp, self.meta_path)
+        self._state = (np.load(self.vectors_path, mmap_mode="r"), ids, documents, metadatas)
+
+    def count(self) -> int:
+        return len(self._state[1])
+
+    def get_metadatas(self) -> Dict[str, Dict]:
+        _, ids, _, metadatas = self._state
+        return dict(zip(ids, metadatas))
+
+    def get_documents(self):
+        _, ids, documents, metadatas = self._state
+        return list(ids), list(documents), list(metadatas)
+
+    def add(self, ids, embeddings, documents, metadatas):
+        with self._lock:
+            vectors, old_ids, old_documents, old_metadatas = self._state
+            new = _normalize(embeddings)
+            if len(old_ids) and vectors.shape[1] != new.shape[1]:
+                raise ValueError(f"Embedding dimension {new.shape[1]} does not match the index ({vectors.shape[1]})")
+            vectors = np.concatenate([vectors, new]) if len(old_ids) else new
+            self._write(vectors, old_ids + list(ids), old_documents + list(documents), old_metadatas + list(metadatas))
+
+    def delete(self, ids):
+        with self._lock:
+            vectors, old_ids, documents, metadatas = self._state
+            drop = set(ids)
+            keep = [i for i, chunk_id in enumerate(old_ids) if chunk_id not in drop]
+            if len(keep) == len(old_ids):
+                return
+            self._write(
+                vectors[keep] if keep else self._empty()[0],
+                [old_ids[i] for i in keep],
+                [documents[i] for i in keep],
+                [metadatas[i] for i in keep],
+            )
+
+    def update_metadatas(self, ids, metadatas):
+        with self._lock:
+            vectors, old_ids, documents, old_metadatas = self._state
+            updated = dict(zip(ids, metadatas))
+            new_metadatas = [updated.get(chunk_id, meta) for chunk_id, meta in zip(old_ids, old_metadatas)]
+            self._write(vectors, old_ids, documents, new_metadatas)
+
+    def query(self, query_embeddings, n_results: int) -> List[List[Dict]]:
+        vectors, ids, documents, metadatas = self._state
+        queries = _normalize(query_embeddings)
+        if not ids or n_results <= 0:
+            return [[] for _ in range(len(queries))]
+        scores = queries @ vectors.T  # cosine similarity, (queries, chunks)
+        k = min(n_results, len(ids))
+        if k < len(ids):
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(len(ids)), scores.shape)
+        rows = np.arange(len(queries))[:, None]
+        top = np.take_along_axis(top, np.argsort(-scores[rows, top], axis=1), axis=1)
+        return [
+            [{"id": ids[i], "content": documents[i], "metadata": metadatas[i], "distance": float(1.0 - row_scores[i])}
+             for i in row_top]
+            for row_top, row_scores in zip(top.tolist(), scores)
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._state = self._empty()
+            for path in (self.meta_path, self.vectors_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+class ChromaStore(VectorStore):
+    """A Chroma collection (HNSW, L2 distances) persisted under path"""
+
+    backend = "chroma"
+
+    def __init__(self, path: str, name: str):
+        import chromadb
+
+        self.name = name
+        try:
+            # Try new ChromaDB API first (v0.4+)
+            self.client = chromadb.PersistentClient(path=path)
+        except (AttributeError, TypeError):
+            # Fallback to older API if needed
+            try:
+                from chromadb.config import Settings
+                self.client = chromadb.Client(Settings(
+                    chroma_db_impl="duckdb+parquet",
+                    persist_directory=path
+                ))
+            except Exception as e:
+                print(f"Warning: Falling back to in-memory ChromaDB: {e}")
+                self.client = chromadb.Client()
+
+        try:
+            self.collection = self.client.get_collection(name=name)
+            print(f"Loaded existing collection: {name}")
+        except Exception:
+            self._create_collection()
+
+    def _create_collection(self):
+        self.collection = self.client.create_collection(
+            name=self.name,
+            metadata={"description": "Indian Tax Knowledge Base"}
+        )
+        print(f"Created new collection: {self.name}")
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def get_metadatas(self) -> Dict[str, Dict]:
+        indexed = self.collection.get(include=["metadatas"])
+        return {chunk_id: meta or {} for chunk_id, meta in zip(indexed["ids"], indexed["metadatas"])}
+
+    def get_documents(self):
+        indexed = self.collection.get(include=["documents", "metadatas"])
+        return list(indexed["ids"]), list(indexed["documents"]), [meta or {} for meta in indexed["metadatas"]]
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self.collection.add(
+            embeddings=np.asarray(embeddings, dtype=np.float32).tolist(),
+            documents=list(documents),
+            metadatas=list(metadatas),
+            ids=list(ids)
+        )
+
+    def delete(self, ids):
+        self.collection.delete(ids=list(ids))
+
+    def update_metadatas(self, ids, metadatas):
+        self.collection.update(ids=list(ids), metadatas=list(metadatas))
+
+    def query(self, query_embeddings, n_results: int) -> List[List[Dict]]:
+        query_embeddings = [np.asarray(vec, dtype=np.float32).tolist() for vec in query_embeddings]
+        results = self.collection.query(query_embeddings=query_embeddings, n_results=n_results)
+        all_results = []
+        for q in range(len(query_embeddings)):
+            formatted_results = []
+            if results['documents'] and results['documents'][q]:
+                for i, doc in enumerate(results['documents'][q]):
+                    formatted_results.append({
+                        "id": results['ids'][q][i],
+                        "content": doc,
+                        "metadata": results['metadatas'][q][i] if results['metadatas'] else {},
+                        "distance": results['distances'][q][i] if results['distances'] else None
+                    })
+            all_results.append(formatted_results)
+        return all_results
+
+    def clear(self):
+        self.client.delete_collection(name=self.name)
+        print(f"Cleared collection: {self.name}")
+        self._create_collection()
+
+
+def open_store(backend: str, path: str, name: str, model_id: str = "") -> VectorStore:
+    """Open (or create) the named index with the chosen backend: numpy or chroma"""
+    if backend == "numpy":
+        return NumpyStore(path, name, model_id=model_id)
+    if backend == "chroma":
+        return ChromaStore(path, name)
+    raise ValueError(f"Unknown vector store backend: {backend!r} (expected numpy or chroma)")
+
+
+def default_path(backend: str) -> str:
+    return "./chroma_db" if backend == "chroma" else "./vector_index"
@@ -55,13 +55,23 @@ export default function Dashboard() {
     
     try {
       const res = await fetch('http://localhost:8000/upload', { method: 'POST', body: form })
-      const data = await res.json()
+      let data = await res.json()
+      if (res.status === 202) {
+        // Large statement: parsed by a background job, poll until it finishes
+        let job = data
+        while (job.status === 'queued' || job.status === 'running') {
+          await new Promise(r => setTimeout(r, 1000))
+          job = await (await fetch(`http://localhost:8000${data.status_url}`)).json()
+        }
+        if (job.status !== 'done') throw new Error(job.error)
+        data = job.result
+      }
       setSessionId(data.session_id)
       localStorage.setItem('taxease_session', String(data.session_id))
       setSummary(data)
       setMessages(prev => [...prev, {
         role:'assistant', 
-        text: `📊 **Upload Summary** ✅\n\n💰 Total Income: ₹${data.total_income.toLocaleString('en-IN')}\n💸 Total Expenses: ₹${data.total_expenses.toLocaleString('en-IN')}\n🎯 Potential Deductions: ₹${data.potential_deductions.toLocaleString('en-IN')}\n\n${data.transactions.length} transactions analyzed successfully!\n\n💡 I can help you with Indian tax deductions under Section 80C, 80D, and more!`
+        text: `📊 **Upload Summary** ✅\n\n💰 Total Income: ₹${data.total_income.toLocaleString('en-IN')}\n💸 Total Expenses: ₹${data.total_expenses.toLocaleString('en-IN')}\n🎯 Potential Deductions: ₹${data.potential_deductions.toLocaleString('en-IN')}\n\n${data.transaction_count ?? data.transactions.length} transactions analyzed successfully!\n\n💡 I can help you with Indian tax deductions under Section 80C, 80D, and more!`
       }])
     } catch(e) {
       setMessages(prev => [...prev, {role: 'assistant', text: '❌ Upload failed. Please check your CSV format.'}])